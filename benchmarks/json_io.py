@@ -0,0 +1,93 @@
+""" JSON 读写性能测试
+
+模拟一个包含 5000 个插件的商店，比较标准库 json 与 json_io 的读写耗时
+
+直接通过 `python -m benchmarks.json_io` 运行
+"""
+# ruff: noqa: T201
+
+import json
+import tempfile
+import timeit
+from pathlib import Path
+
+from src.utils import json_io
+
+ENTRIES = 5000
+REPEAT = 20
+
+
+def generate_store(entries: int) -> list[dict]:
+    """生成商店插件列表"""
+    return [
+        {
+            "module_name": f"nonebot_plugin_test{i}",
+            "project_link": f"nonebot-plugin-test{i}",
+            "name": f"测试插件{i}",
+            "desc": "这是一个用于性能测试的插件，描述会比较长一些" * 2,
+            "author": f"author{i}",
+            "homepage": f"https://github.com/author{i}/nonebot-plugin-test{i}",
+            "tags": [{"label": "测试", "color": "#ffffff"}],
+            "is_official": False,
+            "type": "application",
+            "supported_adapters": ["nonebot.adapters.onebot.v11"],
+            "valid": True,
+            "time": "2023-06-22T12:10:18.000000Z",
+            "version": "0.1.0",
+            "skip_test": False,
+        }
+        for i in range(entries)
+    ]
+
+
+def stdlib_dump(path: Path, data: list[dict], indent: int | None):
+    with open(path, "w", encoding="utf8") as f:
+        if indent is None:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.write("\n")
+
+
+def stdlib_load(path: Path):
+    with open(path, encoding="utf8") as f:
+        return json.load(f)
+
+
+def main():
+    data = generate_store(ENTRIES)
+    codec = "orjson" if json_io.orjson else "json"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stdlib_path = Path(tmp) / "stdlib.json"
+        json_io_path = Path(tmp) / "json_io.json"
+
+        for indent in (None, 2):
+            stdlib_dump(stdlib_path, data, indent)
+            json_io.dump_json(json_io_path, data, indent)
+            assert stdlib_path.read_bytes() == json_io_path.read_bytes()
+
+            cases = {
+                "dump": (
+                    lambda: stdlib_dump(stdlib_path, data, indent),
+                    lambda: json_io.dump_json(json_io_path, data, indent),
+                ),
+                "load": (
+                    lambda: stdlib_load(stdlib_path),
+                    lambda: json_io.load_json(json_io_path),
+                ),
+            }
+            size = stdlib_path.stat().st_size / 1024
+            print(f"{ENTRIES} 个插件，indent={indent}，文件大小 {size:.0f} KiB")
+            for name, (stdlib, current) in cases.items():
+                stdlib_time = min(timeit.repeat(stdlib, number=1, repeat=REPEAT))
+                current_time = min(timeit.repeat(current, number=1, repeat=REPEAT))
+                print(
+                    f"  {name}: json {stdlib_time * 1000:.2f} ms，"
+                    f"json_io({codec}) {current_time * 1000:.2f} ms，"
+                    f"{stdlib_time / current_time:.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
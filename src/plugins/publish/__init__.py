@@ -25,27 +25,29 @@ from .depends import (
 from .models import RepoInfo
 from .utils import (
     comment_issue,
-    commit_and_push,
     create_pull_request,
     ensure_issue_content,
     resolve_conflict_pull_requests,
     run_shell_command,
     should_skip_plugin_test,
     trigger_registry_update,
-    update_file,
+    update_branch,
     validate_info_from_issue,
 )
 
 
-def bypass_git():
+async def bypass_git():
     """绕过检查"""
     # https://github.blog/2022-04-18-highlights-from-git-2-36/#stricter-repository-ownership-checks
-    run_shell_command(["git", "config", "--global", "safe.directory", "*"])
+    await run_shell_command(["git", "config", "--global", "safe.directory", "*"])
 
 
-def install_pre_commit_hooks():
+async def install_pre_commit_hooks():
     """安装 pre-commit 钩子"""
-    run_shell_command(["pre-commit", "install", "--install-hooks"])
+    if plugin_config.git_backend == "dulwich":
+        # 进程内提交时不会运行钩子，文件内容已经符合要求
+        return
+    await run_shell_command(["pre-commit", "install", "--install-hooks"])
 
 
 async def pr_close_rule(
@@ -102,7 +104,7 @@ async def handle_pr_close(
             logger.info("拉取请求未合并，跳过触发商店列表更新")
 
         try:
-            run_shell_command(
+            await run_shell_command(
                 [
                     "git",
                     "push",
@@ -120,7 +122,7 @@ async def handle_pr_close(
             pull_requests = await get_pull_requests_by_label(
                 bot, repo_info, publish_type
             )
-            await resolve_conflict_pull_requests(pull_requests)
+            await resolve_conflict_pull_requests(pull_requests, skip_mergeable=True)
         else:
             logger.info("发布的拉取请求未合并，已跳过")
 
@@ -184,7 +186,7 @@ async def handle_publish_check(
 
         # 检查是否满足发布要求
         # 仅在通过检查的情况下创建拉取请求
-        result = validate_info_from_issue(issue, publish_type)
+        result = await validate_info_from_issue(issue, publish_type)
 
         # 设置拉取请求与议题的标题
         # 限制标题长度，过长的标题不好看
@@ -193,11 +195,8 @@ async def handle_publish_check(
         # 分支命名示例 publish/issue123
         branch_name = f"{BRANCH_NAME_PREFIX}{issue_number}"
         if result["valid"]:
-            # 创建新分支
-            run_shell_command(["git", "switch", "-C", branch_name])
-            # 更新文件并提交更改
-            update_file(result)
-            commit_and_push(result, branch_name, issue_number)
+            # 创建新分支，更新文件并提交更改
+            await update_branch(result, branch_name, issue_number)
             # 创建拉取请求
             await create_pull_request(
                 bot, repo_info, result, branch_name, issue_number, title
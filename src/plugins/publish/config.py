@@ -1,11 +1,13 @@
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from nonebot import get_driver
 from pydantic import BaseModel, Extra, validator
 
 from src.utils.plugin_test import strip_ansi
 
+from .git import is_available
+
 
 class PublishConfig(BaseModel):
     base: str
@@ -23,6 +25,7 @@ class Config(BaseModel, extra=Extra.ignore):
     plugin_test_result: bool = False
     plugin_test_output: str = ""
     plugin_test_metadata: dict[str, Any] | None = None
+    git_backend: Literal["cli", "dulwich"] = "cli"
 
     @validator("plugin_test_result", pre=True)
     def plugin_test_result_validator(cls, v):
@@ -40,6 +43,12 @@ class Config(BaseModel, extra=Extra.ignore):
             return None
         return v
 
+    @validator("git_backend")
+    def git_backend_validator(cls, v):
+        if v == "dulwich" and not is_available():
+            raise ValueError("需要安装 dulwich 才能使用进程内的 git 操作")
+        return v
+
     @validator("plugin_test_output", pre=True)
     def plugin_test_output_validator(cls, v):
         """移除 ANSI 转义字符"""
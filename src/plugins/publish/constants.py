@@ -14,6 +14,16 @@ BRANCH_NAME_PREFIX = "publish/issue"
 MAX_NAME_LENGTH = 50
 """名称最大长度"""
 
+COMMAND_TIMEOUT = 300
+"""运行命令的超时时间（秒）"""
+COMMAND_OUTPUT_LIMIT = 16 * 1024 * 1024
+"""命令输出的最大长度（字节），超出部分会被丢弃"""
+COMMAND_READ_SIZE = 64 * 1024
+"""每次读取命令输出的长度（字节）"""
+
+MAX_CONCURRENT_RESOLVES = 4
+"""同时处理冲突的拉取请求数量"""
+
 # 匹配信息的正则表达式
 # 格式：### {标题}\n\n{内容}
 ISSUE_PATTERN = r"### {}\s+([^\s#].*?)(?=(?:\s+###|$))"
@@ -0,0 +1,94 @@
+""" 进程内的 git 操作
+
+需要安装 dulwich，直接根据更新后的文件内容在内存中构建提交，
+提交者信息随提交一起传入，不会修改全局的 git 配置，
+最后通过一次连接推送到远程仓库，不需要为每条 git 命令启动一个进程
+"""
+import io
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+try:
+    from dulwich import porcelain
+    from dulwich.object_store import commit_tree_changes, tree_lookup_path
+    from dulwich.objects import Blob, Commit
+    from dulwich.objectspec import parse_commit
+    from dulwich.repo import Repo
+except ImportError:  # pragma: no cover
+    porcelain = None
+
+
+def is_available() -> bool:
+    """是否可以使用进程内的 git 操作"""
+    return porcelain is not None
+
+
+def commit_file(
+    path: Path,
+    update: Callable[[bytes], bytes],
+    message: str,
+    author: str,
+    branch_name: str,
+    base: str = "HEAD",
+    remote: str = "origin",
+    fetch: bool = True,
+) -> str | None:
+    """在 base 的基础上更新文件，提交至指定分支并推送
+
+    update 接收 base 中该文件的内容，返回更新后的内容
+    工作区与暂存区都不会被修改
+
+    与 git 命令的提交方式一致，远程分支中的文件与更新后相同时跳过推送，避免重复触发 CI
+    已经获取过远程分支时可将 fetch 设置为 False
+
+    返回提交的哈希值，跳过推送时返回 None
+    """
+    if porcelain is None:
+        raise RuntimeError("需要安装 dulwich 才能使用进程内的 git 操作")
+
+    with Repo.discover(str(path.parent)) as repo:
+        relative_path = (
+            path.resolve().relative_to(Path(repo.path).resolve()).as_posix().encode()
+        )
+        head = parse_commit(repo, base)
+
+        mode, sha = tree_lookup_path(
+            repo.object_store.__getitem__, head.tree, relative_path
+        )
+        blob = Blob.from_string(update(repo.object_store[sha].as_raw_string()))
+        repo.object_store.add_object(blob)
+        tree = commit_tree_changes(
+            repo.object_store, head.tree, [(relative_path, mode, blob.id)]
+        )
+
+        if fetch:
+            porcelain.fetch(
+                repo, remote, outstream=io.StringIO(), errstream=io.BytesIO()
+            )
+        remote_ref = f"refs/remotes/{remote}/{branch_name}".encode()
+        if remote_ref in repo.refs and repo[repo.refs[remote_ref]].tree == tree:
+            return None
+
+        commit = Commit()
+        commit.tree = tree
+        commit.parents = [head.id]
+        commit.author = commit.committer = author.encode()
+        commit.author_time = commit.commit_time = int(time.time())
+        commit.author_timezone = commit.commit_timezone = time.localtime().tm_gmtoff
+        commit.encoding = b"UTF-8"
+        commit.message = f"{message}\n".encode()
+        repo.object_store.add_object(commit)
+
+        ref = f"refs/heads/{branch_name}".encode()
+        repo.refs[ref] = commit.id
+        porcelain.push(
+            repo,
+            remote,
+            [ref],
+            outstream=io.BytesIO(),
+            errstream=io.BytesIO(),
+            force=True,
+        )
+
+    return commit.id.decode()
@@ -1,14 +1,21 @@
+import asyncio
 import json
 import re
 import subprocess
-from typing import TYPE_CHECKING, Union
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Union
 
 from githubkit.exception import RequestFailed
 from githubkit.rest.models import PullRequest, PullRequestSimple
 from nonebot import logger
 from nonebot.adapters.github import Bot, GitHubBot
 
-from src.utils.validation import PublishType, ValidationDict, validate_info
+from src.utils.json_io import dump_json, dumps, load_json, loads
+from src.utils.validation import PublishType, ValidationDict, async_validate_info
 
 from .config import plugin_config
 from .constants import (
@@ -20,9 +27,13 @@ from .constants import (
     BOT_HOMEPAGE_PATTERN,
     BOT_NAME_PATTERN,
     BRANCH_NAME_PREFIX,
+    COMMAND_OUTPUT_LIMIT,
+    COMMAND_READ_SIZE,
+    COMMAND_TIMEOUT,
     COMMIT_MESSAGE_PREFIX,
     ISSUE_FIELD_PATTERN,
     ISSUE_FIELD_TEMPLATE,
+    MAX_CONCURRENT_RESOLVES,
     NONEFLOW_MARKER,
     PLUGIN_CONFIG_PATTERN,
     PLUGIN_DESC_PATTERN,
@@ -36,6 +47,7 @@ from .constants import (
     SKIP_PLUGIN_TEST_COMMENT,
     TAGS_PATTERN,
 )
+from .git import commit_file
 from .models import RepoInfo
 from .render import render_comment
 
@@ -56,20 +68,87 @@ if TYPE_CHECKING:
     from githubkit.webhooks.models import Label as WebhookLabel
 
 
-def run_shell_command(command: list[str]):
+async def read_stream(stream: asyncio.StreamReader, limit: int) -> tuple[bytes, bool]:
+    """读取命令输出
+
+    超过限制的部分会被丢弃，但仍会继续读取，避免子进程因管道写满而阻塞
+    返回读取到的内容与是否被截断
+    """
+    data = bytearray()
+    truncated = False
+    while chunk := await stream.read(COMMAND_READ_SIZE):
+        remaining = limit - len(data)
+        if len(chunk) > remaining:
+            truncated = True
+        if remaining > 0:
+            data += chunk[:remaining]
+    return bytes(data), truncated
+
+
+async def run_process(
+    command: list[str],
+    timeout: float = COMMAND_TIMEOUT,
+    output_limit: int = COMMAND_OUTPUT_LIMIT,
+) -> subprocess.CompletedProcess[bytes]:
+    """异步运行命令
+
+    超时后会结束进程并抛出 subprocess.TimeoutExpired
+    返回值不为 0 时抛出 subprocess.CalledProcessError
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    assert process.stdout and process.stderr
+
+    async def communicate():
+        outputs = await asyncio.gather(
+            read_stream(process.stdout, output_limit),  # type: ignore
+            read_stream(process.stderr, output_limit),  # type: ignore
+        )
+        await process.wait()
+        return outputs
+
+    task = asyncio.create_task(communicate())
+    done, _ = await asyncio.wait({task}, timeout=timeout)
+    if not done:
+        # 子进程可能启动了其他进程并继承了管道，所以需要同时取消读取
+        process.kill()
+        task.cancel()
+        await process.wait()
+        raise subprocess.TimeoutExpired(command, timeout)
+    (stdout, stdout_truncated), (stderr, stderr_truncated) = task.result()
+
+    if stdout_truncated or stderr_truncated:
+        logger.warning(f"命令输出超过 {output_limit} 字节，超出部分已丢弃")
+
+    returncode = process.returncode
+    assert returncode is not None
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stdout, stderr)
+    return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+
+
+async def run_shell_command(command: list[str]):
     """运行 shell 命令
 
     如果遇到错误则抛出异常
     """
     logger.info(f"运行命令: {command}")
+    start = time.perf_counter()
     try:
-        r = subprocess.run(command, check=True, capture_output=True)
+        r = await run_process(command)
         logger.debug(f"命令输出: \n{r.stdout.decode()}")
+    except subprocess.TimeoutExpired:
+        logger.debug(f"命令运行超时，耗时 {time.perf_counter() - start:.2f} 秒")
+        raise
     except subprocess.CalledProcessError as e:
-        logger.debug("命令运行失败")
+        logger.debug(f"命令运行失败，耗时 {time.perf_counter() - start:.2f} 秒")
         logger.debug(f"命令输出: \n{e.stdout.decode()}")
         logger.debug(f"命令错误: \n{e.stderr.decode()}")
         raise
+    logger.debug(f"命令运行完成，耗时 {time.perf_counter() - start:.2f} 秒")
     return r
 
 
@@ -116,31 +195,81 @@ def get_type_by_commit_message(message: str) -> PublishType | None:
         return PublishType.ADAPTER
 
 
-def commit_and_push(result: ValidationDict, branch_name: str, issue_number: int):
-    """提交并推送"""
-    commit_message = f"{COMMIT_MESSAGE_PREFIX} {result['type'].value.lower()} {result['name']} (#{issue_number})"
+def get_commit_message(result: ValidationDict, issue_number: int) -> str:
+    """获取提交信息"""
+    return f"{COMMIT_MESSAGE_PREFIX} {result['type'].value.lower()} {result['name']} (#{issue_number})"
+
+
+def get_commit_email(result: ValidationDict) -> str:
+    """获取提交者邮箱"""
+    return f"{result['author']}@users.noreply.github.com"
+
+
+def git_command(cwd: Path | None = None) -> list[str]:
+    """获取 git 命令，指定了目录时在该目录中运行"""
+    if cwd is None:
+        return ["git"]
+    return ["git", "-C", str(cwd)]
 
-    run_shell_command(["git", "config", "--global", "user.name", result["author"]])
-    user_email = f"{result['author']}@users.noreply.github.com"
-    run_shell_command(["git", "config", "--global", "user.email", user_email])
-    run_shell_command(["git", "add", "-A"])
+
+async def commit_and_push(
+    result: ValidationDict,
+    branch_name: str,
+    issue_number: int,
+    cwd: Path | None = None,
+    fetch: bool = True,
+):
+    """提交并推送
+
+    提交者信息只在提交时传入，不修改全局配置，方便同时在多个工作树中提交
+    已经获取过远程分支时可将 fetch 设置为 False
+    """
+    git = git_command(cwd)
+    commit_message = get_commit_message(result, issue_number)
+    commit_command = [
+        *git,
+        "-c",
+        f"user.name={result['author']}",
+        "-c",
+        f"user.email={get_commit_email(result)}",
+        "commit",
+        "-m",
+        commit_message,
+    ]
+
+    await run_shell_command([*git, "add", "-A"])
     try:
-        run_shell_command(["git", "commit", "-m", commit_message])
+        await run_shell_command(commit_command)
     except Exception:
         # 如果提交失败，因为是 pre-commit hooks 格式化代码导致的，所以需要再次提交
-        run_shell_command(["git", "add", "-A"])
-        run_shell_command(["git", "commit", "-m", commit_message])
+        await run_shell_command([*git, "add", "-A"])
+        await run_shell_command(commit_command)
 
     try:
-        run_shell_command(["git", "fetch", "origin"])
-        r = run_shell_command(["git", "diff", f"origin/{branch_name}", branch_name])
+        if fetch:
+            await run_shell_command([*git, "fetch", "origin"])
+        r = await run_shell_command(
+            [*git, "diff", f"origin/{branch_name}", branch_name]
+        )
         if r.stdout:
             raise Exception
         else:
             logger.info("检测到本地分支与远程分支一致，跳过推送")
     except Exception:
         logger.info("检测到本地分支与远程分支不一致，尝试强制推送")
-        run_shell_command(["git", "push", "origin", branch_name, "-f"])
+        await run_shell_command([*git, "push", "origin", branch_name, "-f"])
+
+
+@asynccontextmanager
+async def create_worktree(ref: str) -> AsyncIterator[Path]:
+    """在临时目录中创建指向 ref 的工作树，退出时删除"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "worktree"
+        await run_shell_command(["git", "worktree", "add", "--detach", str(path), ref])
+        try:
+            yield path
+        finally:
+            await run_shell_command(["git", "worktree", "remove", "--force", str(path)])
 
 
 def extract_issue_number_from_ref(ref: str) -> int | None:
@@ -157,7 +286,7 @@ def extract_name_from_title(title: str, publish_type: PublishType) -> str | None
         return match.group(1)
 
 
-def validate_info_from_issue(
+async def validate_info_from_issue(
     issue: "IssuesOpenedPropIssue | IssuesReopenedPropIssue | IssueCommentCreatedPropIssue | Issue | WebhookIssue",
     publish_type: PublishType,
 ) -> ValidationDict:
@@ -173,10 +302,9 @@ def validate_info_from_issue(
             author = issue.user.login if issue.user else None
             homepage = ADAPTER_HOMEPAGE_PATTERN.search(body)
             tags = TAGS_PATTERN.search(body)
-            with plugin_config.input_config.adapter_path.open(
-                "r", encoding="utf-8"
-            ) as f:
-                data: list[dict[str, str]] = json.load(f)
+            data: list[dict[str, str]] = load_json(
+                plugin_config.input_config.adapter_path
+            )
 
             raw_data = {
                 "module_name": module_name.group(1).strip() if module_name else None,
@@ -210,10 +338,9 @@ def validate_info_from_issue(
             module_name = module_name.group(1).strip() if module_name else None
             project_link = project_link.group(1).strip() if project_link else None
             tags = tags.group(1).strip() if tags else None
-            with plugin_config.input_config.plugin_path.open(
-                "r", encoding="utf-8"
-            ) as f:
-                data: list[dict[str, str]] = json.load(f)
+            data: list[dict[str, str]] = load_json(
+                plugin_config.input_config.plugin_path
+            )
             raw_data = {
                 "module_name": module_name,
                 "project_link": project_link,
@@ -258,75 +385,127 @@ def validate_info_from_issue(
                 # 可能为插件测试未通过，或者插件未按规范编写
                 raw_data["name"] = project_link
 
-    return validate_info(publish_type, raw_data)
+    return await async_validate_info(publish_type, raw_data)
 
 
 async def resolve_conflict_pull_requests(
     pulls: list[PullRequestSimple] | list[PullRequest],
+    skip_mergeable: bool = False,
 ):
     """根据关联的议题提交来解决冲突
 
     直接重新提交之前分支中的内容
+    只获取一次远程分支，每个拉取请求在各自的工作树中同时处理，互不影响
+
+    skip_mergeable 为 True 时先在内存中合并主分支与拉取请求分支，跳过能直接合并的拉取请求
+    同一类型的发布都在同一个 JSON 文件末尾添加数据，按行合并总是冲突，所以仍会重新提交
     """
+    targets: list[tuple[PullRequestSimple | PullRequest, int, PublishType]] = []
     for pull in pulls:
         issue_number = extract_issue_number_from_ref(pull.head.ref)
         if not issue_number:
             logger.error(f"无法获取 {pull.title} 对应的议题编号")
             continue
 
-        logger.info(f"正在处理 {pull.title}")
         if pull.draft:
-            logger.info("拉取请求为草稿，跳过处理")
+            logger.info(f"{pull.title} 为草稿，跳过处理")
             continue
 
         publish_type = get_type_by_labels(pull.labels)
         if publish_type:
-            # 需要先获取远程分支，否则无法切换到对应分支
-            run_shell_command(["git", "fetch", "origin"])
-            # 因为当前分支为触发处理冲突的分支，所以需要切换到每个拉取请求对应的分支
-            run_shell_command(["git", "checkout", pull.head.ref])
-            # 获取数据
-            result = generate_validation_dict_from_file(
-                publish_type,
-                # 提交时的 commit message 中包含插件名称
-                # 但因为仓库内的 plugins.json 中没有插件名称，所以需要从标题中提取
-                extract_name_from_title(pull.title, publish_type)
-                if publish_type == PublishType.PLUGIN
-                else None,
-            )
-            # 回到主分支
-            run_shell_command(["git", "checkout", plugin_config.input_config.base])
-            # 切换到对应分支
-            run_shell_command(["git", "switch", "-C", pull.head.ref])
-            update_file(result)
-            commit_and_push(result, pull.head.ref, issue_number)
-            logger.info("拉取请求更新完毕")
+            targets.append((pull, issue_number, publish_type))
+
+    if not targets:
+        return
+
+    # 需要先获取远程分支，否则无法读取对应分支的内容
+    await run_shell_command(["git", "fetch", "origin"])
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RESOLVES)
+
+    async def resolve(
+        pull: PullRequestSimple | PullRequest,
+        issue_number: int,
+        publish_type: PublishType,
+    ):
+        async with semaphore:
+            try:
+                if skip_mergeable and await is_mergeable(pull):
+                    logger.info(f"{pull.title} 可以与主分支合并，跳过处理")
+                    return
+                await resolve_conflict_pull_request(pull, issue_number, publish_type)
+            except Exception as e:
+                # 单个拉取请求处理失败不影响其他拉取请求
+                logger.opt(exception=e).error(f"处理 {pull.title} 时出现错误")
+
+    await asyncio.gather(*(resolve(*target) for target in targets))
+
+
+async def is_mergeable(pull: PullRequestSimple | PullRequest) -> bool:
+    """拉取请求分支能否与主分支合并
+
+    与 git 的判断方式一致，通过 git merge-tree 在内存中合并两个分支
+    有冲突时命令返回 1，不会修改工作区与暂存区
+    需要 git 2.38 及以上版本，命令执行失败时视为无法合并，重新提交拉取请求
+    """
+    try:
+        await run_shell_command(
+            [
+                "git",
+                "merge-tree",
+                "--write-tree",
+                plugin_config.input_config.base,
+                f"origin/{pull.head.ref}",
+            ]
+        )
+    except subprocess.CalledProcessError as e:
+        if e.returncode != 1:
+            logger.warning(f"无法检查 {pull.title} 能否合并: {e.stderr.decode().strip()}")
+        return False
+    return True
+
+
+async def resolve_conflict_pull_request(
+    pull: PullRequestSimple | PullRequest,
+    issue_number: int,
+    publish_type: PublishType,
+):
+    """在主分支的基础上重新提交拉取请求分支中的内容"""
+    logger.info(f"正在处理 {pull.title}")
+    # 直接从远程分支中读取数据，不需要切换分支
+    result = await generate_validation_dict_from_ref(
+        publish_type,
+        f"origin/{pull.head.ref}",
+        # 提交时的 commit message 中包含插件名称
+        # 但因为仓库内的 plugins.json 中没有插件名称，所以需要从标题中提取
+        extract_name_from_title(pull.title, publish_type)
+        if publish_type == PublishType.PLUGIN
+        else None,
+    )
+    # 切换到对应分支，更新文件并提交
+    await update_branch(
+        result,
+        pull.head.ref,
+        issue_number,
+        base=plugin_config.input_config.base,
+        fetch=False,
+    )
+    logger.info(f"{pull.title} 更新完毕")
 
 
-def generate_validation_dict_from_file(
+def generate_validation_dict(
     publish_type: PublishType,
+    data: list[dict[str, Any]],
     name: str | None = None,
 ) -> ValidationDict:
-    """从文件中获取发布所需数据"""
-    match publish_type:
-        case PublishType.ADAPTER:
-            with plugin_config.input_config.adapter_path.open(
-                "r", encoding="utf-8"
-            ) as f:
-                data: list[dict[str, str]] = json.load(f)
-            raw_data = data[-1]
-        case PublishType.BOT:
-            with plugin_config.input_config.bot_path.open("r", encoding="utf-8") as f:
-                data: list[dict[str, str]] = json.load(f)
-            raw_data = data[-1]
-        case PublishType.PLUGIN:
-            with plugin_config.input_config.plugin_path.open(
-                "r", encoding="utf-8"
-            ) as f:
-                data: list[dict[str, str]] = json.load(f)
-            raw_data = data[-1]
-            assert name, "插件名称不能为空"
-            raw_data["name"] = name
+    """从文件内容中获取发布所需数据
+
+    最后一项即为拉取请求添加的数据
+    """
+    raw_data = data[-1]
+    if publish_type == PublishType.PLUGIN:
+        assert name, "插件名称不能为空"
+        raw_data["name"] = name
 
     return ValidationDict(
         valid=True,
@@ -338,36 +517,126 @@ def generate_validation_dict_from_file(
     )
 
 
-def update_file(result: ValidationDict) -> None:
-    """更新文件"""
-    new_data = result["data"]
-    match result["type"]:
+async def generate_validation_dict_from_ref(
+    publish_type: PublishType,
+    ref: str,
+    name: str | None = None,
+) -> ValidationDict:
+    """从指定提交的文件中获取发布所需数据
+
+    相当于 git show ref:path，不需要检出分支，也不会修改工作区与暂存区
+    """
+    r = await run_shell_command(["git", "show", f"{ref}:{get_repo_path(publish_type)}"])
+    return generate_validation_dict(publish_type, loads(r.stdout), name)
+
+
+def get_file_path(publish_type: PublishType, cwd: Path | None = None) -> Path:
+    """获取发布类型对应的文件路径
+
+    指定了工作树时返回工作树中对应的路径
+    """
+    match publish_type:
         case PublishType.ADAPTER:
             path = plugin_config.input_config.adapter_path
         case PublishType.BOT:
             path = plugin_config.input_config.bot_path
         case PublishType.PLUGIN:
             path = plugin_config.input_config.plugin_path
-            # nonebot2 仓库内只需要这部分数据
-            new_data = {
-                "module_name": new_data["module_name"],
-                "project_link": new_data["project_link"],
-                "author": new_data["author"],
-                "tags": new_data["tags"],
-                "is_official": new_data["is_official"],
-            }
+    if cwd is None:
+        return path
+    return cwd / get_repo_path(publish_type)
 
+
+def get_repo_path(publish_type: PublishType) -> str:
+    """获取发布类型对应的文件在仓库中的路径
+
+    配置中的路径相对于仓库根目录，也就是当前工作目录
+    """
+    path = get_file_path(publish_type)
+    return path.resolve().relative_to(Path.cwd().resolve()).as_posix()
+
+
+def get_file_data(result: ValidationDict) -> dict[str, Any]:
+    """获取需要添加至文件中的数据"""
+    new_data = result["data"]
+    if result["type"] == PublishType.PLUGIN:
+        # nonebot2 仓库内只需要这部分数据
+        new_data = {
+            "module_name": new_data["module_name"],
+            "project_link": new_data["project_link"],
+            "author": new_data["author"],
+            "tags": new_data["tags"],
+            "is_official": new_data["is_official"],
+        }
+    return new_data
+
+
+def update_file(result: ValidationDict, cwd: Path | None = None) -> None:
+    """更新文件"""
+    path = get_file_path(result["type"], cwd)
     logger.info(f"正在更新文件: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        data: list[dict[str, str]] = json.load(f)
-    with path.open("w", encoding="utf-8") as f:
-        data.append(new_data)
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        # 结尾加上换行符，不然会被 pre-commit fix
-        f.write("\n")
+    data: list[dict[str, str]] = load_json(path)
+    data.append(get_file_data(result))
+    # 使用缩进格式，结尾会加上换行符，不然会被 pre-commit fix
+    dump_json(path, data, indent=2)
     logger.info("文件更新完成")
 
 
+async def update_branch(
+    result: ValidationDict,
+    branch_name: str,
+    issue_number: int,
+    base: str | None = None,
+    fetch: bool = True,
+):
+    """在 base 的基础上更新文件，并提交推送至指定分支
+
+    没有指定 base 时使用当前分支
+    git_backend 为 dulwich 时在进程内完成，不修改工作区
+    否则通过 git 命令切换分支、更新文件后提交
+    指定了 base 时在临时工作树中操作，不影响当前工作区
+    """
+    if plugin_config.git_backend == "dulwich":
+        path = get_file_path(result["type"])
+        logger.info(f"正在更新文件: {path}")
+
+        def update(content: bytes) -> bytes:
+            data: list[dict[str, Any]] = loads(content)
+            data.append(get_file_data(result))
+            # 与 update_file 一致，使用缩进格式，保证内容符合 pre-commit 的要求
+            return dumps(data, indent=2)
+
+        start = time.perf_counter()
+        commit_id = await asyncio.to_thread(
+            commit_file,
+            path,
+            update,
+            get_commit_message(result, issue_number),
+            f"{result['author']} <{get_commit_email(result)}>",
+            branch_name,
+            base or "HEAD",
+            fetch=fetch,
+        )
+        if commit_id is None:
+            logger.info("检测到本地分支与远程分支一致，跳过推送")
+        else:
+            logger.info(
+                f"已推送提交 {commit_id} 至 {branch_name}，耗时 {time.perf_counter() - start:.2f} 秒"
+            )
+        return
+
+    if base is None:
+        await run_shell_command(["git", "switch", "-C", branch_name])
+        update_file(result)
+        await commit_and_push(result, branch_name, issue_number, fetch=fetch)
+        return
+
+    async with create_worktree(base) as worktree:
+        await run_shell_command([*git_command(worktree), "switch", "-C", branch_name])
+        update_file(result, worktree)
+        await commit_and_push(result, branch_name, issue_number, worktree, fetch)
+
+
 async def should_skip_plugin_test(
     bot: Bot,
     repo_info: RepoInfo,
@@ -513,11 +782,8 @@ async def trigger_registry_update(
             # 重新从议题中获取数据，并验证，防止中间有人修改了插件信息
             # 因为此时已经将新插件的信息添加到插件列表中
             # 直接将插件列表变成空列表，避免重新验证时出现重复报错
-            with plugin_config.input_config.plugin_path.open(
-                "w", encoding="utf-8"
-            ) as f:
-                json.dump([], f)
-            result = validate_info_from_issue(issue, publish_type)
+            dump_json(plugin_config.input_config.plugin_path, [])
+            result = await validate_info_from_issue(issue, publish_type)
             logger.debug(f"插件信息验证结果: {result}")
             if not result["valid"]:
                 logger.error("插件信息验证失败，跳过触发商店列表更新")
@@ -530,8 +796,7 @@ async def trigger_registry_update(
                 "data": json.dumps(result["data"]),
             }
         else:
-            with plugin_config.input_config.plugin_path.open() as f:
-                plugins = json.load(f)
+            plugins = load_json(plugin_config.input_config.plugin_path)
 
             if not plugins:
                 logger.error("插件列表为空，跳过触发商店列表更新")
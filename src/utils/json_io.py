@@ -0,0 +1,90 @@
+""" JSON 文件读写
+
+安装了 orjson 时使用 orjson 编解码，否则使用标准库 json
+
+两者输出的内容完全一致：
+- 紧凑格式：separators=(",", ":")，结尾没有换行符
+- 缩进格式：indent=2，结尾加上换行符，与 pre-commit 的要求一致
+
+datetime 与 dataclass 交给标准库处理，与标准库一样会报错
+UUID 与普通 Enum 仍会被 orjson 编码，而标准库会报错，本项目不会写入这两种类型
+"""
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# orjson 输出科学计数法时与标准库不同（1e16 与 1e+16）
+# 遇到这种情况时回退到标准库，保证输出完全一致
+ORJSON_EXPONENT_PATTERN = re.compile(rb"\de-?\d")
+# 标准库无法编码的类型不使用 orjson 编码
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+)
+
+
+def has_non_finite(data: Any) -> bool:
+    """数据中是否有 NaN 或 Infinity
+
+    orjson 会将其输出为 null，而标准库输出 NaN 与 Infinity
+    """
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(has_non_finite(value) for value in data.values())
+    if isinstance(data, list | tuple):
+        return any(has_non_finite(value) for value in data)
+    return False
+
+
+def loads(data: bytes | str) -> Any:
+    """解析 JSON 数据"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson 不支持 NaN 和超过 64 位的整数等，交给标准库处理
+            pass
+    return json.loads(data)
+
+
+def dumps(data: Any, indent: int | None = None) -> bytes:
+    """将数据编码为 JSON
+
+    indent 为 None 时输出紧凑格式，否则输出缩进格式并在结尾加上换行符
+    """
+    if orjson is not None and indent in (None, 2):
+        try:
+            content = orjson.dumps(
+                data,
+                option=ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent == 2 else 0),
+            )
+        except TypeError:
+            # 例如字典的键不是字符串，交给标准库处理
+            pass
+        else:
+            # 只有输出中有 null 时才可能包含 NaN 或 Infinity，避免每次都遍历数据
+            if not ORJSON_EXPONENT_PATTERN.search(content) and not (
+                b"null" in content and has_non_finite(data)
+            ):
+                return content + b"\n" if indent else content
+
+    if indent is None:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    return (json.dumps(data, ensure_ascii=False, indent=indent) + "\n").encode()
+
+
+def load_json(path: Path) -> Any:
+    """加载 JSON 文件"""
+    return loads(path.read_bytes())
+
+
+def dump_json(path: Path, data: Any, indent: int | None = None) -> None:
+    """保存 JSON 文件"""
+    path.write_bytes(dumps(data, indent))
@@ -0,0 +1,349 @@
+""" 包索引
+
+支持以下几种后端，通过环境变量选择：
+- pypi：PyPI JSON API，默认使用
+- simple：PEP 691 简单索引的 JSON 接口，可用于内部镜像
+- local：本地文件夹快照，每个项目保存为 {规范化名称}.json，内容与 PyPI JSON API 相同
+
+PACKAGE_INDEX_TYPE 为后端类型，PACKAGE_INDEX_URL 为索引地址或快照文件夹路径
+"""
+import abc
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, TypedDict
+
+import httpx
+from packaging.version import InvalidVersion, Version
+
+from src.utils.json_io import dump_json, load_json
+
+PACKAGE_INDEX_TYPE_ENV = "PACKAGE_INDEX_TYPE"
+""" 包索引后端类型的环境变量 """
+PACKAGE_INDEX_URL_ENV = "PACKAGE_INDEX_URL"
+""" 包索引地址或快照文件夹路径的环境变量 """
+
+PYPI_JSON_URL = "https://pypi.org/pypi"
+""" PyPI JSON API 地址 """
+PYPI_SIMPLE_URL = "https://pypi.org/simple"
+""" PyPI 简单索引地址 """
+
+# https://peps.python.org/pep-0691/#project-detail
+SIMPLE_JSON_CONTENT_TYPE = "application/vnd.pypi.simple.v1+json"
+# 包名中的分隔符，规范化时统一替换为 -
+# https://peps.python.org/pep-0503/#normalized-names
+NAME_SEPARATOR_PATTERN = re.compile(r"[-_.]+")
+# 源码包的扩展名
+SDIST_EXTENSIONS = (".tar.gz", ".zip")
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36"
+
+
+class ProjectInfo(TypedDict):
+    """项目信息"""
+
+    name: str
+    version: str
+    """最新版本号"""
+    upload_time: str | None
+    """最新版本的上传时间，ISO 8601 格式"""
+
+
+def normalize_name(name: str) -> str:
+    """规范化项目名称
+
+    例如：`Nonebot_Plugin.X` -> `nonebot-plugin-x`
+    """
+    return NAME_SEPARATOR_PATTERN.sub("-", name).lower()
+
+
+def parse_pypi_json(name: str, data: dict[str, Any]) -> ProjectInfo:
+    """解析 PyPI JSON API 返回的数据"""
+    urls = data.get("urls") or []
+    return {
+        "name": name,
+        "version": data["info"]["version"],
+        "upload_time": urls[0]["upload_time_iso_8601"] if urls else None,
+    }
+
+
+def get_file_version(filename: str) -> str | None:
+    """从文件名中获取版本号
+
+    支持 wheel 与源码包
+    """
+    if filename.endswith(".whl"):
+        return filename.split("-")[1]
+    for extension in SDIST_EXTENSIONS:
+        if filename.endswith(extension):
+            return filename.removesuffix(extension).rsplit("-", 1)[-1]
+
+
+def parse_version(version: str) -> Version | None:
+    """解析 PEP 440 版本号，无法解析时返回 None"""
+    try:
+        return Version(version)
+    except InvalidVersion:
+        return None
+
+
+def latest_version(versions: Iterable[str]) -> str | None:
+    """按照 PEP 440 的顺序选出最新的版本号
+
+    没有正式版本时才选择预发布版本，无法解析的版本号会被忽略
+    """
+    parsed: dict[str, Version] = {}
+    for version in versions:
+        if (parsed_version := parse_version(version)) is not None:
+            parsed[version] = parsed_version
+    releases = {
+        version: parsed_version
+        for version, parsed_version in parsed.items()
+        if not parsed_version.is_prerelease
+    }
+    candidates = releases or parsed
+    if not candidates:
+        return None
+    return max(candidates, key=candidates.__getitem__)
+
+
+def parse_simple_json(name: str, data: dict[str, Any]) -> ProjectInfo:
+    """解析 PEP 691 简单索引返回的数据
+
+    简单索引中没有最新版本，使用未撤回文件中最新的正式版本
+    没有正式版本时才使用预发布版本
+    """
+    # 文件名到规范化版本号的映射
+    versions: dict[str, str] = {}
+    for file in data.get("files", []):
+        if file.get("yanked"):
+            continue
+        if version := parse_version(get_file_version(file["filename"]) or ""):
+            versions[file["filename"]] = str(version)
+    latest = latest_version(versions.values())
+    if latest is None:
+        raise ValueError(f"项目 {name} 没有可用的文件")
+
+    # upload-time 需要 PEP 700 支持，不存在时为 None
+    upload_times = [
+        file["upload-time"]
+        for file in data["files"]
+        if versions.get(file["filename"]) == latest and file.get("upload-time")
+    ]
+    return {
+        "name": name,
+        "version": latest,
+        "upload_time": max(upload_times, default=None),
+    }
+
+
+class PackageIndex(abc.ABC):
+    """包索引"""
+
+    @abc.abstractmethod
+    def project_url(self, name: str) -> str | None:
+        """项目的网址
+
+        用于检查项目是否存在，本地快照没有网址时返回 None
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def exists(self, name: str) -> bool:
+        """项目是否存在"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_project(self, name: str) -> ProjectInfo:
+        """获取项目信息
+
+        获取失败时抛出 ValueError
+        """
+        raise NotImplementedError
+
+    def get_latest_version(self, name: str) -> str:
+        """获取项目的最新版本号
+
+        默认从项目信息中获取，后端可以提供更轻量的方式
+        """
+        return self.get_project(name)["version"]
+
+    def _get(self, url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        return httpx.get(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
+
+
+class PyPIJSONIndex(PackageIndex):
+    """PyPI JSON API
+
+    JSON API 返回的数据包含所有历史版本，只用于获取项目信息
+    使用 pypi.org 时，检查项目是否存在使用简单索引的网址
+    获取最新版本号使用简单索引的 JSON 接口，两者都比 JSON API 轻量得多
+    """
+
+    def __init__(self, url: str = PYPI_JSON_URL) -> None:
+        self.url = url.rstrip("/")
+        # 镜像不一定提供简单索引，只在使用 pypi.org 时启用
+        self._is_pypi = self.url == PYPI_JSON_URL
+
+    def json_url(self, name: str) -> str:
+        """项目 JSON API 的网址"""
+        return f"{self.url}/{name}/json"
+
+    def project_url(self, name: str) -> str:
+        if self._is_pypi:
+            return f"{PYPI_SIMPLE_URL}/{normalize_name(name)}/"
+        return self.json_url(name)
+
+    def exists(self, name: str) -> bool:
+        return self._get(self.project_url(name)).status_code == 200
+
+    def get_latest_version(self, name: str) -> str:
+        if self._is_pypi:
+            # 简单索引中可以跳过已撤回的版本，获取失败时使用 JSON API 中的版本号
+            try:
+                return SimpleIndex().get_latest_version(name)
+            except ValueError:
+                pass
+        return super().get_latest_version(name)
+
+    def get_project(self, name: str) -> ProjectInfo:
+        r = self._get(self.json_url(name))
+        if r.status_code == 200:
+            return parse_pypi_json(name, r.json())
+        raise ValueError(f"获取 PyPI 数据失败：{r.text}")
+
+
+class SimpleIndex(PackageIndex):
+    """PEP 691 简单索引"""
+
+    def __init__(self, url: str = PYPI_SIMPLE_URL) -> None:
+        self.url = url.rstrip("/")
+
+    def project_url(self, name: str) -> str:
+        return f"{self.url}/{normalize_name(name)}/"
+
+    def exists(self, name: str) -> bool:
+        return self._get(self.project_url(name)).status_code == 200
+
+    def get_project(self, name: str) -> ProjectInfo:
+        r = self._get(
+            self.project_url(name), headers={"Accept": SIMPLE_JSON_CONTENT_TYPE}
+        )
+        if r.status_code == 200:
+            return parse_simple_json(name, r.json())
+        raise ValueError(f"获取简单索引数据失败：{r.text}")
+
+
+class LocalIndex(PackageIndex):
+    """本地文件夹快照
+
+    每个项目保存为 {规范化名称}.json，内容与 PyPI JSON API 相同
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _project_path(self, name: str) -> Path:
+        return self.path / f"{normalize_name(name)}.json"
+
+    def project_url(self, name: str) -> None:
+        return None
+
+    def exists(self, name: str) -> bool:
+        return self._project_path(name).exists()
+
+    def get_project(self, name: str) -> ProjectInfo:
+        path = self._project_path(name)
+        if not path.exists():
+            raise ValueError(f"快照中不存在项目 {name}")
+        return parse_pypi_json(name, load_json(path))
+
+    def save(self, info: ProjectInfo) -> None:
+        """保存项目信息至快照
+
+        只保存 PyPI JSON API 中会用到的部分
+        """
+        if not self.path.exists():
+            self.path.mkdir(parents=True)
+
+        urls = []
+        if info["upload_time"] is not None:
+            urls.append({"upload_time_iso_8601": info["upload_time"]})
+        dump_json(
+            self._project_path(info["name"]),
+            {"info": {"version": info["version"]}, "urls": urls},
+        )
+
+
+class ProjectCache:
+    """项目信息缓存
+
+    以规范化名称为键，不同写法的项目名称共用同一条缓存
+    已经获取了项目信息时，获取最新版本号与检查是否存在都直接使用缓存
+    """
+
+    def __init__(self, index: PackageIndex) -> None:
+        self.index = index
+        self._projects: dict[str, ProjectInfo] = {}
+        self._versions: dict[str, str] = {}
+
+    def has_project(self, name: str) -> bool:
+        """是否已经确认项目存在"""
+        key = normalize_name(name)
+        return key in self._projects or key in self._versions
+
+    def get_project(self, name: str) -> ProjectInfo:
+        """获取项目信息"""
+        key = normalize_name(name)
+        if key not in self._projects:
+            self._projects[key] = self.index.get_project(name)
+        return self._projects[key]
+
+    def get_latest_version(self, name: str) -> str:
+        """获取项目的最新版本号"""
+        key = normalize_name(name)
+        if key in self._projects:
+            return self._projects[key]["version"]
+        if key not in self._versions:
+            self._versions[key] = self.index.get_latest_version(name)
+        return self._versions[key]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._projects.clear()
+        self._versions.clear()
+
+    def use_index(self, index: PackageIndex) -> None:
+        """切换包索引，并清空缓存"""
+        self.index = index
+        self.clear()
+
+
+def create_package_index(
+    index_type: str = "pypi", url: str | None = None
+) -> PackageIndex:
+    """根据配置创建包索引
+
+    index_type 可选 pypi、simple、local
+    """
+    match index_type:
+        case "pypi":
+            return PyPIJSONIndex(url or PYPI_JSON_URL)
+        case "simple":
+            return SimpleIndex(url or PYPI_SIMPLE_URL)
+        case "local":
+            if not url:
+                raise ValueError("本地快照需要设置文件夹路径")
+            return LocalIndex(Path(url))
+        case _:
+            raise ValueError(f"不支持的包索引类型：{index_type}")
+
+
+package_index = create_package_index(
+    os.environ.get(PACKAGE_INDEX_TYPE_ENV, "pypi"),
+    os.environ.get(PACKAGE_INDEX_URL_ENV),
+)
+"""包索引"""
+project_cache = ProjectCache(package_index)
+"""项目信息缓存"""
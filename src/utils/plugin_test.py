@@ -4,16 +4,49 @@
 
 在 GitHub Actions 中运行，通过 GitHub Event 文件获取所需信息。并将测试结果保存至 GitHub Action 的输出文件中。
 
-当前会输出 RESULT, OUTPUT, METADATA 三个数据，分别对应测试结果、测试输出、插件元数据。
+当前会输出 RESULT, OUTPUT, METADATA, LOG, DEPENDENCIES, PROFILE 六个数据，分别对应测试结果、测试输出、插件元数据、完整测试输出的引用、依赖的商店插件、加载耗时。
+
+加载耗时包括 init 与 load_plugin 的耗时，以及通过 -X importtime 获取的加载插件时导入耗时最长的模块。
+同时记录进程的峰值 RSS、加载插件时 tracemalloc 统计的内存分配，以及插件及其依赖的安装大小。
+因为 tracemalloc 会拖慢内存分配，内存分配在计时之外单独运行一次加载测试统计。
+设置 PLUGIN_TEST_REPEAT 环境变量时，加载测试会重复运行对应次数，耗时与内存取中位数。
+
+因为 OUTPUT 会被截断，完整的测试输出会压缩保存至 plugin_test/logs 文件夹中，文件名为内容的 SHA-256。
+
+设置 PACKAGE_INDEX_TYPE=simple 与 PACKAGE_INDEX_URL 环境变量时，使用对应的简单索引镜像安装插件。
+
+设置 PLUGIN_TEST_WHEELS_DIR 环境变量时，使用 pip 从该文件夹中的 wheel 离线安装插件。
+此时加载测试会通过 unshare 在没有网络的命名空间中运行；unshare 不可用时只将代理设置为无法连接的地址，
+遵循代理环境变量的请求会失败，但不能阻止所有的网络访问。
+同时设置 PLUGIN_TEST_STORE_PLUGINS_PATH 时从本地读取插件列表，整个测试过程无需访问网络。
+
+设置 PLUGIN_TEST_CACHE_DIR 环境变量时，多个测试共用该文件夹作为 poetry 与 pip 的下载缓存。
+
+调用 PluginTest.prepare_environment 可以预先创建已安装 NoneBot 的测试环境，测试时通过 environment 参数传入，只需再安装插件。
+通过 copy_environment 复制的测试环境也可以这样使用，例如依赖同一个库插件的插件共用库插件的测试环境。
+
+设置 PLUGIN_TEST_PACKAGE_STORE_DIR 环境变量时，虚拟环境中安装的文件会被替换为指向该文件夹的硬链接，
+多个测试环境中相同的文件在磁盘上只保存一份。该文件夹需要与测试文件夹位于同一文件系统。
+仓库中的文件是只读的，运行时修改自身安装文件的插件会加载失败，所以默认不开启。
 
 经测试可以直接在 Python 3.10+ 环境下运行，无需额外依赖。
 """
 # ruff: noqa: T201
 
+import csv
+import fcntl
+import gzip
+import hashlib
 import json
 import os
 import re
-from asyncio import create_subprocess_shell, run, subprocess
+import shutil
+import statistics
+import sys
+from asyncio import create_subprocess_shell, run, subprocess, to_thread
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from functools import cache
 from pathlib import Path
 from urllib.request import urlopen
 
@@ -27,9 +60,57 @@ ISSUE_PATTERN = r"### {}\s+([^\s#].*?)(?=(?:\s+###|$))"
 PROJECT_LINK_PATTERN = re.compile(ISSUE_PATTERN.format("PyPI 项目名"))
 MODULE_NAME_PATTERN = re.compile(ISSUE_PATTERN.format("插件 import 包名"))
 CONFIG_PATTERN = re.compile(r"### 插件配置项\s+```(?:\w+)?\s?([\s\S]*?)```")
+# 包索引配置，与 src.utils.package_index 使用相同的环境变量
+PACKAGE_INDEX_TYPE_ENV = "PACKAGE_INDEX_TYPE"
+PACKAGE_INDEX_URL_ENV = "PACKAGE_INDEX_URL"
+# 离线测试时使用的 wheel 文件夹与插件列表文件
+WHEELS_DIR_ENV = "PLUGIN_TEST_WHEELS_DIR"
+STORE_PLUGINS_PATH_ENV = "PLUGIN_TEST_STORE_PLUGINS_PATH"
+# 离线测试时使用的代理，指向无法连接的端口
+OFFLINE_PROXY = "http://127.0.0.1:9"
+PROXY_ENVS = ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY")
+# 在没有网络的命名空间中运行命令
+NETWORK_SANDBOX_COMMAND = "unshare --net --map-root-user"
+# 多个插件测试共用的下载缓存文件夹与大小上限（字节）
+CACHE_DIR_ENV = "PLUGIN_TEST_CACHE_DIR"
+CACHE_SIZE_ENV = "PLUGIN_TEST_CACHE_SIZE"
+DEFAULT_CACHE_SIZE = 5 * 1024**3
+# 多个插件测试共用的包文件仓库
+PACKAGE_STORE_DIR_ENV = "PLUGIN_TEST_PACKAGE_STORE_DIR"
+# 预先创建测试环境时安装的包
+BASE_PACKAGE = "nonebot2"
+# 加载插件的开始与结束标记，结束标记后为 init 与 load_plugin 的耗时
+PROFILE_START_MARKER = "PLUGIN_TEST_PROFILE_START"
+PROFILE_END_MARKER = "PLUGIN_TEST_PROFILE_END"
+# -X importtime 的输出
+# import time:       self [us] | cumulative | imported package
+# import time:       123 |        456 |   nonebot_plugin_x
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+# 记录导入耗时最长的模块数量
+PROFILE_TOP_N = 10
+# 重复运行加载测试的次数
+REPEAT_ENV = "PLUGIN_TEST_REPEAT"
+# 设置后加载测试开启 tracemalloc 统计内存分配
+TRACEMALLOC_ENV = "PLUGIN_TEST_TRACEMALLOC"
+# 多次运行时取中位数的数据，以及保留每次运行结果的数据
+PROFILE_METRICS = ("init", "load", "import", "rss")
+PROFILE_SAMPLES = ("load", "rss")
+# 虚拟环境自带的包，不计入插件的安装大小
+VENV_DISTRIBUTIONS = {"pip", "setuptools", "wheel"}
+# 测试时生成的文件，复制测试环境时不需要
+TEST_FILES = {"output.txt", "summary.txt", "runner.py", ".env", ".env.prod"}
+# 包名中的分隔符，规范化时统一替换为 -
+# 与 src.utils.package_index 中的相同，本脚本需要单独运行所以不能导入
+NAME_SEPARATOR_PATTERN = re.compile(r"[-_.]+")
+# pyproject.toml 中依赖的版本约束，可能直接是字符串，也可能在内联表的 version 中
+DEPENDENCY_VERSION_PATTERN = re.compile(r'^(\s*(?:\{.*\bversion\s*=\s*)?)"[^"]*"')
 
 RUNNER = """import json
 import os
+import resource
+import sys
+import time
+import tracemalloc
 
 from nonebot import init, load_plugin, require, logger
 from pydantic import BaseModel
@@ -41,8 +122,28 @@ class SetEncoder(json.JSONEncoder):
             return list(obj)
         return json.JSONEncoder.default(self, obj)
 
+start = time.perf_counter()
 init()
+init_time = time.perf_counter() - start
+
+# tracemalloc 会拖慢内存分配，只在单独统计内存分配的那次运行中开启
+trace = bool(os.environ.get("PLUGIN_TEST_TRACEMALLOC"))
+sys.stderr.write("PLUGIN_TEST_PROFILE_START\\n")
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
 plugin = load_plugin("{}")
+load_time = time.perf_counter() - start
+profile = {{
+    "init": round(init_time * 1000, 3),
+    "load": round(load_time * 1000, 3),
+    # Linux 下 ru_maxrss 的单位为 KB
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+}}
+if trace:
+    profile["allocated"], _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+sys.stderr.write(f"PLUGIN_TEST_PROFILE_END {{json.dumps(profile)}}\\n")
 
 if not plugin:
     exit(1)
@@ -67,6 +168,28 @@ else:
 """
 
 
+def get_int_env(name: str, default: int) -> int:
+    """获取整数类型的环境变量，未设置或无法解析时返回默认值"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        print(f"环境变量 {name} 的值不是整数，使用默认值 {default}")
+        return default
+
+
+@cache
+def get_network_sandbox() -> str:
+    """获取断开网络运行命令的前缀
+
+    当前环境不支持时返回空字符串
+    """
+    if shutil.which("unshare") is None:
+        return ""
+    if os.system(f"{NETWORK_SANDBOX_COMMAND} true > /dev/null 2>&1"):
+        return ""
+    return f"{NETWORK_SANDBOX_COMMAND} "
+
+
 def strip_ansi(text: str | None) -> str:
     """去除 ANSI 转义字符"""
     if not text:
@@ -75,37 +198,474 @@ def strip_ansi(text: str | None) -> str:
     return ansi_escape.sub("", text)
 
 
+def save_log(directory: Path, text: str) -> str:
+    """压缩保存完整日志
+
+    文件名为内容的 SHA-256，相同的内容只会保存一次
+
+    返回日志的引用，即内容的 SHA-256
+    """
+    data = text.encode()
+    ref = hashlib.sha256(data).hexdigest()
+    path = directory / f"{ref}.log.gz"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        # 先写入临时文件再重命名，防止并行测试时读取到不完整的文件
+        # mtime 固定为 0，保证相同内容压缩后的结果也相同
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp_path.write_bytes(gzip.compress(data, mtime=0))
+        temp_path.replace(path)
+    return ref
+
+
+def load_log(directory: Path, ref: str) -> str:
+    """读取压缩保存的日志"""
+    return gzip.decompress((directory / f"{ref}.log.gz").read_bytes()).decode()
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """文件锁
+
+    shared 为 True 时获取共享锁，可以与其他共享锁同时持有
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@asynccontextmanager
+async def async_file_lock(path: Path, shared: bool = False) -> AsyncIterator[None]:
+    """异步文件锁
+
+    在线程中等待锁，等待时不阻塞同一进程中的其他测试
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        await to_thread(fcntl.flock, f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def file_digest(path: Path) -> str:
+    """文件内容的 SHA-256"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def copy_environment(source: Path, target: Path) -> None:
+    """复制测试环境
+
+    site-packages 中只读的文件使用硬链接复制，其他文件直接复制
+    开启包文件仓库时安装的文件都是仓库中只读文件的硬链接，可以直接共用
+    可写的文件不使用硬链接，防止运行时写入自身安装文件的插件修改原环境与其他复制的环境
+    测试时生成的文件不会被复制，复制完成后才重命名为目标文件夹
+
+    .venv/bin 中脚本的 shebang 仍指向原环境，所以在环境中只通过 .venv/bin/python 运行命令
+    """
+
+    def ignore(directory: str, names: list[str]) -> set[str]:
+        if Path(directory) == source:
+            return TEST_FILES.intersection(names)
+        return set()
+
+    def copy(src: str, dst: str) -> None:
+        if "site-packages" in Path(src).parts and not os.stat(src).st_mode & 0o222:
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        shutil.copy2(src, dst)
+
+    temp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    shutil.copytree(source, temp_path, symlinks=True, ignore=ignore, copy_function=copy)
+    temp_path.replace(target)
+
+
+def unpin_dependency(path: Path, package: str) -> None:
+    """将测试环境中依赖的版本约束改为 *
+
+    poetry add 会以 ^<最新版本> 记录依赖，复制该环境测试其他插件时
+    插件需要旧版本的依赖，poetry 也可以降级
+    """
+    pyproject = path / "pyproject.toml"
+    if not pyproject.exists():
+        return
+
+    name = NAME_SEPARATOR_PATTERN.sub("-", package).lower()
+    lines = pyproject.read_text(encoding="utf8").splitlines(keepends=True)
+    section = None
+    for i, line in enumerate(lines):
+        if line.startswith("["):
+            section = line.strip()
+            continue
+        key, sep, value = line.partition("=")
+        if (
+            section != "[tool.poetry.dependencies]"
+            or not sep
+            or NAME_SEPARATOR_PATTERN.sub("-", key.strip().strip('"')).lower() != name
+        ):
+            continue
+        lines[i] = key + sep + DEPENDENCY_VERSION_PATTERN.sub(r'\1"*"', value)
+    pyproject.write_text("".join(lines), encoding="utf8")
+
+
+def parse_import_profile(
+    lines: list[str], top: int = PROFILE_TOP_N
+) -> tuple[dict | None, list[str]]:
+    """解析加载插件时 -X importtime 的输出
+
+    只统计开始与结束标记之间，即 load_plugin 时导入的模块
+    返回加载耗时与去除 importtime 输出后的其他输出，没有结束标记时加载耗时为 None
+
+    加载耗时单位为毫秒，包括 init 与 load_plugin 的耗时、导入的总耗时，
+    以及自身导入耗时最长的 top 个模块
+    """
+    others: list[str] = []
+    # (模块名, 自身耗时, 累计耗时, 缩进)
+    modules: list[tuple[str, int, int, int]] = []
+    profile = None
+    loading = False
+    for line in lines:
+        if match := IMPORT_TIME_PATTERN.match(line):
+            if loading:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us), int(cumulative_us), len(indent)))
+        elif line.startswith("import time: self [us]"):
+            continue
+        elif line == PROFILE_START_MARKER:
+            loading = True
+        elif line.startswith(PROFILE_END_MARKER):
+            loading = False
+            profile = json.loads(line.removeprefix(PROFILE_END_MARKER))
+        else:
+            others.append(line)
+
+    if profile is None:
+        return None, others
+
+    # 缩进最少的模块是直接导入的模块，它们的累计耗时之和即为导入的总耗时
+    indent = min((module[3] for module in modules), default=0)
+    profile["import"] = (
+        sum(module[2] for module in modules if module[3] == indent) / 1000
+    )
+    profile["modules"] = [
+        {"name": name, "self": self_us / 1000, "cumulative": cumulative_us / 1000}
+        for name, self_us, cumulative_us, _ in sorted(
+            modules, key=lambda module: module[1], reverse=True
+        )[:top]
+    ]
+    return profile, others
+
+
+def merge_profiles(profiles: list[dict]) -> dict:
+    """合并多次运行的加载耗时
+
+    数值取中位数，导入耗时最长的模块使用第一次运行的结果
+    同时保留每次运行的加载耗时与峰值 RSS，用于判断性能是否退化
+    """
+    profile = dict(profiles[0])
+    for key in PROFILE_METRICS:
+        profile[key] = statistics.median(p[key] for p in profiles)
+    profile["samples"] = {key: [p[key] for p in profiles] for key in PROFILE_SAMPLES}
+    return profile
+
+
+def get_installed_size(venv: Path) -> int:
+    """虚拟环境中插件及其依赖的安装大小
+
+    根据 dist-info 中的 RECORD 文件统计，不包括运行时生成的文件与虚拟环境自带的包
+    """
+    size = 0
+    for dist_info in venv.glob("lib/python*/site-packages/*.dist-info"):
+        if get_distribution_key(dist_info.name)[0] in VENV_DISTRIBUTIONS:
+            continue
+        record = dist_info / "RECORD"
+        if not record.exists():
+            continue
+        with open(record, encoding="utf8", newline="") as f:
+            for row in csv.reader(f):
+                if len(row) == 3 and row[2].isdigit():
+                    size += int(row[2])
+    return size
+
+
+def get_distribution_key(filename: str) -> tuple[str, str]:
+    """获取 wheel 或 dist-info 文件夹名称中的包名与版本号
+
+    例如：`nonebot_plugin_x-0.1.0-py3-none-any.whl` -> `("nonebot-plugin-x", "0.1.0")`
+    """
+    name, version = filename.removesuffix(".dist-info").split("-")[:2]
+    return NAME_SEPARATOR_PATTERN.sub("-", name).lower(), version
+
+
+class WheelCache:
+    """多个插件测试共用的下载缓存
+
+    poetry 与 pip 的缓存都指向同一个文件夹
+    每次安装后根据虚拟环境中已安装的包找到用到的 wheel，更新其修改时间，并统计节省的下载量
+    pip 的 HTTP 缓存以请求的哈希命名，无法对应到安装的包，所以节省的下载量只统计 poetry 缓存中的 wheel
+
+    大小与淘汰都针对缓存中所有的文件，超过大小上限时按照最后访问或修改的时间淘汰最久未使用的文件
+    安装时持有共享锁，统计与淘汰时持有独占锁，可以在多个测试同时运行时使用
+    """
+
+    def __init__(self, path: Path, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.stats_path = path / "stats.json"
+        self.lock_path = path / ".lock"
+
+    def get_env(self) -> dict[str, str]:
+        """让安装工具使用缓存的环境变量"""
+        return {
+            "POETRY_CACHE_DIR": str(self.path / "poetry"),
+            "PIP_CACHE_DIR": str(self.path / "pip"),
+        }
+
+    def lock(self):
+        return file_lock(self.lock_path)
+
+    def install_lock(self):
+        """安装时持有的共享锁，防止正在使用的文件被淘汰"""
+        return async_file_lock(self.lock_path, shared=True)
+
+    def wheels(self) -> dict[str, Path]:
+        """缓存中所有的 wheel"""
+        return {path.name: path for path in self.path.rglob("*.whl")}
+
+    def files(self) -> list[Path]:
+        """缓存中所有的文件，不包括统计信息与锁"""
+        return [
+            path
+            for path in self.path.rglob("*")
+            if path.is_file() and path not in (self.stats_path, self.lock_path)
+        ]
+
+    def size(self) -> int:
+        """缓存的总大小"""
+        return sum(path.stat().st_size for path in self.files())
+
+    def stats(self) -> dict[str, int]:
+        """缓存的统计信息
+
+        saved 为累计节省的下载量，downloaded 为累计下载量，单位为字节
+        """
+        if not self.stats_path.exists():
+            return {"saved": 0, "downloaded": 0}
+        with open(self.stats_path, encoding="utf8") as f:
+            return json.load(f)
+
+    def record(self, before: set[str], venv: Path) -> int:
+        """记录一次安装
+
+        before 为安装前缓存中的 wheel，venv 为安装的虚拟环境
+        返回本次安装节省的下载量
+        """
+        installed = {
+            get_distribution_key(path.name)
+            for path in venv.glob("lib/python*/site-packages/*.dist-info")
+        }
+        saved = downloaded = 0
+        with self.lock():
+            for name, path in self.wheels().items():
+                if get_distribution_key(name) not in installed:
+                    continue
+                # 更新修改时间，淘汰时最后才会被删除
+                path.touch()
+                if name in before:
+                    saved += path.stat().st_size
+                else:
+                    downloaded += path.stat().st_size
+
+            stats = self.stats()
+            stats["saved"] += saved
+            stats["downloaded"] += downloaded
+            with open(self.stats_path, "w", encoding="utf8") as f:
+                json.dump(stats, f)
+
+            self.prune()
+        return saved
+
+    def prune(self) -> None:
+        """淘汰最久未使用的文件，直到不超过大小上限
+
+        pip 读取 HTTP 缓存时不会修改文件，所以同时参考最后访问时间
+        """
+        size = self.size()
+        if size <= self.max_size:
+            return
+
+        for path in sorted(
+            self.files(), key=lambda p: max(p.stat().st_atime, p.stat().st_mtime)
+        ):
+            size -= path.stat().st_size
+            path.unlink()
+            if size <= self.max_size:
+                break
+
+
+class PackageStore:
+    """多个插件测试共用的包文件仓库
+
+    安装完成后，将虚拟环境 site-packages 中的文件按内容哈希保存至仓库，
+    并把虚拟环境中的文件替换为指向仓库的硬链接，相同的文件在磁盘与页缓存中只有一份
+    可执行文件与普通文件分开保存，因为硬链接共享文件权限
+
+    仓库中的文件被设置为只读，防止某个测试修改后影响其他测试环境
+    副作用是运行时写入自身安装文件的插件会在加载测试中失败
+    链接时持有共享锁，清理时持有独占锁，可以在多个测试同时运行时使用
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.objects_dir = path / "objects"
+
+    def lock(self, shared: bool = False):
+        return file_lock(self.path / ".lock", shared)
+
+    def object_path(self, path: Path) -> Path:
+        """文件在仓库中的保存路径"""
+        digest = file_digest(path)
+        if path.stat().st_mode & 0o111:
+            digest += "-exec"
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def link(self, venv: Path) -> int:
+        """将虚拟环境中安装的文件替换为指向仓库的硬链接
+
+        返回因此节省的磁盘空间，即仓库中已有的文件大小
+        """
+        saved = 0
+        with self.lock(shared=True):
+            for site_packages in venv.glob("lib/python*/site-packages"):
+                for path in site_packages.rglob("*"):
+                    if path.is_symlink() or not path.is_file():
+                        continue
+                    try:
+                        saved += self._link_file(path)
+                    except OSError as e:
+                        # 跨文件系统等情况无法创建硬链接，保留原文件
+                        print(f"文件 {path} 链接失败：{e}")
+                        return saved
+        return saved
+
+    def _link_file(self, path: Path) -> int:
+        target = self.object_path(path)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                # 仓库中还没有该文件，直接将当前文件加入仓库
+                os.link(path, target)
+                target.chmod(target.stat().st_mode & ~0o222)
+                return 0
+            except FileExistsError:
+                # 其他测试同时加入了相同的文件
+                pass
+
+        stat = path.stat()
+        if os.path.samestat(stat, target.stat()):
+            return 0
+        # 先创建临时链接再替换，保证虚拟环境中的文件始终完整
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        os.link(target, temp_path)
+        temp_path.replace(path)
+        return stat.st_size
+
+    def prune(self) -> int:
+        """删除仓库中不再被任何测试环境使用的文件
+
+        返回释放的磁盘空间
+        """
+        freed = 0
+        with self.lock():
+            for path in self.objects_dir.glob("*/*"):
+                stat = path.stat()
+                if stat.st_nlink == 1:
+                    freed += stat.st_size
+                    path.unlink()
+        return freed
+
+    def size(self) -> int:
+        """仓库的总大小"""
+        return sum(path.stat().st_size for path in self.objects_dir.glob("*/*"))
+
+
+@cache
 def get_plugin_list() -> dict[str, str]:
     """获取插件列表
 
     通过 package_name 获取 module_name
+
+    设置了插件列表文件时从本地读取，否则从商店下载
     """
-    with urlopen(STORE_PLUGINS_URL) as response:
-        plugins = json.loads(response.read())
+    store_plugins_path = os.environ.get(STORE_PLUGINS_PATH_ENV)
+    if store_plugins_path:
+        with open(store_plugins_path, encoding="utf8") as f:
+            plugins = json.load(f)
+    else:
+        with urlopen(STORE_PLUGINS_URL) as response:
+            plugins = json.loads(response.read())
 
     return {plugin["project_link"]: plugin["module_name"] for plugin in plugins}
 
 
-PLUGIN_LIST = get_plugin_list()
-
-
 class PluginTest:
     def __init__(
-        self, project_link: str, module_name: str, config: str | None = None
+        self,
+        project_link: str,
+        module_name: str,
+        config: str | None = None,
+        environment: Path | None = None,
     ) -> None:
         self.project_link = project_link
         self.module_name = module_name
         self.config = config
+        # 预先创建的测试环境，设置后直接在其中安装插件
+        self.environment = environment
 
         self._create = False
         self._run = False
         self._deps = []
+        self._profile = None
+        # 加载测试的运行次数，多次运行时取中位数
+        self.repeat = max(get_int_env(REPEAT_ENV, 1), 1)
 
         # 输出信息
         self._output_lines: list[str] = []
 
         # 插件测试目录
         self.test_dir = Path("plugin_test")
+        # 设置了 wheel 文件夹时，使用 pip 从本地离线安装，不使用 poetry
+        wheels_dir = os.environ.get(WHEELS_DIR_ENV)
+        self.wheels_dir = Path(wheels_dir).resolve() if wheels_dir else None
+        # 设置了缓存文件夹时，与其他测试共用下载缓存
+        cache_dir = os.environ.get(CACHE_DIR_ENV)
+        self.cache = (
+            WheelCache(
+                Path(cache_dir).resolve(),
+                get_int_env(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE),
+            )
+            if cache_dir
+            else None
+        )
+        # 设置了包文件仓库时，与其他测试共用安装的文件
+        package_store_dir = os.environ.get(PACKAGE_STORE_DIR_ENV)
+        self.package_store = (
+            PackageStore(Path(package_store_dir).resolve())
+            if package_store_dir
+            else None
+        )
         # 通过环境变量获取 GITHUB 输出文件位置
         self.github_output_file = Path(os.environ.get("GITHUB_OUTPUT", ""))
         self.github_step_summary_file = Path(os.environ.get("GITHUB_STEP_SUMMARY", ""))
@@ -122,6 +682,8 @@ class PluginTest:
     @property
     def path(self) -> Path:
         """插件测试目录"""
+        if self.environment is not None:
+            return self.environment
         # 替换 : 为 -，防止文件名不合法
         key = self.key.replace(":", "-")
         return self.test_dir / f"{key}-test"
@@ -131,7 +693,17 @@ class PluginTest:
         if not self.test_dir.exists():
             self.test_dir.mkdir()
 
+        cached_wheels = set(self.cache.wheels()) if self.cache else set()
         await self.create_poetry_project()
+        if self.cache and self._create:
+            # 等待其他测试安装完成时不阻塞事件循环
+            saved = await to_thread(
+                self.cache.record, cached_wheels, self.path / ".venv"
+            )
+            print(f"项目 {self.project_link} 使用缓存节省下载 {saved} 字节。")
+        if self.package_store and self._create:
+            saved = self.package_store.link(self.path / ".venv")
+            print(f"项目 {self.project_link} 使用包文件仓库节省空间 {saved} 字节。")
         if self._create:
             await self.show_package_info()
             await self.show_plugin_dependencies()
@@ -140,14 +712,20 @@ class PluginTest:
         # 输出测试结果
         with open(self.github_output_file, "a", encoding="utf8") as f:
             f.write(f"RESULT={self._run}\n")
+            f.write(f"DEPENDENCIES={json.dumps(self._deps)}\n")
+            if self._profile:
+                f.write(f"PROFILE={json.dumps(self._profile)}\n")
         # 输出测试输出
         output = "\n".join(self._output_lines)
+        # 保存完整的测试输出，防止截断后丢失信息
+        log = save_log(self.test_dir / "logs", output)
         # GitHub 不支持 ANSI 转义字符所以去掉
         ansiless_output = strip_ansi(output)
         # 限制输出长度，防止评论过长，评论最大长度为 65536
         ansiless_output = ansiless_output[:50000]
         with open(self.github_output_file, "a", encoding="utf8") as f:
             f.write(f"OUTPUT<<EOF\n{ansiless_output}\nEOF\n")
+            f.write(f"LOG={log}\n")
         # 输出至作业摘要
         with open(self.github_step_summary_file, "a", encoding="utf8") as f:
             summary = f"插件 {self.project_link} 加载测试结果：{'通过' if self._run else '未通过'}\n"
@@ -162,38 +740,113 @@ class PluginTest:
         env.pop("VIRTUAL_ENV", None)
         # 启用 LOGURU 的颜色输出
         env["LOGURU_COLORIZE"] = "true"
+        if self.cache:
+            env.update(self.cache.get_env())
+        # 离线安装时禁止 pip 访问包索引，其他请求通过代理阻止
+        if self.wheels_dir:
+            env["PIP_NO_INDEX"] = "1"
+            for name in PROXY_ENVS:
+                env[name] = env[name.lower()] = OFFLINE_PROXY
+            env.pop("NO_PROXY", None)
+            env.pop("no_proxy", None)
         return env
 
+    def get_source_command(self) -> str | None:
+        """获取添加包索引的命令
+
+        配置了简单索引时，将其设置为 poetry 的主要源
+        其他包索引类型不影响安装
+        """
+        index_type = os.environ.get(PACKAGE_INDEX_TYPE_ENV)
+        index_url = os.environ.get(PACKAGE_INDEX_URL_ENV)
+        if index_type == "simple" and index_url:
+            return f"poetry source add --priority=primary mirror {index_url}"
+
+    def get_create_command(self) -> str:
+        """获取创建测试环境的命令"""
+        if self.wheels_dir:
+            return f"{sys.executable} -m venv .venv"
+        commands = [
+            "poetry init -n",
+            'sed -i "s/\\^/~/g" pyproject.toml',
+            "poetry config virtualenvs.in-project true --local",
+            "poetry env info --ansi",
+        ]
+        if source_command := self.get_source_command():
+            commands.append(source_command)
+        return " && ".join(commands)
+
+    def get_install_command(self, *packages: str, unpinned: bool = False) -> str:
+        """获取在测试环境中安装插件的命令
+
+        默认安装当前测试的插件
+        unpinned 为真时 poetry 会以 * 作为版本约束记录这些依赖，而不是 ^<最新版本>
+        """
+        packages = packages or (self.project_link,)
+        if self.wheels_dir:
+            packages_str = " ".join(packages)
+            return f".venv/bin/python -m pip install --no-index --find-links {self.wheels_dir} {packages_str}"
+        if unpinned:
+            packages = tuple(f"'{package}@*'" for package in packages)
+        return f"poetry add {' '.join(packages)}"
+
+    @classmethod
+    async def prepare_environment(cls, path: Path, *packages: str) -> bool:
+        """预先创建测试环境
+
+        环境中已经安装了 NoneBot 与 packages，测试插件时作为 environment 参数传入
+        这些依赖不限制版本，之后安装的插件需要旧版本时 poetry 仍然可以降级
+        返回是否创建成功
+        """
+        path.mkdir(parents=True)
+        test = cls(BASE_PACKAGE, "nonebot", environment=path)
+        await test._create_project(
+            f"{test.get_create_command()} && "
+            f"{test.get_install_command(BASE_PACKAGE, *packages, unpinned=True)}"
+        )
+        return test._create
+
     async def create_poetry_project(self) -> None:
-        if not self.path.exists():
+        if self.environment is not None:
+            # 预先创建的环境中已经安装了 NoneBot，只需安装插件
+            await self._create_project(self.get_install_command())
+        elif not self.path.exists():
             self.path.mkdir()
+            await self._create_project(
+                f"{self.get_create_command()} && {self.get_install_command()}"
+            )
+        else:
+            self._log_output(f"项目 {self.project_link} 已存在，跳过创建。")
+            self._create = True
+
+    async def _create_project(self, command: str) -> None:
+        async with self.cache.install_lock() if self.cache else nullcontext():
             proc = await create_subprocess_shell(
-                f"""poetry init -n && sed -i "s/\\^/~/g" pyproject.toml && poetry config virtualenvs.in-project true --local && poetry env info --ansi && poetry add {self.project_link}""",
+                command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=self.path,
                 env=self.get_env(),
             )
             stdout, stderr = await proc.communicate()
-            code = proc.returncode
+        code = proc.returncode
 
-            self._create = not code
-            if self._create:
-                print(f"项目 {self.project_link} 创建成功。")
-                for i in stdout.decode().strip().splitlines():
-                    print(f"    {i}")
-            else:
-                self._log_output(f"项目 {self.project_link} 创建失败：")
-                for i in stderr.decode().strip().splitlines():
-                    self._log_output(f"    {i}")
+        self._create = not code
+        if self._create:
+            print(f"项目 {self.project_link} 创建成功。")
+            for i in stdout.decode().strip().splitlines():
+                print(f"    {i}")
         else:
-            self._log_output(f"项目 {self.project_link} 已存在，跳过创建。")
-            self._create = True
+            self._log_output(f"项目 {self.project_link} 创建失败：")
+            for i in stderr.decode().strip().splitlines():
+                self._log_output(f"    {i}")
 
     async def show_package_info(self) -> None:
         if self.path.exists():
             proc = await create_subprocess_shell(
-                f"poetry show {self.project_link} --ansi",
+                f".venv/bin/python -m pip show {self.project_link}"
+                if self.wheels_dir
+                else f"poetry show {self.project_link} --ansi",
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=self.path,
@@ -211,7 +864,9 @@ class PluginTest:
     async def show_plugin_dependencies(self) -> None:
         if self.path.exists():
             proc = await create_subprocess_shell(
-                "poetry export --without-hashes",
+                ".venv/bin/python -m pip freeze"
+                if self.wheels_dir
+                else "poetry export --without-hashes",
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=self.path,
@@ -247,15 +902,8 @@ class PluginTest:
                     )
                 )
 
-            proc = await create_subprocess_shell(
-                "poetry run python runner.py",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.path,
-                env=self.get_env(),
-            )
-            stdout, stderr = await proc.communicate()
-            code = proc.returncode
+            # 通过 -X importtime 获取导入模块的耗时
+            code, stdout, stderr = await self._run_runner(self.get_env())
 
             self._run = not code
 
@@ -263,12 +911,47 @@ class PluginTest:
             self._log_output(f"插件 {self.module_name} 加载{status}：")
 
             _out = stdout.decode().strip().splitlines()
-            _err = stderr.decode().strip().splitlines()
+            # importtime 的输出只用于统计，不记录在测试输出中
+            profile, _err = parse_import_profile(stderr.decode().strip().splitlines())
             for i in _out:
                 self._log_output(f"    {i}")
             for i in _err:
                 self._log_output(f"    {i}")
 
+            if not profile:
+                return
+
+            # 重复运行以减少耗时统计的误差，输出只记录第一次运行的结果
+            profiles = [profile]
+            env = self.get_env() | {"GITHUB_OUTPUT": os.devnull}
+            for _ in range(self.repeat - 1):
+                code, _, stderr = await self._run_runner(env)
+                profile, _ = parse_import_profile(stderr.decode().strip().splitlines())
+                if code or not profile:
+                    break
+                profiles.append(profile)
+
+            self._profile = merge_profiles(profiles)
+            # 开启 tracemalloc 再运行一次，只用于统计内存分配，不影响耗时与峰值 RSS
+            code, _, stderr = await self._run_runner(env | {TRACEMALLOC_ENV: "1"})
+            profile, _ = parse_import_profile(stderr.decode().strip().splitlines())
+            if not code and profile and "allocated" in profile:
+                self._profile["allocated"] = profile["allocated"]
+            self._profile["size"] = get_installed_size(self.path / ".venv")
+
+    async def _run_runner(self, env: dict[str, str]) -> tuple[int | None, bytes, bytes]:
+        proc = await create_subprocess_shell(
+            f"{get_network_sandbox()}.venv/bin/python -X importtime runner.py"
+            if self.wheels_dir
+            else "poetry run python -X importtime runner.py",
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.path,
+            env=env,
+        )
+        stdout, stderr = await proc.communicate()
+        return proc.returncode, stdout, stderr
+
     def _log_output(self, output: str) -> None:
         """记录输出，同时打印到控制台"""
         print(output)
@@ -281,8 +964,9 @@ class PluginTest:
         if match:
             package_name = match.group(1)
             # 不用包括自己
-            if package_name in PLUGIN_LIST and package_name != self.project_link:
-                return PLUGIN_LIST[package_name]
+            plugin_list = get_plugin_list()
+            if package_name in plugin_list and package_name != self.project_link:
+                return plugin_list[package_name]
 
 
 async def main():
@@ -9,10 +9,53 @@ import click
 @click.option("-o", "--offset", default=0, show_default=True, help="测试插件偏移量")
 @click.option("-f", "--force", is_flag=True, help="强制重新测试")
 @click.option("-k", "--key", default=None, show_default=True, help="测试插件标识符")
-def main(limit: int, offset: int, force: bool, key: str | None):
+@click.option("-s", "--shard", is_flag=True, help="额外输出分片的测试结果与索引")
+@click.option("-v", "--validate", is_flag=True, help="重新验证所有适配器与机器人")
+@click.option("-p", "--pool", default=0, show_default=True, help="预先创建的测试环境数量")
+@click.option("-r", "--repeat", default=1, show_default=True, help="每个插件加载测试的运行次数")
+@click.option("--layers", is_flag=True, help="依赖库插件的插件复制库插件的测试环境后测试")
+@click.option("--wheel-cache", is_flag=True, help="所有插件测试共用下载缓存")
+@click.option(
+    "--package-store",
+    is_flag=True,
+    help="测试环境中安装的文件硬链接至共用的只读包文件仓库，修改自身安装文件的插件会测试失败",
+)
+@click.option("--prefetch", is_flag=True, help="只下载测试所需的数据，不进行测试")
+@click.option("--offline", is_flag=True, help="只使用预先下载的数据进行测试")
+def main(
+    limit: int,
+    offset: int,
+    force: bool,
+    key: str | None,
+    shard: bool,
+    validate: bool,
+    pool: int,
+    repeat: int,
+    layers: bool,
+    wheel_cache: bool,
+    package_store: bool,
+    prefetch: bool,
+    offline: bool,
+):
     from .store import StoreTest
 
-    test = StoreTest(offset, limit, force)
+    test = StoreTest(
+        offset,
+        limit,
+        force,
+        shard,
+        validate,
+        offline,
+        pool,
+        repeat,
+        layers,
+        wheel_cache,
+        package_store,
+    )
+
+    if prefetch:
+        run(test.prefetch(key))
+        return
 
     # 通过环境变量传递插件配置
     config = os.environ.get("PLUGIN_CONFIG")
@@ -2,6 +2,24 @@ from pathlib import Path
 
 PLUGIN_KEY_TEMPLATE = "{project_link}:{module_name}"
 """ 插件键名模板 """
+ADAPTER_KEY_TEMPLATE = "{project_link}:{module_name}"
+""" 适配器键名模板 """
+BOT_KEY_TEMPLATE = "{name}:{homepage}"
+""" 机器人键名模板 """
+RESULT_SHARD_TEMPLATE = "{key}-{hash}.json"
+""" 分片测试结果文件名模板 """
+RESULT_HASH_LENGTH = 16
+""" 分片测试结果文件名中内容哈希的长度 """
+RESULT_SHARD_RETENTION = 7 * 24 * 60 * 60
+""" 不再使用的分片测试结果的保留时间，单位为秒，需要超过索引在客户端与 CDN 的缓存时间 """
+RETIRED_SHARDS_FILENAME = "retired.json"
+""" 记录分片测试结果不再使用的时间的文件名 """
+LOAD_TIME_REGRESSION_RATIO = 0.5
+""" 加载耗时增加超过该比例时视为性能退化 """
+MEMORY_REGRESSION_BYTES = 30 * 1024**2
+""" 峰值 RSS 增加超过该值时视为性能退化，单位为字节 """
+REGRESSION_MIN_SAMPLES = 3
+""" 判断性能退化时两次测试各自至少需要的运行次数 """
 
 TEST_DIR = Path("plugin_test")
 """ 测试文件夹 """
@@ -9,6 +27,36 @@ if not TEST_DIR.exists():
     TEST_DIR.mkdir()
 RESULTS_PATH = TEST_DIR / "results.json"
 """ 测试结果保存路径 """
+ADAPTER_RESULTS_PATH = TEST_DIR / "adapter_results.json"
+""" 适配器验证结果保存路径 """
+BOT_RESULTS_PATH = TEST_DIR / "bot_results.json"
+""" 机器人验证结果保存路径 """
+RESULTS_DIR = TEST_DIR / "results"
+""" 分片测试结果保存文件夹 """
+RESULTS_INDEX_PATH = RESULTS_DIR / "index.json"
+""" 分片测试结果索引保存路径 """
+LOGS_DIR = TEST_DIR / "logs"
+""" 完整测试输出保存文件夹 """
+LOG_TAIL_LENGTH = 2000
+""" 测试结果中保留的测试输出末尾长度 """
+URL_CACHE_PATH = TEST_DIR / "url_cache.json"
+""" 网址检查结果缓存保存路径 """
+WHEEL_CACHE_DIR = TEST_DIR / "cache"
+""" 插件测试共用的下载缓存文件夹 """
+POOL_DIR = TEST_DIR / "pool"
+""" 预先创建的测试环境保存文件夹 """
+LAYERS_DIR = TEST_DIR / "layers"
+""" 库插件测试环境保存文件夹 """
+PACKAGE_STORE_DIR = TEST_DIR / "packages"
+""" 插件测试共用的包文件仓库，需要与测试文件夹位于同一文件系统 """
+PREFETCH_DIR = TEST_DIR / "prefetch"
+""" 预先下载的数据保存文件夹 """
+PREFETCH_INDEX_DIR = PREFETCH_DIR / "index"
+""" PyPI 数据快照保存文件夹 """
+PREFETCH_WHEELS_DIR = PREFETCH_DIR / "wheels"
+""" 插件及其依赖的 wheel 保存文件夹 """
+PREFETCH_URL_CACHE_PATH = PREFETCH_DIR / "url_cache.json"
+""" 预先检查的网址结果保存路径 """
 ADAPTERS_PATH = TEST_DIR / "adapters.json"
 """ 生成的适配器列表保存路径 """
 BOTS_PATH = TEST_DIR / "bots.json"
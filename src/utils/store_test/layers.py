@@ -0,0 +1,113 @@
+""" 按依赖分层的测试环境 """
+import asyncio
+import shutil
+from collections import Counter
+from pathlib import Path
+
+import click
+
+from src.utils.plugin_test import PluginTest, copy_environment
+
+
+def sort_by_dependencies(
+    keys: list[str], dependencies: dict[str, list[str]]
+) -> list[str]:
+    """按照依赖关系排序
+
+    被依赖的插件排在依赖它的插件之前，其他情况保持原有顺序
+    存在循环依赖时，剩余的插件按照原有顺序排在最后
+    """
+    remaining = list(keys)
+    result: list[str] = []
+    while remaining:
+        for key in remaining:
+            # 依赖中还未排序的插件
+            if not any(dep in remaining for dep in dependencies.get(key, [])):
+                break
+        else:
+            result.extend(remaining)
+            break
+        remaining.remove(key)
+        result.append(key)
+    return result
+
+
+class DependencyLayers:
+    """按依赖分层的测试环境
+
+    许多插件依赖于同一个库插件，例如 scheduler、localstore、htmlrender
+    库插件通过测试后保存测试环境，依赖它的插件复制该环境后测试，只需安装自己额外的依赖
+
+    本次没有测试、但被多个待测插件依赖的库插件，会在后台单独创建环境
+    这样每次运行中每个库插件只需安装一次
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        dependencies: dict[str, list[str]],
+        project_links: dict[str, str],
+    ) -> None:
+        self.directory = directory
+        self.dependencies = dependencies
+        self.project_links = project_links
+
+        # 测试通过后保存环境的库插件
+        self._snapshots: set[str] = set()
+        # 后台创建环境的库插件
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+
+    def path(self, key: str) -> Path:
+        """库插件环境的保存路径"""
+        # 替换 : 为 -，防止文件名不合法
+        return self.directory / key.replace(":", "-")
+
+    def plan(self, keys: list[str]) -> None:
+        """根据待测试插件规划需要保存的环境"""
+        counter = Counter(dep for key in keys for dep in self.dependencies.get(key, []))
+        for dep, count in counter.items():
+            if dep in keys:
+                self._snapshots.add(dep)
+            elif count > 1 and dep not in self._tasks and dep in self.project_links:
+                self._tasks[dep] = asyncio.create_task(self._prepare(dep))
+
+    def snapshot(self, key: str) -> Path | None:
+        """库插件测试通过后保存环境的路径，不需要保存时返回 None"""
+        if key in self._snapshots:
+            return self.path(key)
+
+    async def checkout(self, key: str) -> Path | None:
+        """复制依赖的库插件环境，作为插件的测试环境
+
+        没有可用的环境时返回 None
+        """
+        for dep in self.dependencies.get(key, []):
+            if task := self._tasks.get(dep):
+                await task
+            layer = self.path(dep)
+            if layer.exists():
+                environment = self.directory / f"{key.replace(':', '-')}-test"
+                copy_environment(layer, environment)
+                click.echo(f"插件 {key} 使用 {dep} 的测试环境")
+                return environment
+
+    async def close(self) -> None:
+        """停止创建环境，并删除所有环境"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def _prepare(self, key: str) -> None:
+        path = self.path(key)
+        try:
+            if path.exists():
+                shutil.rmtree(path)
+            created = await PluginTest.prepare_environment(
+                path, self.project_links[key]
+            )
+        except Exception as e:
+            click.echo(f"{key} 的测试环境创建失败：{e}")
+            created = False
+        if not created:
+            shutil.rmtree(path, ignore_errors=True)
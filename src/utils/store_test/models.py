@@ -40,6 +40,16 @@ class Metadata(TypedDict):
     supported_adapters: list[str]
 
 
+class Regression(TypedDict):
+    """性能退化"""
+
+    metric: Literal["load", "rss"]
+    """退化的指标，load 为加载耗时，rss 为峰值 RSS"""
+    previous: float
+    current: float
+    previous_version: str | None
+
+
 class TestResult(TypedDict):
     """测试结果"""
 
@@ -47,4 +57,36 @@ class TestResult(TypedDict):
     version: str | None
     results: dict[Literal["validation", "load", "metadata"], bool]
     inputs: dict[Literal["config"], str]
-    outputs: dict[Literal["validation", "load", "metadata"], Any]
+    outputs: dict[Literal["validation", "load", "metadata", "profile"], Any]
+    """测试输出
+
+    profile 为加载耗时与资源占用，包括 init 与 load_plugin 的耗时、导入的总耗时、
+    导入耗时最长的模块、峰值 RSS、加载插件时分配的内存与插件及其依赖的安装大小
+    """
+    logs: dict[Literal["load"], str]
+    """完整测试输出的引用
+
+    对应 logs 文件夹中的 {ref}.log.gz 文件
+    """
+    dependencies: list[str]
+    """依赖的商店插件的 module_name"""
+    regressions: list[Regression]
+    """与上次测试结果相比的性能退化"""
+
+
+class ValidationResult(TypedDict):
+    """机器人与适配器的验证结果"""
+
+    time: str
+    results: dict[Literal["validation"], bool]
+    outputs: dict[Literal["validation"], Any]
+
+
+class ResultIndex(TypedDict):
+    """分片测试结果索引"""
+
+    time: str
+    version: str | None
+    results: dict[Literal["validation", "load", "metadata"], bool]
+    hash: str
+    file: str
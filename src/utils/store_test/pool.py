@@ -0,0 +1,77 @@
+""" 预先创建的测试环境池 """
+import asyncio
+import shutil
+from pathlib import Path
+
+import click
+
+from src.utils.plugin_test import PluginTest
+
+
+class EnvironmentPool:
+    """测试环境池
+
+    在后台预先创建 size 个已安装 NoneBot 的测试环境，测试时取出一个直接安装插件
+    每取出一个环境就在后台补充一个，环境的创建与插件测试同时进行
+    总共最多创建 total 个环境，避免创建用不到的环境
+
+    取出的环境由测试负责删除，关闭时删除所有未使用的环境
+    """
+
+    def __init__(self, directory: Path, size: int, total: int) -> None:
+        self.directory = directory
+        self.size = size
+        self.total = total
+
+        self._created = 0
+        # 正在创建，还没有放入队列的环境数量
+        self._pending = 0
+        self._queue: asyncio.Queue[Path | None] = asyncio.Queue()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def start(self) -> None:
+        """开始创建测试环境"""
+        for _ in range(min(self.size, self.total)):
+            self._refill()
+
+    async def acquire(self) -> Path | None:
+        """取出一个测试环境
+
+        创建失败或所有环境都已取出时返回 None，由测试自行创建环境
+        例如测试出错后补充的插件会使取出的次数超过 total
+        """
+        if not self._created:
+            self.start()
+        if self._queue.empty() and not self._pending and self._created >= self.total:
+            return None
+        environment = await self._queue.get()
+        self._refill()
+        return environment
+
+    async def close(self) -> None:
+        """停止创建测试环境，并删除所有未使用的环境"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _refill(self) -> None:
+        if self._created >= self.total:
+            return
+        self._created += 1
+        self._pending += 1
+        task = asyncio.create_task(self._create(self._created))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _create(self, index: int) -> None:
+        path = self.directory / f"env-{index}"
+        try:
+            if path.exists():
+                shutil.rmtree(path)
+            created = await PluginTest.prepare_environment(path)
+        except Exception as e:
+            click.echo(f"测试环境 {path} 创建失败：{e}")
+            created = False
+        self._pending -= 1
+        await self._queue.put(path if created else None)
@@ -1,22 +1,63 @@
+import asyncio
+import os
+import sys
+
 import click
 
+from src.utils.package_index import LocalIndex, project_cache
+from src.utils.plugin_test import (
+    CACHE_DIR_ENV,
+    PACKAGE_STORE_DIR_ENV,
+    REPEAT_ENV,
+    STORE_PLUGINS_PATH_ENV,
+    WHEELS_DIR_ENV,
+    PackageStore,
+    WheelCache,
+)
+from src.utils.validation import PublishType
+from src.utils.validation.adapters import adapter_registry
+from src.utils.validation.utils import prefetch_urls, url_cache
+
 from .constants import (
+    ADAPTER_RESULTS_PATH,
     ADAPTERS_PATH,
+    BOT_RESULTS_PATH,
     BOTS_PATH,
     DRIVERS_PATH,
+    LAYERS_DIR,
+    LOGS_DIR,
+    PACKAGE_STORE_DIR,
     PLUGIN_KEY_TEMPLATE,
     PLUGINS_PATH,
+    POOL_DIR,
+    PREFETCH_INDEX_DIR,
+    PREFETCH_URL_CACHE_PATH,
+    PREFETCH_WHEELS_DIR,
     PREVIOUS_PLUGINS_PATH,
     PREVIOUS_RESULTS_PATH,
+    RESULTS_DIR,
+    RESULTS_INDEX_PATH,
     RESULTS_PATH,
     STORE_ADAPTERS_PATH,
     STORE_BOTS_PATH,
     STORE_DRIVERS_PATH,
     STORE_PLUGINS_PATH,
+    URL_CACHE_PATH,
+    WHEEL_CACHE_DIR,
 )
+from .layers import DependencyLayers, sort_by_dependencies
 from .models import Plugin, StorePlugin, TestResult
-from .utils import dump_json, get_latest_version, load_json
-from .validation import validate_plugin
+from .pool import EnvironmentPool
+from .utils import (
+    detect_regressions,
+    dump_json,
+    dump_result_shards,
+    get_latest_version,
+    get_pypi_data,
+    load_json,
+    prune_logs,
+)
+from .validation import validate_plugin, validate_store_entries
 
 
 class StoreTest:
@@ -27,13 +68,31 @@ class StoreTest:
         offset: int = 0,
         limit: int = 1,
         force: bool = False,
+        shard: bool = False,
+        validate: bool = False,
+        offline: bool = False,
+        pool_size: int = 0,
+        repeat: int = 1,
+        layers: bool = False,
+        wheel_cache: bool = False,
+        package_store: bool = False,
     ) -> None:
         self._offset = offset
         self._limit = limit
         self._force = force
+        self._shard = shard
+        self._validate = validate
+        self._offline = offline
+        self._pool_size = pool_size
+        self._layers = layers
+        # 插件测试通过环境变量获取加载测试的运行次数
+        if repeat > 1:
+            os.environ[REPEAT_ENV] = str(repeat)
 
         # NoneBot 仓库中的数据
         self._store_adapters = load_json(STORE_ADAPTERS_PATH)
+        # 验证插件支持的适配器时直接使用已经获取的适配器列表
+        adapter_registry.use_data(self._store_adapters)
         self._store_bots = load_json(STORE_BOTS_PATH)
         self._store_drivers = load_json(STORE_DRIVERS_PATH)
         self._store_plugins: dict[str, StorePlugin] = {
@@ -52,6 +111,113 @@ class StoreTest:
             ): plugin
             for plugin in load_json(PREVIOUS_PLUGINS_PATH)
         }
+        # 上次运行的网址检查结果
+        url_cache.load(URL_CACHE_PATH)
+        # 所有插件测试共用同一个下载缓存
+        self._wheel_cache = None
+        if wheel_cache:
+            self._wheel_cache = WheelCache(WHEEL_CACHE_DIR.resolve())
+            os.environ[CACHE_DIR_ENV] = str(self._wheel_cache.path)
+        # 所有插件测试环境共用同一个包文件仓库
+        # 仓库中的文件是只读的，修改自身安装文件的插件会因此测试失败
+        self._package_store = None
+        if package_store:
+            self._package_store = PackageStore(PACKAGE_STORE_DIR.resolve())
+            os.environ[PACKAGE_STORE_DIR_ENV] = str(self._package_store.path)
+
+        if offline:
+            self.use_prefetched()
+
+    def use_prefetched(self):
+        """只使用预先下载的数据进行测试，不再访问网络
+
+        PyPI 数据来自快照，网址检查只使用已有的结果，插件从本地的 wheel 安装
+        """
+        project_cache.use_index(LocalIndex(PREFETCH_INDEX_DIR))
+        url_cache.offline = True
+        url_cache.load(PREFETCH_URL_CACHE_PATH)
+        # 插件测试通过环境变量获取 wheel 文件夹与插件列表
+        os.environ[WHEELS_DIR_ENV] = str(PREFETCH_WHEELS_DIR.resolve())
+        os.environ[STORE_PLUGINS_PATH_ENV] = str(STORE_PLUGINS_PATH.resolve())
+
+    async def prefetch(self, key: str | None = None):
+        """下载测试所需的所有数据
+
+        包括 PyPI 数据快照、待测试插件及其依赖的 wheel 与网址检查结果
+        之后使用相同的参数并开启离线模式，即可在不访问网络的情况下测试
+
+        待测试插件的选择与 test_plugins 相同
+        """
+        index = LocalIndex(PREFETCH_INDEX_DIR)
+
+        if key:
+            candidates = [key]
+            limit = 1
+        else:
+            candidates = list(self._store_plugins)[self._offset :]
+            limit = self._limit
+
+        selected: list[str] = []
+        urls: list[str] = []
+        for candidate in candidates:
+            if len(selected) >= limit:
+                break
+
+            plugin = self._store_plugins[candidate]
+            try:
+                if not candidate.startswith("git+http"):
+                    # 判断是否跳过测试时也需要使用快照中的数据
+                    index.save(get_pypi_data(plugin["project_link"]))
+                if self.should_skip(candidate):
+                    continue
+            except Exception as e:
+                click.echo(e)
+                continue
+
+            selected.append(candidate)
+            if previous_plugin := self._previous_plugins.get(candidate):
+                urls.append(previous_plugin["homepage"])
+
+        if self._validate:
+            for entry in self._store_adapters + self._store_bots:
+                if homepage := entry.get("homepage"):
+                    urls.append(homepage)
+                if project_link := entry.get("project_link"):
+                    # 项目不存在时快照中也不保存，离线验证时同样不存在
+                    try:
+                        index.save(get_pypi_data(project_link))
+                    except ValueError:
+                        pass
+
+        click.echo(f"正在下载 {len(selected)} 个插件 ...")
+        await asyncio.gather(
+            *(
+                self.download_wheels(self._store_plugins[key]["project_link"])
+                for key in selected
+            )
+        )
+        await prefetch_urls(urls)
+        url_cache.save(PREFETCH_URL_CACHE_PATH)
+        self.report_url_stats()
+
+    async def download_wheels(self, project_link: str):
+        """下载插件及其依赖，源码包会被构建为 wheel"""
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "pip",
+            "wheel",
+            "--quiet",
+            "--wheel-dir",
+            str(PREFETCH_WHEELS_DIR),
+            project_link,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=os.environ | (self._wheel_cache.get_env() if self._wheel_cache else {}),
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode:
+            click.echo(f"插件 {project_link} 下载失败：{stderr.decode().strip()}")
 
     def should_skip(self, key: str) -> bool:
         """是否跳过测试"""
@@ -76,6 +242,34 @@ class StoreTest:
             return True
         return False
 
+    def get_dependencies(self) -> dict[str, list[str]]:
+        """根据上次的测试结果获取插件依赖的商店插件
+
+        返回插件标识符到依赖插件标识符的映射
+        """
+        module_names = {
+            plugin["module_name"]: key for key, plugin in self._store_plugins.items()
+        }
+        return {
+            key: [
+                module_names[module_name]
+                for module_name in result.get("dependencies", [])
+                if module_name in module_names
+            ]
+            for key, result in self._previous_results.items()
+        }
+
+    def check_regressions(self, key: str, result: TestResult):
+        """与上次的测试结果比较，记录性能退化"""
+        result["regressions"] = detect_regressions(
+            self._previous_results.get(key), result
+        )
+        for regression in result["regressions"]:
+            click.echo(
+                f"插件 {key} 的 {regression['metric']} 从 {regression['previous']} "
+                f"增加到 {regression['current']}"
+            )
+
     def skip_plugin_test(self, key: str) -> bool:
         """是否跳过插件测试"""
         if key in self._previous_plugins:
@@ -109,33 +303,93 @@ class StoreTest:
         # 测试上限不可能超过插件总数
         limit = min(self._limit, len(test_plugins))
 
-        i = 1
-        for key, plugin in test_plugins:
-            if i > limit:
-                click.echo(f"已达到测试上限 {limit}，测试停止")
-                break
+        # 在后台预先创建测试环境，每个测试取出一个后立即补充
+        pool = (
+            EnvironmentPool(POOL_DIR, self._pool_size, limit)
+            if self._pool_size
+            else None
+        )
+        # 依赖同一个库插件的插件共用库插件的测试环境
+        layers = (
+            DependencyLayers(
+                LAYERS_DIR,
+                self.get_dependencies(),
+                {
+                    key: plugin["project_link"]
+                    for key, plugin in self._store_plugins.items()
+                },
+            )
+            if self._layers
+            else None
+        )
 
-            try:
-                if self.should_skip(key):
-                    continue
+        candidates = iter(test_plugins)
+        plugins_to_test = dict(test_plugins)
 
+        def select(count: int) -> list[str]:
+            """从剩余的插件中选出 count 个需要测试的插件"""
+            selected: list[str] = []
+            while len(selected) < count:
+                candidate = next(candidates, None)
+                if candidate is None:
+                    break
+                try:
+                    if not self.should_skip(candidate[0]):
+                        selected.append(candidate[0])
+                except Exception as e:
+                    click.echo(e)
+            return selected
+
+        def sort(keys: list[str]) -> list[str]:
+            """按照依赖关系排序，并规划需要保存的环境"""
+            if layers:
+                keys = sort_by_dependencies(keys, layers.dependencies)
+                layers.plan(keys)
+            return keys
+
+        queue = sort(select(limit))
+
+        i = 1
+        try:
+            while queue:
+                key = queue.pop(0)
                 click.echo(f"{i}/{limit} 正在测试插件 {key} ...")
 
-                new_results[key], new_plugin = await validate_plugin(
-                    plugin=plugin,
-                    config=plugin_configs.get(key, ""),
-                    skip_test=self.skip_plugin_test(key),
-                    data=plugin_datas.get(key),
-                    previous_plugin=self._previous_plugins.get(key),
-                )
-                if new_plugin:
-                    new_plugins[key] = new_plugin
-            except Exception as e:
-                # 如果测试中遇到意外错误，则跳过该插件
-                click.echo(e)
-                continue
+                try:
+                    data = plugin_datas.get(key)
+                    environment = None
+                    if layers and not data:
+                        environment = await layers.checkout(key)
+                    if not environment and pool and not data:
+                        environment = await pool.acquire()
 
-            i += 1
+                    new_results[key], new_plugin = await validate_plugin(
+                        plugin=plugins_to_test[key],
+                        config=plugin_configs.get(key, ""),
+                        skip_test=self.skip_plugin_test(key),
+                        data=data,
+                        previous_plugin=self._previous_plugins.get(key),
+                        environment=environment,
+                        snapshot=layers.snapshot(key) if layers else None,
+                    )
+                    if new_plugin:
+                        new_plugins[key] = new_plugin
+                    self.check_regressions(key, new_results[key])
+                except Exception as e:
+                    # 如果测试中遇到意外错误，则跳过该插件，并补充一个插件
+                    click.echo(e)
+                    queue.extend(sort(select(1)))
+                    continue
+
+                i += 1
+
+            if next(candidates, None):
+                click.echo(f"已达到测试上限 {limit}，测试停止")
+        finally:
+            if pool:
+                await pool.close()
+            if layers:
+                await layers.close()
 
         results: dict[str, TestResult] = {}
         plugins: dict[str, Plugin] = {}
@@ -164,9 +418,73 @@ class StoreTest:
 
         results, plugins = await self.test_plugins(key, config, data)
 
+        adapters, bots = self._store_adapters, self._store_bots
+        if self._validate:
+            adapters, bots = await self.validate_store()
+
         # 保存测试结果与生成的列表
-        dump_json(ADAPTERS_PATH, self._store_adapters)
-        dump_json(BOTS_PATH, self._store_bots)
+        dump_json(ADAPTERS_PATH, adapters)
+        dump_json(BOTS_PATH, bots)
         dump_json(DRIVERS_PATH, self._store_drivers)
         dump_json(PLUGINS_PATH, list(plugins.values()))
         dump_json(RESULTS_PATH, results)
+        # 额外输出分片的测试结果，方便商店网页按需加载
+        if self._shard:
+            dump_result_shards(RESULTS_DIR, RESULTS_INDEX_PATH, results)
+        # 日志只保留测试结果中引用的
+        prune_logs(LOGS_DIR, results)
+
+        url_cache.save(URL_CACHE_PATH)
+        self.report_url_stats()
+        self.report_wheel_cache_stats()
+        self.report_package_store_stats()
+
+    async def validate_store(self):
+        """重新验证商店中所有的适配器与机器人
+
+        验证结果单独保存，返回添加了 valid 字段的适配器与机器人列表
+        """
+        click.echo(
+            f"正在验证 {len(self._store_adapters)} 个适配器"
+            f"与 {len(self._store_bots)} 个机器人 ..."
+        )
+        adapters, adapter_results = await validate_store_entries(
+            PublishType.ADAPTER, self._store_adapters
+        )
+        bots, bot_results = await validate_store_entries(
+            PublishType.BOT, self._store_bots
+        )
+        dump_json(ADAPTER_RESULTS_PATH, adapter_results)
+        dump_json(BOT_RESULTS_PATH, bot_results)
+
+        for key, result in (adapter_results | bot_results).items():
+            if not result["results"]["validation"]:
+                click.echo(f"{key} 验证失败")
+        return adapters, bots
+
+    def report_url_stats(self):
+        """输出网址检查的统计信息"""
+        stats = url_cache.stats.values()
+        hits = sum(stat["hits"] for stat in stats)
+        misses = sum(stat["misses"] for stat in stats)
+        click.echo(f"网址检查共命中缓存 {hits} 次，发起请求 {misses} 次")
+        for host, stat in url_cache.stats.items():
+            if stat["failures"]:
+                click.echo(f"    {host} 访问失败 {stat['failures']} 次")
+
+    def report_wheel_cache_stats(self):
+        """输出下载缓存的统计信息"""
+        if not self._wheel_cache:
+            return
+        stats = self._wheel_cache.stats()
+        click.echo(f"下载缓存共节省 {stats['saved']} 字节，下载 {stats['downloaded']} 字节")
+
+    def report_package_store_stats(self):
+        """清理包文件仓库，并输出统计信息
+
+        测试结束后测试环境都已删除，仓库中只被自己引用的文件不再需要
+        """
+        if not self._package_store:
+            return
+        freed = self._package_store.prune()
+        click.echo(f"包文件仓库共 {self._package_store.size()} 字节，本次清理 {freed} 字节")
@@ -1,9 +1,21 @@
-import json
-from functools import cache
+import hashlib
+import time
 from pathlib import Path
-from typing import Any
 
-import httpx
+from src.utils import json_io
+from src.utils.package_index import ProjectInfo, project_cache
+
+from .constants import (
+    LOAD_TIME_REGRESSION_RATIO,
+    LOG_TAIL_LENGTH,
+    MEMORY_REGRESSION_BYTES,
+    REGRESSION_MIN_SAMPLES,
+    RESULT_HASH_LENGTH,
+    RESULT_SHARD_RETENTION,
+    RESULT_SHARD_TEMPLATE,
+    RETIRED_SHARDS_FILENAME,
+)
+from .models import Regression, ResultIndex, TestResult
 
 
 def load_json(path: Path) -> dict:
@@ -11,39 +23,179 @@ def load_json(path: Path) -> dict:
     if not path.exists():
         raise Exception(f"文件 {path} 不存在")
 
-    with open(path, encoding="utf8") as f:
-        return json.load(f)
+    return json_io.load_json(path)
 
 
 def dump_json(path: Path, data: dict | list):
     """保存 JSON 文件
 
-    为减少文件大小，还需手动设置 separators
+    为减少文件大小，使用紧凑格式
     """
-    with open(path, "w", encoding="utf8") as f:
-        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    json_io.dump_json(path, data)
+
+
+def dump_result_shards(
+    directory: Path,
+    index_path: Path,
+    results: dict[str, TestResult],
+    retention: float = RESULT_SHARD_RETENTION,
+) -> dict[str, ResultIndex]:
+    """分片保存测试结果
+
+    每个插件的测试结果单独保存，文件名中包含内容哈希，方便 CDN 长期缓存
+    索引中只保存测试状态、版本、时间与内容哈希
+
+    客户端可能仍持有旧的索引，不在索引中的旧分片超过保留时间后才会被删除
+    不再使用的时间记录在同一文件夹中，不依赖文件的修改时间
+    """
+    if not directory.exists():
+        directory.mkdir(parents=True)
+
+    index: dict[str, ResultIndex] = {}
+    for key, result in results.items():
+        content = json_io.dumps(result)
+        content_hash = hashlib.sha256(content).hexdigest()[:RESULT_HASH_LENGTH]
+        # 替换 : 为 -，防止文件名不合法
+        filename = RESULT_SHARD_TEMPLATE.format(
+            key=key.replace(":", "-"), hash=content_hash
+        )
+        shard_path = directory / filename
+        # 文件名相同时内容也相同，无需重复写入
+        if not shard_path.exists():
+            shard_path.write_bytes(content)
+        index[key] = {
+            "time": result["time"],
+            "version": result["version"],
+            "results": result["results"],
+            "hash": content_hash,
+            "file": filename,
+        }
+
+    files = {item["file"] for item in index.values()}
+    retired_path = directory / RETIRED_SHARDS_FILENAME
+    retired: dict[str, float] = (
+        json_io.load_json(retired_path) if retired_path.exists() else {}
+    )
+    now = time.time()
+    new_retired: dict[str, float] = {}
+    for path in directory.glob("*.json"):
+        if path in (index_path, retired_path) or path.name in files:
+            continue
+        retired_at = retired.get(path.name, now)
+        if now - retired_at > retention:
+            path.unlink()
+        else:
+            new_retired[path.name] = retired_at
+
+    dump_json(retired_path, new_retired)
+    dump_json(index_path, index)
+    return index
 
 
-@cache
-def get_pypi_data(project_link: str) -> dict[str, Any]:
-    """获取 PyPI 数据"""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36"
+def prune_logs(directory: Path, results: dict[str, TestResult]) -> int:
+    """删除没有测试结果引用的日志
+
+    返回删除的日志数量
+    """
+    if not directory.exists():
+        return 0
+
+    refs = {
+        ref for result in results.values() for ref in result.get("logs", {}).values()
     }
-    url = f"https://pypi.org/pypi/{project_link}/json"
-    r = httpx.get(url, headers=headers)
-    if r.status_code == 200:
-        return r.json()
-    raise ValueError(f"获取 PyPI 数据失败：{r.text}")
+    count = 0
+    for path in directory.glob("*.log.gz"):
+        if path.name.removesuffix(".log.gz") not in refs:
+            path.unlink()
+            count += 1
+    return count
+
+
+def tail_excerpt(text: str, limit: int = LOG_TAIL_LENGTH) -> str:
+    """截取文本末尾
+
+    超过长度限制时，只保留末尾的完整行
+    """
+    if len(text) <= limit:
+        return text
+
+    tail = text[-limit:]
+    newline = tail.find("\n")
+    if newline != -1:
+        tail = tail[newline + 1 :]
+    return f"...\n{tail}"
+
+
+def get_pypi_data(project_link: str) -> ProjectInfo:
+    """获取 PyPI 数据
+
+    数据来源取决于配置的包索引，与验证共用同一个缓存
+    """
+    return project_cache.get_project(project_link)
 
 
 def get_latest_version(project_link: str) -> str:
-    """获取插件的最新版本号"""
-    data = get_pypi_data(project_link)
-    return data["info"]["version"]
+    """获取插件的最新版本号
+
+    已经获取过 PyPI 数据时直接使用，否则使用更轻量的方式获取
+    """
+    return project_cache.get_latest_version(project_link)
+
+
+def get_upload_time(project_link: str) -> str | None:
+    """获取插件的上传时间
 
+    不支持 PEP 700 的简单索引镜像没有上传时间，此时返回 None
+    """
+    return get_pypi_data(project_link)["upload_time"]
+
+
+def get_samples(profile: dict, metric: str) -> list[float]:
+    """获取每次运行的数据，旧的测试结果中只有一次运行的数据"""
+    return profile.get("samples", {}).get(metric) or [profile[metric]]
+
+
+def detect_regressions(
+    previous: TestResult | None, current: TestResult
+) -> list[Regression]:
+    """与上次的测试结果比较，检测性能退化
+
+    加载耗时的中位数增加超过 LOAD_TIME_REGRESSION_RATIO，
+    或峰值 RSS 的中位数增加超过 MEMORY_REGRESSION_BYTES 时视为退化
+
+    为了排除误差，还要求两次测试的每次运行结果没有重叠，即本次的最小值大于上次的最大值
+    两次测试都运行三次时，相当于单侧 Mann-Whitney U 检验 p = 0.05
+    任意一次测试的运行次数少于 REGRESSION_MIN_SAMPLES 时无法排除误差，不做判断
+    """
+    if not previous:
+        return []
+    previous_profile = previous.get("outputs", {}).get("profile")
+    current_profile = current.get("outputs", {}).get("profile")
+    if not previous_profile or not current_profile:
+        return []
 
-def get_upload_time(project_link: str) -> str:
-    """获取插件的上传时间"""
-    data = get_pypi_data(project_link)
-    return data["urls"][0]["upload_time_iso_8601"]
+    regressions: list[Regression] = []
+    for metric in ("load", "rss"):
+        if metric not in previous_profile or metric not in current_profile:
+            continue
+        before = previous_profile[metric]
+        after = current_profile[metric]
+        previous_samples = get_samples(previous_profile, metric)
+        current_samples = get_samples(current_profile, metric)
+        if min(len(previous_samples), len(current_samples)) < REGRESSION_MIN_SAMPLES:
+            continue
+        if metric == "load":
+            exceeded = after > before * (1 + LOAD_TIME_REGRESSION_RATIO)
+        else:
+            exceeded = after - before > MEMORY_REGRESSION_BYTES
+        separated = min(current_samples) > max(previous_samples)
+        if exceeded and separated:
+            regressions.append(
+                {
+                    "metric": metric,
+                    "previous": before,
+                    "current": after,
+                    "previous_version": previous.get("version"),
+                }
+            )
+    return regressions
@@ -5,14 +5,21 @@ import re
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import cast
+from typing import Any, cast
 from zoneinfo import ZoneInfo
 
-from src.utils.plugin_test import PluginTest, strip_ansi
-from src.utils.validation import PublishType, validate_info
+from src.utils.plugin_test import (
+    PluginTest,
+    copy_environment,
+    save_log,
+    strip_ansi,
+    unpin_dependency,
+)
+from src.utils.validation import PublishType, async_validate_info, validate_many
 
-from .models import Metadata, Plugin, StorePlugin, TestResult
-from .utils import get_latest_version, get_upload_time
+from .constants import ADAPTER_KEY_TEMPLATE, BOT_KEY_TEMPLATE, LOGS_DIR
+from .models import Metadata, Plugin, StorePlugin, TestResult, ValidationResult
+from .utils import get_latest_version, get_upload_time, tail_excerpt
 
 
 def extract_metadata(path: Path) -> Metadata | None:
@@ -24,14 +31,33 @@ def extract_metadata(path: Path) -> Metadata | None:
         return json.loads(match.group(1))
 
 
+def extract_profile(path: Path) -> dict[str, Any] | None:
+    """提取插件加载耗时"""
+    with open(path / "output.txt", encoding="utf8") as f:
+        output = f.read()
+    match = re.search(r"^PROFILE=(.+)$", output, re.MULTILINE)
+    if match:
+        return json.loads(match.group(1))
+
+
+def extract_dependencies(path: Path) -> list[str]:
+    """提取插件依赖的商店插件"""
+    with open(path / "output.txt", encoding="utf8") as f:
+        output = f.read()
+    match = re.search(r"^DEPENDENCIES=(.+)$", output, re.MULTILINE)
+    if match:
+        return json.loads(match.group(1))
+    return []
+
+
 def extract_version(path: Path, project_link: str) -> str | None:
     """提取插件版本"""
     with open(path / "output.txt", encoding="utf8") as f:
         output = f.read()
     output = strip_ansi(output)
 
-    # 匹配 poetry show 的输出
-    match = re.search(r"version\s+:\s+(\S+)", output)
+    # 匹配 poetry show 与离线测试时 pip show 的输出
+    match = re.search(r"(?:version\s+:|^\s*Version:)\s+(\S+)", output, re.MULTILINE)
     if match:
         return match.group(1).strip()
 
@@ -49,11 +75,16 @@ async def validate_plugin(
     skip_test: bool,
     data: str | None = None,
     previous_plugin: Plugin | None = None,
+    environment: Path | None = None,
+    snapshot: Path | None = None,
 ) -> tuple[TestResult, Plugin | None]:
     """验证插件
 
     如果传入了 data 参数，则直接使用 data 作为插件数据，不进行测试
 
+    如果传入了 environment 参数，则在该预先创建的测试环境中测试
+    如果传入了 snapshot 参数，测试通过时将测试环境复制到该文件夹
+
     返回测试结果与验证后的插件数据
 
     如果插件验证失败，返回的插件数据为 None
@@ -65,17 +96,27 @@ async def validate_plugin(
     module_name = plugin["module_name"]
     is_official = plugin["is_official"]
     # 从 PyPI 获取信息
-    pypi_version = get_latest_version(project_link)
+    # 先获取完整的项目信息，之后获取版本号时直接使用缓存
     pypi_time = get_upload_time(project_link)
+    pypi_version = get_latest_version(project_link)
+    if pypi_time is None:
+        # 没有上传时间时，版本没有变化则沿用上次的时间，否则使用当前时间
+        if previous_plugin and previous_plugin.get("version") == pypi_version:
+            pypi_time = previous_plugin["time"]
+        else:
+            pypi_time = now_time_str
     # 如果传递了 data 参数
     # 则直接使用 data 作为插件数据
     # 并且将 skip_test 设置为 True
     if data:
-        # 跳过测试时无法获取到测试的版本
+        # 跳过测试时无法获取到测试的版本与依赖
         test_version = None
+        dependencies = []
+        profile = None
         # 因为跳过测试，测试结果无意义
         plugin_test_result = True
         plugin_test_output = "已跳过测试"
+        logs = {}
         # 提供了 data 参数，所以验证默认通过
         validation_result = True
         validation_output = None
@@ -95,7 +136,7 @@ async def validate_plugin(
             "supported_adapters": new_plugin.get("supported_adapters"),
         }
     else:
-        test = PluginTest(project_link, module_name, config)
+        test = PluginTest(project_link, module_name, config, environment)
 
         # 将 GitHub Action 的输出文件重定向到测试文件夹内
         test.github_output_file = (test.path / "output.txt").resolve()
@@ -105,10 +146,20 @@ async def validate_plugin(
 
         # 获取测试结果
         plugin_test_result, plugin_test_output = await test.run()
+        # 完整的测试输出单独压缩保存，测试结果中只保留末尾部分
+        logs = {"load": save_log(LOGS_DIR, plugin_test_output)}
+        plugin_test_output = tail_excerpt(plugin_test_output)
 
         metadata = extract_metadata(test.path)
         test_version = extract_version(test.path, project_link)
+        dependencies = extract_dependencies(test.path)
+        profile = extract_profile(test.path)
 
+        # 保存通过测试的环境，供依赖该插件的插件使用
+        if snapshot and plugin_test_result:
+            copy_environment(test.path, snapshot)
+            # 依赖该插件的插件可能需要旧版本
+            unpin_dependency(snapshot, project_link)
         # 测试并提取完数据后删除测试文件夹
         shutil.rmtree(test.path)
 
@@ -140,7 +191,7 @@ async def validate_plugin(
             raw_data["type"] = previous_plugin.get("type")
             raw_data["supported_adapters"] = previous_plugin.get("supported_adapters")
 
-        validation_info_result = validate_info(PublishType.PLUGIN, raw_data)
+        validation_info_result = await async_validate_info(PublishType.PLUGIN, raw_data)
 
         # 如果验证失败，则使用上次的插件数据
         if validation_info_result["valid"]:
@@ -182,7 +233,59 @@ async def validate_plugin(
             "validation": validation_output,
             "load": plugin_test_output,
             "metadata": metadata,
+            "profile": profile,
         },
+        "logs": logs,
+        "dependencies": dependencies,
+        "regressions": [],
     }
 
     return result, new_plugin
+
+
+async def validate_store_entries(
+    publish_type: PublishType, entries: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], dict[str, ValidationResult]]:
+    """重新验证商店中的机器人或适配器
+
+    所有条目的网址一起并发检查，所需时间取决于网络并发而不是条目数量
+
+    返回添加了 valid 字段的条目与验证结果
+    """
+    now_time_str = datetime.now(ZoneInfo("Asia/Shanghai")).isoformat()
+    key_template = (
+        ADAPTER_KEY_TEMPLATE
+        if publish_type == PublishType.ADAPTER
+        else BOT_KEY_TEMPLATE
+    )
+
+    records = [
+        {
+            **entry,
+            "tags": json.dumps(entry["tags"]),
+            "previous_data": [],
+        }
+        for entry in entries
+    ]
+    validation_info_results = await validate_many(publish_type, records)
+
+    new_entries: list[dict[str, Any]] = []
+    results: dict[str, ValidationResult] = {}
+    for entry, validation_info_result in zip(entries, validation_info_results):
+        valid = validation_info_result["valid"]
+        # 保留商店中的原始数据，只添加是否有效
+        new_entries.append({**entry, "valid": valid})
+        results[key_template.format(**entry)] = {
+            "time": now_time_str,
+            "results": {"validation": valid},
+            "outputs": {
+                "validation": None
+                if valid
+                else {
+                    "data": validation_info_result["data"],
+                    "errors": validation_info_result["errors"],
+                }
+            },
+        }
+
+    return new_entries, results
@@ -4,12 +4,18 @@ from typing import Any, cast
 
 from pydantic import validate_model
 
-from .constants import CUSTOM_MESSAGES, VALIDATION_CONTEXT
+from .constants import CUSTOM_MESSAGES, PYPI_PACKAGE_NAME_PATTERN, VALIDATION_CONTEXT
 from .models import AdapterPublishInfo, BotPublishInfo, PluginPublishInfo, PublishInfo
 from .models import PublishType as PublishType
 from .models import Tag
 from .models import ValidationDict as ValidationDict
-from .utils import color_to_hex, convert_errors
+from .utils import (
+    color_to_hex,
+    convert_errors,
+    get_duplication_index,
+    get_pypi_url,
+    prefetch_urls,
+)
 
 validation_model_map = {
     PublishType.BOT: BotPublishInfo,
@@ -19,9 +25,14 @@ validation_model_map = {
 
 
 def validate_info(
-    publish_type: PublishType, raw_data: dict[str, Any]
+    publish_type: PublishType,
+    raw_data: dict[str, Any],
+    context: dict[str, Any] | None = None,
 ) -> ValidationDict:
-    """验证信息是否符合规范"""
+    """验证信息是否符合规范
+
+    context 中的内容会被加入验证上下文，可用于在多次验证间共享数据
+    """
     if publish_type not in validation_model_map:
         raise ValueError("⚠️ 未知的发布类型。")  # pragma: no cover
 
@@ -31,6 +42,8 @@ def validate_info(
         "previous_data": raw_data.get("previous_data"),
         "skip_plugin_test": raw_data.get("skip_plugin_test"),
     }
+    if context:
+        validation_context.update(context)
     VALIDATION_CONTEXT.set(validation_context)
 
     data, _, errors = validate_model(validation_model_map[publish_type], raw_data)
@@ -115,3 +128,63 @@ def validate_info(
         "name": data.get("name") or raw_data.get("name", ""),
         "author": data.get("author", ""),
     }
+
+
+def get_urls_to_check(publish_type: PublishType, raw_data: dict[str, Any]) -> list[str]:
+    """获取验证时需要检查的网址"""
+    urls = []
+
+    homepage = raw_data.get("homepage")
+    if homepage and isinstance(homepage, str):
+        urls.append(homepage)
+
+    project_link = raw_data.get("project_link")
+    if (
+        publish_type in (PublishType.PLUGIN, PublishType.ADAPTER)
+        and isinstance(project_link, str)
+        and PYPI_PACKAGE_NAME_PATTERN.match(project_link)
+    ):
+        if url := get_pypi_url(project_link):
+            urls.append(url)
+
+    return urls
+
+
+async def async_validate_info(
+    publish_type: PublishType, raw_data: dict[str, Any]
+) -> ValidationDict:
+    """验证信息是否符合规范
+
+    验证前会并发检查项目主页与 PyPI 项目，验证时直接使用检查结果
+    所需时间取决于最慢的一次请求，而不是所有请求的总和
+    """
+    return (await validate_many(publish_type, [raw_data]))[0]
+
+
+async def validate_many(
+    publish_type: PublishType, records: list[dict[str, Any]]
+) -> list[ValidationDict]:
+    """批量验证信息是否符合规范
+
+    先并发检查所有记录的项目主页与 PyPI 项目，再按顺序逐个验证
+    使用同一个数据列表的记录共享重复检查的索引
+
+    返回的结果与输入的顺序一致
+    """
+    await prefetch_urls(
+        url for raw_data in records for url in get_urls_to_check(publish_type, raw_data)
+    )
+
+    # 以数据列表的 id 为键，保存对应的索引
+    indexes: dict[int, set[tuple[str, str]]] = {}
+    results = []
+    for raw_data in records:
+        context: dict[str, Any] = {}
+        previous_data = raw_data.get("previous_data")
+        if previous_data is not None:
+            key = id(previous_data)
+            if key not in indexes:
+                indexes[key] = get_duplication_index(previous_data)
+            context["duplication_index"] = indexes[key]
+        results.append(validate_info(publish_type, raw_data, context))
+    return results
@@ -0,0 +1,107 @@
+""" 商店适配器列表 """
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import httpx
+from nonebot import logger
+
+from src.utils.json_io import load_json, loads
+
+from .constants import STORE_ADAPTERS_REVALIDATE_INTERVAL, STORE_ADAPTERS_URL
+
+
+def get_module_names(adapters: Iterable[dict[str, Any]]) -> set[str]:
+    """获取适配器的 module_name"""
+    return {adapter["module_name"] for adapter in adapters}
+
+
+class AdapterRegistry:
+    """商店适配器列表
+
+    适配器列表可以来自远程地址、本地文件或内存，获取后缓存所有适配器的 module_name
+
+    远程地址会在超过重新验证间隔后通过 ETag 确认是否有更新
+    本地文件会在修改时间变化后重新读取
+    """
+
+    def __init__(
+        self,
+        url: str = STORE_ADAPTERS_URL,
+        revalidate_interval: float = STORE_ADAPTERS_REVALIDATE_INTERVAL,
+    ) -> None:
+        self.revalidate_interval = revalidate_interval
+        self._default_url = url
+        self.use_url(url)
+
+    def _clear(self) -> None:
+        self._url: str | None = None
+        self._path: Path | None = None
+        self._adapters: set[str] | None = None
+        # 远程地址的 ETag 与上次验证的时间
+        self._etag: str | None = None
+        self._checked_at = 0.0
+        # 本地文件的修改时间
+        self._mtime: float | None = None
+
+    def use_url(self, url: str) -> None:
+        """从远程地址获取适配器列表"""
+        self._clear()
+        self._url = url
+
+    def use_path(self, path: Path) -> None:
+        """从本地文件获取适配器列表"""
+        self._clear()
+        self._path = path
+
+    def use_data(self, adapters: Iterable[dict[str, Any]]) -> None:
+        """直接使用内存中的适配器列表"""
+        self._clear()
+        self._adapters = get_module_names(adapters)
+
+    def reset(self) -> None:
+        """恢复为默认的远程地址，并清除缓存"""
+        self.use_url(self._default_url)
+
+    def get(self) -> set[str]:
+        """获取所有适配器的 module_name"""
+        if self._path is not None:
+            return self._get_from_path(self._path)
+        if self._url is not None:
+            return self._get_from_url(self._url)
+        return self._adapters or set()
+
+    def _get_from_path(self, path: Path) -> set[str]:
+        mtime = path.stat().st_mtime
+        if self._adapters is None or mtime != self._mtime:
+            self._adapters = get_module_names(load_json(path))
+            self._mtime = mtime
+        return self._adapters
+
+    def _get_from_url(self, url: str) -> set[str]:
+        now = time.time()
+        if (
+            self._adapters is not None
+            and now - self._checked_at < self.revalidate_interval
+        ):
+            return self._adapters
+
+        headers = {}
+        if self._adapters is not None and self._etag:
+            headers["If-None-Match"] = self._etag
+
+        resp = httpx.get(url, headers=headers)
+        self._checked_at = now
+        if resp.status_code == 304 and self._adapters is not None:
+            logger.debug("适配器列表未更新，使用缓存")
+            return self._adapters
+
+        resp.raise_for_status()
+        self._adapters = get_module_names(loads(resp.content))
+        self._etag = resp.headers.get("ETag")
+        return self._adapters
+
+
+adapter_registry = AdapterRegistry()
+"""商店适配器列表"""
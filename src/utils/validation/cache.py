@@ -0,0 +1,159 @@
+""" 网址检查结果缓存 """
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Literal, TypedDict
+from urllib.parse import urlsplit
+
+from nonebot import logger
+
+from src.utils.json_io import dump_json, load_json
+
+from .constants import URL_CACHE_FAILURE_TTL, URL_CACHE_MAX_SIZE, URL_CACHE_SUCCESS_TTL
+
+
+class URLCacheEntry(TypedDict):
+    """网址检查结果"""
+
+    status_code: int
+    msg: str
+    checked_at: float
+
+
+class HostStats(TypedDict):
+    """单个域名的缓存统计"""
+
+    hits: int
+    """命中缓存的次数"""
+    misses: int
+    """未命中缓存，需要发起请求的次数"""
+    failures: int
+    """请求结果不是 200 的次数"""
+
+
+class URLCache:
+    """网址检查结果缓存
+
+    访问成功与失败的结果分别使用不同的有效期
+    超过最大数量时淘汰最久未使用的结果
+
+    可以保存至文件，供之后的运行使用
+
+    离线模式下只使用已有的结果，不再发起请求，结果也不会过期
+
+    统计只记录每个网址的第一次查询，预先并发检查后再同步检查时不会重复计数
+    """
+
+    def __init__(
+        self,
+        success_ttl: float = URL_CACHE_SUCCESS_TTL,
+        failure_ttl: float = URL_CACHE_FAILURE_TTL,
+        max_size: int = URL_CACHE_MAX_SIZE,
+    ) -> None:
+        self.success_ttl = success_ttl
+        self.failure_ttl = failure_ttl
+        self.max_size = max_size
+        self.offline = False
+
+        self._entries: OrderedDict[str, URLCacheEntry] = OrderedDict()
+        self._stats: dict[str, HostStats] = {}
+        # 已经计入统计的网址
+        self._counted: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, HostStats]:
+        """各域名的缓存统计"""
+        return self._stats
+
+    def _host_stats(self, url: str) -> HostStats:
+        host = urlsplit(url).netloc
+        if host not in self._stats:
+            self._stats[host] = {"hits": 0, "misses": 0, "failures": 0}
+        return self._stats[host]
+
+    def _count(self, url: str, key: Literal["hits", "misses"]) -> None:
+        """记录查询结果，同一个网址只记录第一次查询"""
+        if url in self._counted:
+            return
+        self._counted.add(url)
+        self._host_stats(url)[key] += 1
+
+    def _is_expired(self, entry: URLCacheEntry, now: float) -> bool:
+        # 离线模式下无法重新检查，所有结果都不会过期
+        if self.offline:
+            return False
+        ttl = self.success_ttl if entry["status_code"] == 200 else self.failure_ttl
+        return now - entry["checked_at"] > ttl
+
+    def has(self, url: str) -> bool:
+        """是否有未过期的检查结果
+
+        不影响统计与淘汰顺序
+        """
+        entry = self._entries.get(url)
+        return entry is not None and not self._is_expired(entry, time.time())
+
+    def get(self, url: str) -> tuple[int, str] | None:
+        """获取检查结果
+
+        结果不存在或已过期时返回 None
+        """
+        entry = self._entries.get(url)
+        if entry is None or self._is_expired(entry, time.time()):
+            self._entries.pop(url, None)
+            self._count(url, "misses")
+            return None
+
+        self._entries.move_to_end(url)
+        self._count(url, "hits")
+        return entry["status_code"], entry["msg"]
+
+    def set(
+        self, url: str, result: tuple[int, str], checked_at: float | None = None
+    ) -> None:
+        """保存检查结果"""
+        status_code, msg = result
+        self._entries[url] = {
+            "status_code": status_code,
+            "msg": msg,
+            "checked_at": time.time() if checked_at is None else checked_at,
+        }
+        self._entries.move_to_end(url)
+        if status_code != 200:
+            self._host_stats(url)["failures"] += 1
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存与统计"""
+        self._entries.clear()
+        self._stats.clear()
+        self._counted.clear()
+
+    def load(self, path: Path) -> None:
+        """从文件中加载缓存
+
+        文件不存在时跳过，已过期的结果会被丢弃
+        """
+        if not path.exists():
+            return
+
+        now = time.time()
+        entries: dict[str, URLCacheEntry] = load_json(path)
+        for url, entry in entries.items():
+            if not self._is_expired(entry, now):
+                self._entries[url] = entry
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        logger.info(f"已从 {path} 加载 {len(self._entries)} 条网址检查结果")
+
+    def save(self, path: Path) -> None:
+        """保存缓存至文件
+
+        按最近使用的顺序保存，加载时保持相同的淘汰顺序
+        """
+        dump_json(path, dict(self._entries))
@@ -19,10 +19,29 @@ MAX_NAME_LENGTH = 50
 PLUGIN_VALID_TYPE = ["application", "library"]
 """插件类型当前只支持 application 和 library"""
 
+URL_CHECK_CONNECT_TIMEOUT = 5.0
+"""网址检查的连接超时时间，单位为秒"""
+URL_CHECK_READ_TIMEOUT = 10.0
+"""网址检查的读取超时时间，单位为秒"""
+URL_CHECK_CONCURRENCY = 16
+"""并发检查网址时的最大请求数"""
+
+URL_CACHE_SUCCESS_TTL = 24 * 60 * 60
+"""网址访问成功的结果缓存时间，单位为秒"""
+URL_CACHE_FAILURE_TTL = 10 * 60
+"""网址访问失败的结果缓存时间，单位为秒
+
+失败可能只是暂时的，所以缓存时间较短，只避免同一次运行中重复请求
+"""
+URL_CACHE_MAX_SIZE = 10000
+"""网址检查结果缓存的最大数量"""
+
 # NoneBot Store
 STORE_ADAPTERS_URL = (
     "https://raw.githubusercontent.com/nonebot/nonebot2/master/assets/adapters.json"
 )
+STORE_ADAPTERS_REVALIDATE_INTERVAL = 5 * 60
+"""远程适配器列表的重新验证间隔，单位为秒"""
 
 # Pydantic 错误信息翻译
 CUSTOM_MESSAGES = {
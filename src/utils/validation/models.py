@@ -7,6 +7,8 @@ from pydantic import BaseModel, Field, root_validator, validator
 from pydantic.color import Color
 from pydantic.errors import JsonError, SetError
 
+from src.utils.package_index import normalize_name
+
 if TYPE_CHECKING:
     from pydantic.error_wrappers import ErrorDict as PydanticErrorDict
 
@@ -30,7 +32,13 @@ from .errors import (
     ProjectLinkNameError,
     ProjectLinkNotFoundError,
 )
-from .utils import check_pypi, check_url, get_adapters, resolve_adapter_name
+from .utils import (
+    check_pypi,
+    check_url,
+    get_adapters,
+    get_duplication_index,
+    resolve_adapter_name,
+)
 
 
 class ValidationDict(TypedDict):
@@ -77,18 +85,20 @@ class PyPIMixin(BaseModel):
         module_name = values.get("module_name")
         project_link = values.get("project_link")
 
-        data = VALIDATION_CONTEXT.get().get("previous_data")
+        context = VALIDATION_CONTEXT.get()
+        data = context.get("previous_data")
         if data is None:
             raise ValueError("未获取到数据列表")
 
-        if (
-            module_name
-            and project_link
-            and any(
-                x["module_name"] == module_name and x["project_link"] == project_link
-                for x in data
-            )
-        ):
+        if not (module_name and project_link):
+            return values
+
+        # 索引保存在验证上下文中，同一批数据只需要建立一次
+        index = context.get("duplication_index")
+        if index is None:
+            index = context["duplication_index"] = get_duplication_index(data)
+
+        if (normalize_name(project_link), module_name) in index:
             raise DuplicationError(project_link=project_link, module_name=module_name)
         return values
 
@@ -1,43 +1,181 @@
-from functools import cache
-from typing import TYPE_CHECKING
+import asyncio
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
 
 import httpx
 from nonebot import logger
 from pydantic import ValidationError
 from pydantic.color import Color, float_to_255
 
-from .constants import STORE_ADAPTERS_URL
+from src.utils.package_index import normalize_name, project_cache
+
+from .adapters import adapter_registry
+from .cache import URLCache
+from .constants import (
+    URL_CHECK_CONCURRENCY,
+    URL_CHECK_CONNECT_TIMEOUT,
+    URL_CHECK_READ_TIMEOUT,
+)
 
 if TYPE_CHECKING:
     from pydantic.error_wrappers import ErrorDict
 
 
+url_cache = URLCache()
+"""网址检查结果缓存"""
+
+URL_CHECK_TIMEOUT = httpx.Timeout(
+    URL_CHECK_READ_TIMEOUT, connect=URL_CHECK_CONNECT_TIMEOUT
+)
+"""网址检查的超时时间"""
+OFFLINE_MESSAGE = "离线模式下没有该网址的检查结果"
+
+
+def get_pypi_url(project_link: str) -> str | None:
+    """获取 PyPI 项目的网址
+
+    使用本地快照时没有网址，返回 None
+    """
+    return project_cache.index.project_url(project_link)
+
+
 def check_pypi(project_link: str) -> bool:
-    """检查项目是否存在"""
-    url = f"https://pypi.org/pypi/{project_link}/json"
+    """检查项目是否存在
+
+    项目的网址与检查方式取决于配置的包索引
+    已经获取过项目信息时直接返回
+    """
+    if project_cache.has_project(project_link):
+        return True
+
+    url = get_pypi_url(project_link)
+    if url is None:
+        return project_cache.index.exists(project_link)
+
     status_code, _ = check_url(url)
     return status_code == 200
 
 
-@cache
+def request_status_code(url: str) -> int:
+    """获取网址的状态码
+
+    先发送 HEAD 请求，如果没有返回 200 再发送 GET 请求确认
+    GET 请求收到响应头后就关闭连接，不下载页面内容
+    """
+    with httpx.Client(timeout=URL_CHECK_TIMEOUT, follow_redirects=True) as client:
+        try:
+            r = client.head(url)
+            if r.status_code == 200:
+                return r.status_code
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            raise
+        except httpx.HTTPError:
+            # 部分网站不支持 HEAD 请求，交给 GET 请求确认
+            pass
+
+        with client.stream("GET", url) as r:
+            return r.status_code
+
+
+async def async_request_status_code(client: httpx.AsyncClient, url: str) -> int:
+    """获取网址的状态码
+
+    与 request_status_code 相同，先发送 HEAD 请求，再使用 GET 请求确认
+    """
+    try:
+        r = await client.head(url, timeout=URL_CHECK_TIMEOUT, follow_redirects=True)
+        if r.status_code == 200:
+            return r.status_code
+    except (httpx.ConnectError, httpx.ConnectTimeout):
+        raise
+    except httpx.HTTPError:
+        pass
+
+    async with client.stream(
+        "GET", url, timeout=URL_CHECK_TIMEOUT, follow_redirects=True
+    ) as r:
+        return r.status_code
+
+
 def check_url(url: str) -> tuple[int, str]:
     """检查网址是否可以访问
 
     返回状态码，如果报错则返回 -1
+
+    结果会被缓存，成功与失败的结果有效期不同
     """
+    if (result := url_cache.get(url)) is not None:
+        return result
+
+    if url_cache.offline:
+        return -1, OFFLINE_MESSAGE
+
+    logger.info(f"检查网址 {url}")
+    try:
+        result = request_status_code(url), ""
+    except Exception as e:
+        result = -1, str(e)
+    url_cache.set(url, result)
+    return result
+
+
+async def async_check_url(client: httpx.AsyncClient, url: str) -> tuple[int, str]:
+    """检查网址是否可以访问
+
+    与 check_url 共享检查结果
+    """
+    if (result := url_cache.get(url)) is not None:
+        return result
+
+    if url_cache.offline:
+        return -1, OFFLINE_MESSAGE
+
     logger.info(f"检查网址 {url}")
     try:
-        r = httpx.get(url, follow_redirects=True)
-        return r.status_code, ""
+        result = await async_request_status_code(client, url), ""
     except Exception as e:
-        return -1, str(e)
+        result = -1, str(e)
+    url_cache.set(url, result)
+    return result
+
+
+async def prefetch_urls(
+    urls: Iterable[str], concurrency: int = URL_CHECK_CONCURRENCY
+) -> None:
+    """并发检查网址
+
+    所有请求共用同一个客户端，同时进行的请求数不超过 concurrency
+    检查结果会被保存，之后调用 check_url 时直接返回结果
+    """
+    urls = {url for url in urls if not url_cache.has(url)}
+    if not urls or url_cache.offline:
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(client: httpx.AsyncClient, url: str) -> None:
+        async with semaphore:
+            await async_check_url(client, url)
+
+    async with httpx.AsyncClient() as client:
+        await asyncio.gather(*(check(client, url) for url in urls))
+
+
+def get_duplication_index(data: list[dict[str, Any]]) -> set[tuple[str, str]]:
+    """获取数据列表中所有的 (规范化的 project_link, module_name)
+
+    索引保存在验证上下文中，由调用方决定同一批数据共用哪个索引
+    """
+    return {
+        (normalize_name(x["project_link"]), x["module_name"])
+        for x in data
+        if x.get("project_link") and x.get("module_name")
+    }
 
 
 def get_adapters() -> set[str]:
     """获取适配器列表"""
-    resp = httpx.get(STORE_ADAPTERS_URL)
-    adapters = resp.json()
-    return {adapter["module_name"] for adapter in adapters}
+    return adapter_registry.get()
 
 
 def resolve_adapter_name(name: str) -> str:
@@ -101,24 +101,42 @@ async def app(app: App, tmp_path: Path, mocker: MockerFixture):
 
     yield app
 
-    from src.utils.store_test.utils import get_pypi_data
-
-    get_pypi_data.cache_clear()
-
 
 @pytest.fixture(autouse=True, scope="function")
 def clear_cache(app: App):
     """每次运行前都清除 cache"""
-    from src.utils.validation.utils import check_url
-
-    check_url.cache_clear()
+    from src.utils.package_index import package_index, project_cache
+    from src.utils.validation.adapters import adapter_registry
+    from src.utils.validation.utils import url_cache
+
+    url_cache.clear()
+    url_cache.offline = False
+    adapter_registry.reset()
+    project_cache.use_index(package_index)
+
+
+def simple_json(name: str, *versions: str) -> dict:
+    """生成 PEP 691 简单索引的项目数据，每个版本一个 wheel 文件"""
+    return {
+        "meta": {"api-version": "1.1"},
+        "name": name,
+        "files": [
+            {"filename": f"{name.replace('-', '_')}-{version}-py3-none-any.whl"}
+            for version in versions
+        ],
+    }
 
 
 @pytest.fixture
 def mocked_api(respx_mock: MockRouter):
-    respx_mock.get("exception", name="exception").mock(side_effect=httpx.ConnectError)
+    respx_mock.route(url="exception", name="exception").mock(
+        side_effect=httpx.ConnectError
+    )
+    respx_mock.route(
+        url="https://pypi.org/simple/project-link/", name="project_link"
+    ).respond()
     respx_mock.get(
-        "https://pypi.org/pypi/project_link/json", name="project_link"
+        "https://pypi.org/pypi/project_link/json", name="project_data"
     ).respond(
         json={
             "info": {
@@ -132,8 +150,12 @@ def mocked_api(respx_mock: MockRouter):
         }
     )
     respx_mock.get(
-        "https://pypi.org/pypi/nonebot-plugin-treehelp/json",
+        "https://pypi.org/simple/nonebot-plugin-treehelp/",
         name="project_link_treehelp",
+    ).respond(json=simple_json("nonebot-plugin-treehelp", "0.3.1"))
+    respx_mock.get(
+        "https://pypi.org/pypi/nonebot-plugin-treehelp/json",
+        name="project_data_treehelp",
     ).respond(
         json={
             "info": {
@@ -147,8 +169,12 @@ def mocked_api(respx_mock: MockRouter):
         }
     )
     respx_mock.get(
-        "https://pypi.org/pypi/nonebot-plugin-datastore/json",
+        "https://pypi.org/simple/nonebot-plugin-datastore/",
         name="project_link_datastore",
+    ).respond(json=simple_json("nonebot-plugin-datastore", "1.0.0"))
+    respx_mock.get(
+        "https://pypi.org/pypi/nonebot-plugin-datastore/json",
+        name="project_data_datastore",
     ).respond(
         json={
             "info": {
@@ -157,8 +183,12 @@ def mocked_api(respx_mock: MockRouter):
         }
     )
     respx_mock.get(
-        "https://pypi.org/pypi/nonebot-plugin-wordcloud/json",
+        "https://pypi.org/simple/nonebot-plugin-wordcloud/",
         name="project_link_wordcloud",
+    ).respond(json=simple_json("nonebot-plugin-wordcloud", "0.5.0"))
+    respx_mock.get(
+        "https://pypi.org/pypi/nonebot-plugin-wordcloud/json",
+        name="project_data_wordcloud",
     ).respond(
         json={
             "info": {
@@ -166,14 +196,15 @@ def mocked_api(respx_mock: MockRouter):
             }
         }
     )
-    respx_mock.get(
-        "https://pypi.org/pypi/project_link1/json", name="project_link1"
+    respx_mock.route(
+        url="https://pypi.org/simple/project-link1/", name="project_link1"
     ).respond()
-    respx_mock.get(
-        "https://pypi.org/pypi/project_link_failed/json", name="project_link_failed"
+    respx_mock.route(
+        url="https://pypi.org/simple/project-link-failed/",
+        name="project_link_failed",
     ).respond(404)
-    respx_mock.get("https://www.baidu.com", name="homepage_failed").respond(404)
-    respx_mock.get("https://nonebot.dev/", name="homepage").respond()
+    respx_mock.route(url="https://www.baidu.com", name="homepage_failed").respond(404)
+    respx_mock.route(url="https://nonebot.dev/", name="homepage").respond()
     respx_mock.get(
         "https://raw.githubusercontent.com/nonebot/nonebot2/master/assets/adapters.json",
         name="store_adapters",
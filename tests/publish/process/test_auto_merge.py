@@ -15,7 +15,9 @@ async def test_auto_merge(app: App, mocker: MockerFixture) -> None:
     """
     from src.plugins.publish import auto_merge_matcher
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
 
     mock_installation = mocker.MagicMock()
     mock_installation.id = 123
@@ -69,18 +71,10 @@ async def test_auto_merge(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
         ],  # type: ignore
         any_order=True,
     )
@@ -93,7 +87,9 @@ async def test_auto_merge_need_rebase(app: App, mocker: MockerFixture) -> None:
     """
     from src.plugins.publish import auto_merge_matcher
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
     mock_resolve_conflict_pull_requests = mocker.patch(
         "src.plugins.publish.resolve_conflict_pull_requests"
     )
@@ -152,12 +148,10 @@ async def test_auto_merge_need_rebase(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
             mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
+                ["git", "config", "--global", "safe.directory", "*"]
             ),  # type: ignore
         ],
         any_order=True,
@@ -172,7 +166,9 @@ async def test_auto_merge_not_publish(app: App, mocker: MockerFixture) -> None:
     """
     from src.plugins.publish import auto_merge_matcher
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
     mock_resolve_conflict_pull_requests = mocker.patch(
         "src.plugins.publish.resolve_conflict_pull_requests"
     )
@@ -199,7 +195,7 @@ async def test_auto_merge_not_publish(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
     mock_resolve_conflict_pull_requests.assert_not_called()
 
 
@@ -210,7 +206,9 @@ async def test_auto_merge_not_member(app: App, mocker: MockerFixture) -> None:
     """
     from src.plugins.publish import auto_merge_matcher
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
     mock_resolve_conflict_pull_requests = mocker.patch(
         "src.plugins.publish.resolve_conflict_pull_requests"
     )
@@ -237,7 +235,7 @@ async def test_auto_merge_not_member(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
     mock_resolve_conflict_pull_requests.assert_not_called()
 
 
@@ -248,7 +246,9 @@ async def test_auto_merge_not_approve(app: App, mocker: MockerFixture) -> None:
     """
     from src.plugins.publish import auto_merge_matcher
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
     mock_resolve_conflict_pull_requests = mocker.patch(
         "src.plugins.publish.resolve_conflict_pull_requests"
     )
@@ -275,5 +275,5 @@ async def test_auto_merge_not_approve(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
     mock_resolve_conflict_pull_requests.assert_not_called()
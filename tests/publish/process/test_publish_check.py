@@ -32,8 +32,9 @@ async def test_process_publish_check(
     from src.plugins.publish import publish_check_matcher
     from src.plugins.publish.config import plugin_config
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -138,56 +139,27 @@ async def test_process_publish_check(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "switch", "-C", "publish/issue80"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "config", "--global", "user.name", "test"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
+            mocker.call(["git", "switch", "-C", "publish/issue80"]),
+            mocker.call(["git", "add", "-A"]),
             mocker.call(
                 [
                     "git",
-                    "config",
-                    "--global",
-                    "user.email",
-                    "test@users.noreply.github.com",
-                ],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "add", "-A"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "commit", "-m", ":beers: publish bot test (#80)"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "diff", "origin/publish/issue80", "publish/issue80"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "publish/issue80", "-f"],
-                check=True,
-                capture_output=True,
+                    "-c",
+                    "user.name=test",
+                    "-c",
+                    "user.email=test@users.noreply.github.com",
+                    "commit",
+                    "-m",
+                    ":beers: publish bot test (#80)",
+                ]
             ),
+            mocker.call(["git", "fetch", "origin"]),
+            mocker.call(["git", "diff", "origin/publish/issue80", "publish/issue80"]),
+            mocker.call(["git", "push", "origin", "publish/issue80", "-f"]),
         ]  # type: ignore
     )
 
@@ -219,8 +191,9 @@ async def test_edit_title(
     from src.plugins.publish import publish_check_matcher
     from src.plugins.publish.config import plugin_config
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -351,56 +324,27 @@ async def test_edit_title(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "switch", "-C", "publish/issue80"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "config", "--global", "user.name", "test"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
+            mocker.call(["git", "switch", "-C", "publish/issue80"]),
+            mocker.call(["git", "add", "-A"]),
             mocker.call(
                 [
                     "git",
-                    "config",
-                    "--global",
-                    "user.email",
-                    "test@users.noreply.github.com",
-                ],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "add", "-A"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "commit", "-m", ":beers: publish bot test1 (#80)"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "diff", "origin/publish/issue80", "publish/issue80"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "publish/issue80", "-f"],
-                check=True,
-                capture_output=True,
+                    "-c",
+                    "user.name=test",
+                    "-c",
+                    "user.email=test@users.noreply.github.com",
+                    "commit",
+                    "-m",
+                    ":beers: publish bot test1 (#80)",
+                ]
             ),
+            mocker.call(["git", "fetch", "origin"]),
+            mocker.call(["git", "diff", "origin/publish/issue80", "publish/issue80"]),
+            mocker.call(["git", "push", "origin", "publish/issue80", "-f"]),
         ]  # type: ignore
     )
 
@@ -432,8 +376,9 @@ async def test_edit_title_too_long(
     from src.plugins.publish import publish_check_matcher
     from src.plugins.publish.config import plugin_config
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -537,12 +482,10 @@ async def test_edit_title_too_long(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
             mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
+                ["git", "config", "--global", "safe.directory", "*"]
             )  # type: ignore
         ]
     )
@@ -560,8 +503,9 @@ async def test_process_publish_check_not_pass(
     from src.plugins.publish import publish_check_matcher
     from src.plugins.publish.config import plugin_config
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -653,18 +597,10 @@ async def test_process_publish_check_not_pass(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
         ]  # type: ignore
     )
 
@@ -683,8 +619,9 @@ async def test_comment_at_pull_request(
     """
     from src.plugins.publish import publish_check_matcher
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     async with app.test_matcher(publish_check_matcher) as ctx:
@@ -702,7 +639,7 @@ async def test_comment_at_pull_request(
         ctx.receive_event(bot, event)
 
     assert mocked_api.calls == []
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
 
 
 async def test_issue_state_closed(
@@ -714,8 +651,9 @@ async def test_issue_state_closed(
     """
     from src.plugins.publish import publish_check_matcher
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -755,18 +693,10 @@ async def test_issue_state_closed(
         ctx.receive_event(bot, event)
 
     assert mocked_api.calls == []
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
         ]  # type: ignore
     )
 
@@ -780,8 +710,9 @@ async def test_not_publish_issue(
     """
     from src.plugins.publish import publish_check_matcher
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     async with app.test_matcher(publish_check_matcher) as ctx:
@@ -799,7 +730,7 @@ async def test_not_publish_issue(
 
         ctx.receive_event(bot, event)
 
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
 
 
 async def test_comment_by_self(
@@ -808,8 +739,9 @@ async def test_comment_by_self(
     """测试自己评论触发的情况"""
     from src.plugins.publish import publish_check_matcher
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     async with app.test_matcher(publish_check_matcher) as ctx:
@@ -826,7 +758,7 @@ async def test_comment_by_self(
 
         ctx.receive_event(bot, event)
 
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
 
 
 async def test_skip_plugin_check(
@@ -838,8 +770,9 @@ async def test_skip_plugin_check(
 
     mocker.patch.object(plugin_config, "plugin_test_result", False)
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -951,18 +884,10 @@ async def test_skip_plugin_check(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
         ]  # type: ignore
     )
 
@@ -979,8 +904,9 @@ async def test_convert_pull_request_to_draft(
     from src.plugins.publish import publish_check_matcher
     from src.plugins.publish.config import plugin_config
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -1086,18 +1012,10 @@ async def test_convert_pull_request_to_draft(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
         ]  # type: ignore
     )
 
@@ -1114,8 +1032,9 @@ async def test_process_publish_check_ready_for_review(
     from src.plugins.publish import publish_check_matcher
     from src.plugins.publish.config import plugin_config
 
-    mock_subprocess_run = mocker.patch(
-        "subprocess.run", side_effect=lambda *args, **kwargs: mocker.MagicMock()
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process",
+        side_effect=lambda *args, **kwargs: mocker.MagicMock(),
     )
 
     mock_installation = mocker.MagicMock()
@@ -1235,56 +1154,27 @@ async def test_process_publish_check_ready_for_review(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["pre-commit", "install", "--install-hooks"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "switch", "-C", "publish/issue80"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "config", "--global", "user.name", "test"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["pre-commit", "install", "--install-hooks"]),
+            mocker.call(["git", "switch", "-C", "publish/issue80"]),
+            mocker.call(["git", "add", "-A"]),
             mocker.call(
                 [
                     "git",
-                    "config",
-                    "--global",
-                    "user.email",
-                    "test@users.noreply.github.com",
-                ],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "add", "-A"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "commit", "-m", ":beers: publish bot test (#80)"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "diff", "origin/publish/issue80", "publish/issue80"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "publish/issue80", "-f"],
-                check=True,
-                capture_output=True,
+                    "-c",
+                    "user.name=test",
+                    "-c",
+                    "user.email=test@users.noreply.github.com",
+                    "commit",
+                    "-m",
+                    ":beers: publish bot test (#80)",
+                ]
             ),
+            mocker.call(["git", "fetch", "origin"]),
+            mocker.call(["git", "diff", "origin/publish/issue80", "publish/issue80"]),
+            mocker.call(["git", "push", "origin", "publish/issue80", "-f"]),
         ]  # type: ignore
     )
 
@@ -16,7 +16,9 @@ async def test_process_pull_request(app: App, mocker: MockerFixture) -> None:
 
     event_path = Path(__file__).parent.parent / "events" / "pr-close.json"
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
 
     mock_issue = mocker.MagicMock()
     mock_issue.state = "open"
@@ -101,18 +103,10 @@ async def test_process_pull_request(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "--delete", "publish/issue76"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["git", "push", "origin", "--delete", "publish/issue76"]),
         ],  # type: ignore
         any_order=True,
     )
@@ -123,7 +117,9 @@ async def test_process_pull_request_not_merged(app: App, mocker: MockerFixture)
 
     event_path = Path(__file__).parent.parent / "events" / "pr-close.json"
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
 
     mock_issue = mocker.MagicMock()
     mock_issue.state = "open"
@@ -173,18 +169,10 @@ async def test_process_pull_request_not_merged(app: App, mocker: MockerFixture)
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "--delete", "publish/issue76"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["git", "push", "origin", "--delete", "publish/issue76"]),
         ],  # type: ignore
         any_order=True,
     )
@@ -198,7 +186,9 @@ async def test_process_pull_request_skip_plugin_test(
 
     event_path = Path(__file__).parent.parent / "events" / "pr-close.json"
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
 
     mock_issue = mocker.MagicMock()
     mock_issue.state = "open"
@@ -286,18 +276,10 @@ async def test_process_pull_request_skip_plugin_test(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
+    mock_run_process.assert_has_calls(
         [
-            mocker.call(
-                ["git", "config", "--global", "safe.directory", "*"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "--delete", "publish/issue76"],
-                check=True,
-                capture_output=True,
-            ),
+            mocker.call(["git", "config", "--global", "safe.directory", "*"]),
+            mocker.call(["git", "push", "origin", "--delete", "publish/issue76"]),
         ],  # type: ignore
         any_order=True,
     )
@@ -309,7 +291,9 @@ async def test_not_publish(app: App, mocker: MockerFixture) -> None:
 
     event_path = Path(__file__).parent.parent / "events" / "pr-close.json"
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
 
     async with app.test_matcher(pr_close_matcher) as ctx:
         adapter = get_adapter(Adapter)
@@ -326,7 +310,7 @@ async def test_not_publish(app: App, mocker: MockerFixture) -> None:
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
 
 
 async def test_extract_issue_number_from_ref_failed(
@@ -337,7 +321,9 @@ async def test_extract_issue_number_from_ref_failed(
 
     event_path = Path(__file__).parent.parent / "events" / "pr-close.json"
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
 
     async with app.test_matcher(pr_close_matcher) as ctx:
         adapter = get_adapter(Adapter)
@@ -354,4 +340,4 @@ async def test_extract_issue_number_from_ref_failed(
         ctx.receive_event(bot, event)
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
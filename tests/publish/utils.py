@@ -1,4 +1,6 @@
 import json
+import subprocess
+from pathlib import Path
 
 
 def generate_issue_body_adapter(
@@ -44,3 +46,34 @@ def generate_issue_body_plugin_skip_test(
     config: str = "log_level=DEBUG",
 ):
     return f"""### 插件名称\n\n{name}\n\n### 插件描述\n\n{desc}\n\n### PyPI 项目名\n\n{project_link}\n\n### 插件 import 包名\n\n{module_name}\n\n### 插件项目仓库/主页链接\n\n{homepage}\n\n### 标签\n\n{json.dumps(tags)}\n\n### 插件类型\n\n{tyoe}\n\n### 插件支持的适配器\n\n{json.dumps(supported_adapters)}\n\n### 插件配置项\n\n```dotenv\n{config}\n```"""
+
+
+def git(*args: str, cwd: Path) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def commit(cwd: Path, message: str) -> None:
+    git("add", "-A", cwd=cwd)
+    git(
+        "-c",
+        "user.name=test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "-m",
+        message,
+        cwd=cwd,
+    )
+
+
+def init_repo(path: Path) -> Path:
+    """将目录初始化为仓库，并推送至一个新的远程仓库"""
+    remote = path.parent / f"{path.name}-remote.git"
+    git("init", "--bare", "-b", "master", str(remote), cwd=path.parent)
+    git("init", "-b", "master", cwd=path)
+    commit(path, "init")
+    git("remote", "add", "origin", str(remote), cwd=path)
+    git("push", "origin", "master", cwd=path)
+    return remote
@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from typing import Any, cast
 
+import pytest
 from nonebot import get_adapter
 from nonebot.adapters.github import Adapter, GitHubBot
 from nonebot.adapters.github.config import GitHubApp
@@ -9,22 +10,64 @@ from nonebug import App
 from pytest_mock import MockerFixture
 from respx import MockRouter
 
+from tests.publish.utils import commit, git, init_repo
+
 
 def check_json_data(file: Path, data: Any) -> None:
     with open(file, encoding="utf8") as f:
         assert json.load(f) == data
 
 
+def dump_json(file: Path, data: Any) -> None:
+    file.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n")
+
+
+def prepare_pull_request(
+    path: Path, file: str, branch: str, pull_data: list, merged_data: list
+) -> Path:
+    """创建拉取请求对应的远程分支
+
+    之后主分支上又合并了其他拉取请求，所以拉取请求会与主分支冲突
+    """
+    remote = init_repo(path)
+
+    git("switch", "-c", branch, cwd=path)
+    dump_json(path / file, pull_data)
+    commit(path, "pull request")
+    git("push", "origin", branch, cwd=path)
+    git("switch", "master", cwd=path)
+    git("branch", "-D", branch, cwd=path)
+
+    dump_json(path / file, merged_data)
+    commit(path, "merged")
+    git("push", "origin", "master", cwd=path)
+    return remote
+
+
+def check_pull_request(
+    path: Path, remote: Path, file: str, branch: str, data: Any, message: str
+) -> None:
+    """检查拉取请求分支是否在主分支的基础上重新提交"""
+    content = git("show", f"{branch}:{file}", cwd=remote)
+    assert json.loads(content) == data
+    assert git("rev-parse", f"{branch}^", cwd=remote) == git(
+        "rev-parse", "master", cwd=remote
+    )
+    assert git("log", "-1", "--format=%s", branch, cwd=remote) == f"{message}\n"
+    # 主工作区不受影响，临时工作树也已删除
+    assert git("status", "--porcelain", cwd=path) == ""
+    assert len(git("worktree", "list", cwd=path).splitlines()) == 1
+
+
 async def test_resolve_conflict_pull_requests_adapter(
-    app: App, mocker: MockerFixture, mocked_api: MockRouter, tmp_path: Path
+    app: App,
+    mocker: MockerFixture,
+    mocked_api: MockRouter,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    from src.plugins.publish.config import plugin_config
     from src.plugins.publish.utils import resolve_conflict_pull_requests
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
-    mock_result = mocker.MagicMock()
-    mock_subprocess_run.side_effect = lambda *args, **kwargs: mock_result
-
     mock_label = mocker.MagicMock()
     mock_label.name = "Adapter"
 
@@ -33,23 +76,36 @@ async def test_resolve_conflict_pull_requests_adapter(
     mock_pull.draft = False
     mock_pull.labels = [mock_label]
 
-    with open(tmp_path / "adapters.json", "w", encoding="utf8") as f:
-        json.dump(
-            [
-                {
-                    "module_name": "nonebot.adapters.onebot.v11",
-                    "project_link": "nonebot-adapter-onebot",
-                    "name": "OneBot V11",
-                    "desc": "OneBot V11 协议",
-                    "author": "yanyongyu",
-                    "homepage": "https://onebot.adapters.nonebot.dev/",
-                    "tags": [],
-                    "is_official": True,
-                }
-            ],
-            f,
-            ensure_ascii=False,
-        )
+    base_data = {
+        "module_name": "nonebot.adapters.onebot.v11",
+        "project_link": "nonebot-adapter-onebot",
+        "name": "OneBot V11",
+        "desc": "OneBot V11 协议",
+        "author": "yanyongyu",
+        "homepage": "https://onebot.adapters.nonebot.dev/",
+        "tags": [],
+        "is_official": True,
+    }
+    pull_data = {
+        "module_name": "nonebot.adapters.onebot.v12",
+        "project_link": "nonebot-adapter-onebot",
+        "name": "OneBot V12",
+        "desc": "OneBot V12 协议",
+        "author": "yanyongyu",
+        "homepage": "https://onebot.adapters.nonebot.dev/",
+        "tags": [],
+        "is_official": True,
+    }
+    merged_data = {**base_data, "module_name": "merged", "name": "merged"}
+    dump_json(tmp_path / "adapters.json", [base_data])
+    remote = prepare_pull_request(
+        tmp_path,
+        "adapters.json",
+        "publish/issue1",
+        [base_data, pull_data],
+        [base_data, merged_data],
+    )
+    monkeypatch.chdir(tmp_path)
 
     async with app.test_api() as ctx:
         adapter = get_adapter(Adapter)
@@ -62,95 +118,30 @@ async def test_resolve_conflict_pull_requests_adapter(
 
         await resolve_conflict_pull_requests([mock_pull])
 
-    # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
-        [
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "checkout", "publish/issue1"], check=True, capture_output=True
-            ),
-            mocker.call(["git", "checkout", "master"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "switch", "-C", "publish/issue1"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "config", "--global", "user.name", "yanyongyu"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                [
-                    "git",
-                    "config",
-                    "--global",
-                    "user.email",
-                    "yanyongyu@users.noreply.github.com",
-                ],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "add", "-A"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "commit", "-m", ":beers: publish adapter OneBot V11 (#1)"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "diff", "origin/publish/issue1", "publish/issue1"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "publish/issue1", "-f"],
-                check=True,
-                capture_output=True,
-            ),
-        ]  # type: ignore
+    check_pull_request(
+        tmp_path,
+        remote,
+        "adapters.json",
+        "publish/issue1",
+        [base_data, merged_data, pull_data],
+        ":beers: publish adapter OneBot V12 (#1)",
     )
-
-    # 检查文件是否正确
-    check_json_data(
-        plugin_config.input_config.adapter_path,
-        [
-            {
-                "module_name": "nonebot.adapters.onebot.v11",
-                "project_link": "nonebot-adapter-onebot",
-                "name": "OneBot V11",
-                "desc": "OneBot V11 协议",
-                "author": "yanyongyu",
-                "homepage": "https://onebot.adapters.nonebot.dev/",
-                "tags": [],
-                "is_official": True,
-            },
-            {
-                "module_name": "nonebot.adapters.onebot.v11",
-                "project_link": "nonebot-adapter-onebot",
-                "name": "OneBot V11",
-                "desc": "OneBot V11 协议",
-                "author": "yanyongyu",
-                "homepage": "https://onebot.adapters.nonebot.dev/",
-                "tags": [],
-                "is_official": True,
-            },
-        ],
+    assert git("log", "-1", "--format=%an <%ae>", "publish/issue1", cwd=remote) == (
+        "yanyongyu <yanyongyu@users.noreply.github.com>\n"
     )
 
     assert not mocked_api["homepage"].called
 
 
 async def test_resolve_conflict_pull_requests_bot(
-    app: App, mocker: MockerFixture, mocked_api: MockRouter, tmp_path: Path
+    app: App,
+    mocker: MockerFixture,
+    mocked_api: MockRouter,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    from src.plugins.publish.config import plugin_config
     from src.plugins.publish.utils import resolve_conflict_pull_requests
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
-    mock_result = mocker.MagicMock()
-    mock_subprocess_run.side_effect = lambda *args, **kwargs: mock_result
-
     mock_label = mocker.MagicMock()
     mock_label.name = "Bot"
 
@@ -159,21 +150,25 @@ async def test_resolve_conflict_pull_requests_bot(
     mock_pull.draft = False
     mock_pull.labels = [mock_label]
 
-    with open(tmp_path / "bots.json", "w", encoding="utf8") as f:
-        json.dump(
-            [
-                {
-                    "name": "CoolQBot",
-                    "desc": "基于 NoneBot2 的聊天机器人",
-                    "author": "he0119",
-                    "homepage": "https://github.com/he0119/CoolQBot",
-                    "tags": [],
-                    "is_official": False,
-                }
-            ],
-            f,
-            ensure_ascii=False,
-        )
+    base_data = {
+        "name": "CoolQBot",
+        "desc": "基于 NoneBot2 的聊天机器人",
+        "author": "he0119",
+        "homepage": "https://github.com/he0119/CoolQBot",
+        "tags": [],
+        "is_official": False,
+    }
+    pull_data = {**base_data, "name": "NewBot"}
+    merged_data = {**base_data, "name": "merged"}
+    dump_json(tmp_path / "bots.json", [base_data])
+    remote = prepare_pull_request(
+        tmp_path,
+        "bots.json",
+        "publish/issue1",
+        [base_data, pull_data],
+        [base_data, merged_data],
+    )
+    monkeypatch.chdir(tmp_path)
 
     async with app.test_api() as ctx:
         adapter = get_adapter(Adapter)
@@ -186,91 +181,27 @@ async def test_resolve_conflict_pull_requests_bot(
 
         await resolve_conflict_pull_requests([mock_pull])
 
-    # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
-        [
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "checkout", "publish/issue1"], check=True, capture_output=True
-            ),
-            mocker.call(["git", "checkout", "master"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "switch", "-C", "publish/issue1"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "config", "--global", "user.name", "he0119"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                [
-                    "git",
-                    "config",
-                    "--global",
-                    "user.email",
-                    "he0119@users.noreply.github.com",
-                ],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "add", "-A"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "commit", "-m", ":beers: publish bot CoolQBot (#1)"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "diff", "origin/publish/issue1", "publish/issue1"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "publish/issue1", "-f"],
-                check=True,
-                capture_output=True,
-            ),
-        ]  # type: ignore
-    )
-
-    # 检查文件是否正确
-    check_json_data(
-        plugin_config.input_config.bot_path,
-        [
-            {
-                "name": "CoolQBot",
-                "desc": "基于 NoneBot2 的聊天机器人",
-                "author": "he0119",
-                "homepage": "https://github.com/he0119/CoolQBot",
-                "tags": [],
-                "is_official": False,
-            },
-            {
-                "name": "CoolQBot",
-                "desc": "基于 NoneBot2 的聊天机器人",
-                "author": "he0119",
-                "homepage": "https://github.com/he0119/CoolQBot",
-                "tags": [],
-                "is_official": False,
-            },
-        ],
+    check_pull_request(
+        tmp_path,
+        remote,
+        "bots.json",
+        "publish/issue1",
+        [base_data, merged_data, pull_data],
+        ":beers: publish bot NewBot (#1)",
     )
 
     assert not mocked_api["homepage"].called
 
 
 async def test_resolve_conflict_pull_requests_plugin(
-    app: App, mocker: MockerFixture, mocked_api: MockRouter, tmp_path: Path
+    app: App,
+    mocker: MockerFixture,
+    mocked_api: MockRouter,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    from src.plugins.publish.config import plugin_config
     from src.plugins.publish.utils import resolve_conflict_pull_requests
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
-    mock_result = mocker.MagicMock()
-    mock_subprocess_run.side_effect = lambda *args, **kwargs: mock_result
-
     mock_label = mocker.MagicMock()
     mock_label.name = "Plugin"
 
@@ -280,20 +211,28 @@ async def test_resolve_conflict_pull_requests_plugin(
     mock_pull.labels = [mock_label]
     mock_pull.title = "Plugin: 帮助"
 
-    with open(tmp_path / "plugins.json", "w", encoding="utf8") as f:
-        json.dump(
-            [
-                {
-                    "module_name": "nonebot_plugin_treehelp",
-                    "project_link": "nonebot-plugin-treehelp",
-                    "author": "he0119",
-                    "tags": [],
-                    "is_official": True,
-                }
-            ],
-            f,
-            ensure_ascii=False,
-        )
+    base_data = {
+        "module_name": "nonebot_plugin_treehelp",
+        "project_link": "nonebot-plugin-treehelp",
+        "author": "he0119",
+        "tags": [],
+        "is_official": True,
+    }
+    pull_data = {
+        **base_data,
+        "module_name": "nonebot_plugin_help",
+        "project_link": "nonebot-plugin-help",
+    }
+    merged_data = {**base_data, "module_name": "merged", "project_link": "merged"}
+    dump_json(tmp_path / "plugins.json", [base_data])
+    remote = prepare_pull_request(
+        tmp_path,
+        "plugins.json",
+        "publish/issue1",
+        [base_data, pull_data],
+        [base_data, merged_data],
+    )
+    monkeypatch.chdir(tmp_path)
 
     async with app.test_api() as ctx:
         adapter = get_adapter(Adapter)
@@ -306,78 +245,85 @@ async def test_resolve_conflict_pull_requests_plugin(
 
         await resolve_conflict_pull_requests([mock_pull])
 
-    # 测试 git 命令
-    mock_subprocess_run.assert_has_calls(
-        [
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "checkout", "publish/issue1"], check=True, capture_output=True
-            ),
-            mocker.call(["git", "checkout", "master"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "switch", "-C", "publish/issue1"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "config", "--global", "user.name", "he0119"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                [
-                    "git",
-                    "config",
-                    "--global",
-                    "user.email",
-                    "he0119@users.noreply.github.com",
-                ],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "add", "-A"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "commit", "-m", ":beers: publish plugin 帮助 (#1)"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(["git", "fetch", "origin"], check=True, capture_output=True),
-            mocker.call(
-                ["git", "diff", "origin/publish/issue1", "publish/issue1"],
-                check=True,
-                capture_output=True,
-            ),
-            mocker.call(
-                ["git", "push", "origin", "publish/issue1", "-f"],
-                check=True,
-                capture_output=True,
-            ),
-        ]  # type: ignore
+    # 仓库内的 plugins.json 中没有插件名称
+    check_pull_request(
+        tmp_path,
+        remote,
+        "plugins.json",
+        "publish/issue1",
+        [base_data, merged_data, pull_data],
+        ":beers: publish plugin 帮助 (#1)",
     )
 
-    # 检查文件是否正确
-    # 因为没有进行 git 操作，所有会有两个插件信息
-    check_json_data(
-        plugin_config.input_config.plugin_path,
-        [
-            {
-                "module_name": "nonebot_plugin_treehelp",
-                "project_link": "nonebot-plugin-treehelp",
-                "author": "he0119",
-                "tags": [],
-                "is_official": True,
-            },
-            {
-                "module_name": "nonebot_plugin_treehelp",
-                "project_link": "nonebot-plugin-treehelp",
-                "author": "he0119",
-                "tags": [],
-                "is_official": True,
-            },
-        ],
+    assert not mocked_api["homepage"].called
+
+
+async def test_resolve_conflict_pull_requests_isolated(
+    app: App,
+    mocker: MockerFixture,
+    mocked_api: MockRouter,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """同时处理多个拉取请求，其中一个失败不影响其他拉取请求"""
+    from src.plugins.publish.utils import resolve_conflict_pull_requests
+
+    mock_label = mocker.MagicMock()
+    mock_label.name = "Bot"
+
+    mock_pull = mocker.MagicMock()
+    mock_pull.head.ref = "publish/issue1"
+    mock_pull.draft = False
+    mock_pull.labels = [mock_label]
+
+    # 远程仓库中不存在这个分支
+    mock_missing_pull = mocker.MagicMock()
+    mock_missing_pull.head.ref = "publish/issue2"
+    mock_missing_pull.draft = False
+    mock_missing_pull.labels = [mock_label]
+
+    base_data = {
+        "name": "CoolQBot",
+        "desc": "基于 NoneBot2 的聊天机器人",
+        "author": "he0119",
+        "homepage": "https://github.com/he0119/CoolQBot",
+        "tags": [],
+        "is_official": False,
+    }
+    pull_data = {**base_data, "name": "NewBot"}
+    merged_data = {**base_data, "name": "merged"}
+    dump_json(tmp_path / "bots.json", [base_data])
+    remote = prepare_pull_request(
+        tmp_path,
+        "bots.json",
+        "publish/issue1",
+        [base_data, pull_data],
+        [base_data, merged_data],
     )
+    monkeypatch.chdir(tmp_path)
 
-    assert not mocked_api["homepage"].called
+    async with app.test_api() as ctx:
+        adapter = get_adapter(Adapter)
+        bot = ctx.create_bot(
+            base=GitHubBot,
+            adapter=adapter,
+            self_id=GitHubApp(app_id="1", private_key="1"),  # type: ignore
+        )
+        bot = cast(GitHubBot, bot)
+
+        await resolve_conflict_pull_requests([mock_missing_pull, mock_pull])
+
+    check_pull_request(
+        tmp_path,
+        remote,
+        "bots.json",
+        "publish/issue1",
+        [base_data, merged_data, pull_data],
+        ":beers: publish bot NewBot (#1)",
+    )
+    assert (
+        git("ls-remote", "--heads", str(remote), "publish/issue2", cwd=tmp_path) == ""
+    )
 
 
 async def test_resolve_conflict_pull_requests_draft(
@@ -386,9 +332,11 @@ async def test_resolve_conflict_pull_requests_draft(
     from src.plugins.publish.config import plugin_config
     from src.plugins.publish.utils import resolve_conflict_pull_requests
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
     mock_result = mocker.MagicMock()
-    mock_subprocess_run.side_effect = lambda *args, **kwargs: mock_result
+    mock_run_process.side_effect = lambda *args, **kwargs: mock_result
 
     mock_label = mocker.MagicMock()
     mock_label.name = "Bot"
@@ -426,7 +374,7 @@ async def test_resolve_conflict_pull_requests_draft(
         await resolve_conflict_pull_requests([mock_pull])
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
 
     # 检查文件是否正确
     check_json_data(
@@ -452,9 +400,11 @@ async def test_resolve_conflict_pull_requests_ref(
     from src.plugins.publish.config import plugin_config
     from src.plugins.publish.utils import resolve_conflict_pull_requests
 
-    mock_subprocess_run = mocker.patch("subprocess.run")
+    mock_run_process = mocker.patch(
+        "src.plugins.publish.utils.run_process", return_value=mocker.MagicMock()
+    )
     mock_result = mocker.MagicMock()
-    mock_subprocess_run.side_effect = lambda *args, **kwargs: mock_result
+    mock_run_process.side_effect = lambda *args, **kwargs: mock_result
 
     mock_label = mocker.MagicMock()
     mock_label.name = "Bot"
@@ -492,7 +442,7 @@ async def test_resolve_conflict_pull_requests_ref(
         await resolve_conflict_pull_requests([mock_pull])
 
     # 测试 git 命令
-    mock_subprocess_run.assert_not_called()
+    mock_run_process.assert_not_called()
 
     # 检查文件是否正确
     check_json_data(
@@ -510,3 +460,138 @@ async def test_resolve_conflict_pull_requests_ref(
     )
 
     assert not mocked_api["homepage"].called
+
+
+async def test_resolve_conflict_pull_requests_skip_mergeable(
+    app: App,
+    mocker: MockerFixture,
+    mocked_api: MockRouter,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """可以与主分支合并的拉取请求不需要重新提交"""
+    from src.plugins.publish.utils import resolve_conflict_pull_requests
+
+    mock_label = mocker.MagicMock()
+    mock_label.name = "Bot"
+
+    mock_pull = mocker.MagicMock()
+    mock_pull.head.ref = "publish/issue1"
+    mock_pull.draft = False
+    mock_pull.labels = [mock_label]
+
+    base_data = {
+        "name": "CoolQBot",
+        "desc": "基于 NoneBot2 的聊天机器人",
+        "author": "he0119",
+        "homepage": "https://github.com/he0119/CoolQBot",
+        "tags": [],
+        "is_official": False,
+    }
+    pull_data = {**base_data, "name": "NewBot"}
+    dump_json(tmp_path / "bots.json", [base_data])
+    remote = init_repo(tmp_path)
+    git("switch", "-c", "publish/issue1", cwd=tmp_path)
+    dump_json(tmp_path / "bots.json", [base_data, pull_data])
+    commit(tmp_path, "pull request")
+    git("push", "origin", "publish/issue1", cwd=tmp_path)
+    git("switch", "master", cwd=tmp_path)
+    git("branch", "-D", "publish/issue1", cwd=tmp_path)
+    # 主分支上合并的是其他文件的修改
+    adapters = json.loads((tmp_path / "adapters.json").read_text())
+    dump_json(tmp_path / "adapters.json", [*adapters, {"name": "merged"}])
+    commit(tmp_path, "merged adapter")
+    git("push", "origin", "master", cwd=tmp_path)
+    monkeypatch.chdir(tmp_path)
+    commit_id = git("rev-parse", "publish/issue1", cwd=remote)
+
+    async with app.test_api() as ctx:
+        adapter = get_adapter(Adapter)
+        bot = ctx.create_bot(
+            base=GitHubBot,
+            adapter=adapter,
+            self_id=GitHubApp(app_id="1", private_key="1"),  # type: ignore
+        )
+        bot = cast(GitHubBot, bot)
+
+        await resolve_conflict_pull_requests([mock_pull], skip_mergeable=True)
+
+    assert git("rev-parse", "publish/issue1", cwd=remote) == commit_id
+
+
+async def test_resolve_conflict_pull_requests_skip_mergeable_conflict(
+    app: App,
+    mocker: MockerFixture,
+    mocked_api: MockRouter,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """双方都在列表末尾添加数据时 git 无法合并，需要重新提交"""
+    from src.plugins.publish.utils import resolve_conflict_pull_requests
+
+    mock_label = mocker.MagicMock()
+    mock_label.name = "Bot"
+
+    mock_pull = mocker.MagicMock()
+    mock_pull.head.ref = "publish/issue1"
+    mock_pull.draft = False
+    mock_pull.labels = [mock_label]
+
+    base_data = {
+        "name": "CoolQBot",
+        "desc": "基于 NoneBot2 的聊天机器人",
+        "author": "he0119",
+        "homepage": "https://github.com/he0119/CoolQBot",
+        "tags": [],
+        "is_official": False,
+    }
+    pull_data = {**base_data, "name": "NewBot"}
+    merged_data = {**base_data, "name": "merged"}
+    dump_json(tmp_path / "bots.json", [base_data])
+    remote = prepare_pull_request(
+        tmp_path,
+        "bots.json",
+        "publish/issue1",
+        [base_data, pull_data],
+        [base_data, merged_data],
+    )
+    monkeypatch.chdir(tmp_path)
+
+    async with app.test_api() as ctx:
+        adapter = get_adapter(Adapter)
+        bot = ctx.create_bot(
+            base=GitHubBot,
+            adapter=adapter,
+            self_id=GitHubApp(app_id="1", private_key="1"),  # type: ignore
+        )
+        bot = cast(GitHubBot, bot)
+
+        await resolve_conflict_pull_requests([mock_pull], skip_mergeable=True)
+
+    check_pull_request(
+        tmp_path,
+        remote,
+        "bots.json",
+        "publish/issue1",
+        [base_data, merged_data, pull_data],
+        ":beers: publish bot NewBot (#1)",
+    )
+
+
+async def test_is_mergeable_unsupported(app: App, mocker: MockerFixture) -> None:
+    """git 版本过低不支持 merge-tree --write-tree 时视为无法合并"""
+    import subprocess
+
+    from src.plugins.publish.utils import is_mergeable
+
+    mock_pull = mocker.MagicMock()
+    mock_pull.head.ref = "publish/issue1"
+    mocked_run = mocker.patch(
+        "src.plugins.publish.utils.run_shell_command",
+        side_effect=subprocess.CalledProcessError(
+            129, ["git", "merge-tree"], b"", b"usage: git merge-tree"
+        ),
+    )
+
+    assert not await is_mergeable(mock_pull)
+    mocked_run.assert_awaited_once()
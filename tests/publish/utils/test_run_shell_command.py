@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import time
+
+import pytest
+from nonebug import App
+
+
+async def test_run_shell_command(app: App) -> None:
+    from src.plugins.publish.utils import run_shell_command
+
+    r = await run_shell_command([sys.executable, "-c", "print('hello')"])
+
+    assert r.returncode == 0
+    assert r.stdout.strip() == b"hello"
+
+
+async def test_run_shell_command_failed(app: App) -> None:
+    from src.plugins.publish.utils import run_shell_command
+
+    with pytest.raises(subprocess.CalledProcessError) as e:
+        await run_shell_command(
+            [
+                sys.executable,
+                "-c",
+                "import sys; sys.stderr.write('error'); sys.exit(2)",
+            ]
+        )
+
+    assert e.value.returncode == 2
+    assert e.value.stderr == b"error"
+
+
+async def test_run_process_timeout(app: App) -> None:
+    from src.plugins.publish.utils import run_process
+
+    start = time.perf_counter()
+    with pytest.raises(subprocess.TimeoutExpired):
+        await run_process(
+            [sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.5
+        )
+
+    assert time.perf_counter() - start < 5
+
+
+async def test_run_process_output_limit(app: App) -> None:
+    """超过限制的输出会被丢弃，但命令仍然能正常结束"""
+    from src.plugins.publish.utils import run_process
+
+    r = await run_process(
+        [sys.executable, "-c", "import sys; sys.stdout.write('a' * 1000000)"],
+        output_limit=100,
+    )
+
+    assert r.returncode == 0
+    assert r.stdout == b"a" * 100
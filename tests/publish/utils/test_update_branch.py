@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from nonebug import App
+from pytest_mock import MockerFixture
+
+from tests.publish.utils import git, init_repo
+
+
+async def test_update_branch_dulwich(
+    app: App, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """进程内提交时不运行 git 命令，也不修改工作区"""
+    from src.plugins.publish.config import plugin_config
+    from src.plugins.publish.utils import update_branch
+    from src.utils.validation import PublishType, ValidationDict
+
+    mocker.patch.object(plugin_config, "git_backend", "dulwich")
+    mock_run_process = mocker.patch("src.plugins.publish.utils.run_process")
+
+    remote = init_repo(tmp_path)
+    # 让 base 的提交时间早于当前时间
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + ["commit", "--amend", "--no-edit", "--date=2000-01-01T00:00:00"],
+        cwd=tmp_path,
+        check=True,
+        env=os.environ | {"GIT_COMMITTER_DATE": "2000-01-01T00:00:00"},
+    )
+    git("push", "-f", "origin", "master", cwd=tmp_path)
+    start = int(time.time())
+    original = (tmp_path / "bots.json").read_text()
+
+    data = {
+        "name": "CoolQBot",
+        "desc": "基于 NoneBot2 的聊天机器人",
+        "author": "he0119",
+        "homepage": "https://github.com/he0119/CoolQBot",
+        "tags": [],
+        "is_official": False,
+    }
+    result = ValidationDict(
+        valid=True,
+        type=PublishType.BOT,
+        name="CoolQBot",
+        author="he0119",
+        data=data,
+        errors=[],
+    )
+
+    await update_branch(result, "publish/issue1", 1)
+
+    mock_run_process.assert_not_called()
+    assert (tmp_path / "bots.json").read_text() == original
+    assert git("status", "--porcelain", cwd=tmp_path) == ""
+
+    content = git("show", "publish/issue1:bots.json", cwd=remote)
+    assert (
+        content
+        == json.dumps([*json.loads(original), data], ensure_ascii=False, indent=2)
+        + "\n"
+    )
+    assert git("log", "-1", "--format=%an <%ae>%n%s", "publish/issue1", cwd=remote) == (
+        "he0119 <he0119@users.noreply.github.com>\n"
+        ":beers: publish bot CoolQBot (#1)\n"
+    )
+    assert git("rev-parse", "publish/issue1^", cwd=remote) == git(
+        "rev-parse", "master", cwd=remote
+    )
+
+    # 提交时间为当前时间，而不是 base 的时间
+    commit_time = int(git("log", "-1", "--format=%ct", "publish/issue1", cwd=remote))
+    assert commit_time >= start
+
+    # 远程分支中的文件与更新后相同时不再推送
+    commit = git("rev-parse", "publish/issue1", cwd=remote)
+    await update_branch(result, "publish/issue1", 1)
+    assert git("rev-parse", "publish/issue1", cwd=remote) == commit
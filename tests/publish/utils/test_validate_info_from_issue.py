@@ -20,7 +20,7 @@ async def test_validate_info_from_issue_adapter(
     mock_issue.body = generate_issue_body_adapter()
     mock_issue.user.login = "test"
 
-    result = validate_info_from_issue(mock_issue, PublishType.ADAPTER)
+    result = await validate_info_from_issue(mock_issue, PublishType.ADAPTER)
 
     assert result["valid"]
     assert mocked_api["homepage"].called
@@ -36,7 +36,7 @@ async def test_validate_info_from_issue_bot(
     mock_issue.body = generate_issue_body_bot()
     mock_issue.user.login = "test"
 
-    result = validate_info_from_issue(mock_issue, PublishType.BOT)
+    result = await validate_info_from_issue(mock_issue, PublishType.BOT)
 
     assert result["valid"]
     assert mocked_api["homepage"].called
@@ -55,7 +55,7 @@ async def test_validate_info_from_issue_plugin(
     mock_issue.body = generate_issue_body_plugin_skip_test()
     mock_issue.user.login = "test"
 
-    result = validate_info_from_issue(mock_issue, PublishType.PLUGIN)
+    result = await validate_info_from_issue(mock_issue, PublishType.PLUGIN)
 
     assert result["valid"]
     assert mocked_api["homepage"].called
@@ -85,7 +85,7 @@ async def test_validate_info_from_issue_plugin_metadata(
     mock_issue.body = generate_issue_body_plugin()
     mock_issue.user.login = "test"
 
-    result = validate_info_from_issue(mock_issue, PublishType.PLUGIN)
+    result = await validate_info_from_issue(mock_issue, PublishType.PLUGIN)
 
     assert result["valid"]
     assert mocked_api["homepage"].called
@@ -101,7 +101,7 @@ async def test_validate_info_from_issue_plugin_metadata_missing(
     mock_issue.body = generate_issue_body_plugin()
     mock_issue.user.login = "test"
 
-    result = validate_info_from_issue(mock_issue, PublishType.PLUGIN)
+    result = await validate_info_from_issue(mock_issue, PublishType.PLUGIN)
 
     assert not result["valid"]
     assert not mocked_api["homepage"].called
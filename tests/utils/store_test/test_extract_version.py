@@ -31,6 +31,25 @@ required by
     assert version == "2.0.1"
 
 
+def test_extract_version_pip(tmp_path: Path):
+    """离线测试时 pip show 的输出"""
+    from src.utils.store_test.validation import extract_version
+
+    with open(tmp_path / "output.txt", "w", encoding="utf8") as f:
+        f.write(
+            """
+插件 nonebot2 的信息如下：
+    Name: nonebot2
+    Version: 2.0.1
+    Summary: An asynchronous python bot framework.
+    Requires: httpx, loguru, pydantic, pygtrie, tomli, typing-extensions, yarl
+"""
+        )
+
+    version = extract_version(tmp_path, "nonebot2")
+    assert version == "2.0.1"
+
+
 def test_extract_version_failed(tmp_path: Path):
     """版本解析失败的情况"""
     from src.utils.store_test.validation import extract_version
@@ -64,3 +83,33 @@ def test_extract_version_failed(tmp_path: Path):
     version = extract_version(tmp_path, "nonebot2")
 
     assert version is None
+
+
+def test_extract_dependencies(tmp_path: Path):
+    """提取依赖的商店插件"""
+    from src.utils.store_test.validation import extract_dependencies
+
+    with open(tmp_path / "output.txt", "w", encoding="utf8") as f:
+        f.write('RESULT=True\nDEPENDENCIES=["nonebot_plugin_datastore"]\n')
+
+    assert extract_dependencies(tmp_path) == ["nonebot_plugin_datastore"]
+
+    with open(tmp_path / "output.txt", "w", encoding="utf8") as f:
+        f.write("RESULT=False\n")
+
+    assert extract_dependencies(tmp_path) == []
+
+
+def test_extract_profile(tmp_path: Path):
+    """提取插件加载耗时"""
+    from src.utils.store_test.validation import extract_profile
+
+    with open(tmp_path / "output.txt", "w", encoding="utf8") as f:
+        f.write('RESULT=True\nPROFILE={"init": 1.0, "load": 2.0}\n')
+
+    assert extract_profile(tmp_path) == {"init": 1.0, "load": 2.0}
+
+    with open(tmp_path / "output.txt", "w", encoding="utf8") as f:
+        f.write("RESULT=False\n")
+
+    assert extract_profile(tmp_path) is None
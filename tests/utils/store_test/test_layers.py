@@ -0,0 +1,175 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+def test_sort_by_dependencies() -> None:
+    """被依赖的插件排在前面，其他情况保持原有顺序"""
+    from src.utils.store_test.layers import sort_by_dependencies
+
+    assert sort_by_dependencies(
+        ["a", "b", "c", "d"], {"a": ["c"], "b": ["x"], "c": ["d"]}
+    ) == ["b", "d", "c", "a"]
+    # 循环依赖
+    assert sort_by_dependencies(["a", "b", "c"], {"a": ["b"], "b": ["a"]}) == [
+        "c",
+        "a",
+        "b",
+    ]
+
+
+def test_copy_environment(tmp_path: Path) -> None:
+    """复制测试环境时不复制测试文件，site-packages 中只读的文件使用硬链接"""
+    import os
+
+    from src.utils.plugin_test import copy_environment
+
+    source = tmp_path / "source"
+    site_packages = source / ".venv" / "lib" / "python3.11" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (site_packages / "runner.py").write_text("library")
+    (site_packages / "runner.py").chmod(0o444)
+    (site_packages / "data.json").write_text("{}")
+    (source / "pyproject.toml").write_text("[tool.poetry]")
+    (source / "runner.py").write_text("runner")
+    (source / "output.txt").write_text("RESULT=True")
+    (source / ".venv" / "bin").mkdir()
+    (source / ".venv" / "bin" / "python").symlink_to("/usr/bin/python3")
+
+    target = tmp_path / "target"
+    copy_environment(source, target)
+
+    assert (target / "pyproject.toml").read_text() == "[tool.poetry]"
+    assert not (target / "pyproject.toml").samefile(source / "pyproject.toml")
+    assert not (target / "runner.py").exists()
+    assert not (target / "output.txt").exists()
+    copied = target / ".venv" / "lib" / "python3.11" / "site-packages" / "runner.py"
+    assert copied.samefile(site_packages / "runner.py")
+    # 可写的文件可能在运行时被插件修改，不能共用
+    copied = target / ".venv" / "lib" / "python3.11" / "site-packages" / "data.json"
+    assert copied.read_text() == "{}"
+    assert not copied.samefile(site_packages / "data.json")
+    assert os.readlink(target / ".venv" / "bin" / "python") == "/usr/bin/python3"
+
+
+def test_unpin_dependency(tmp_path: Path) -> None:
+    """只修改依赖中对应插件的版本约束"""
+    from src.utils.plugin_test import unpin_dependency
+
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.poetry]\n"
+        'version = "0.1.0"\n'
+        "\n"
+        "[tool.poetry.dependencies]\n"
+        'python = "^3.11"\n'
+        'nonebot2 = {extras = ["fastapi"], version = "^2.1.0"}\n'
+        'nonebot-plugin-datastore = "^1.1.2"\n'
+    )
+
+    unpin_dependency(tmp_path, "nonebot_plugin_datastore")
+    unpin_dependency(tmp_path, "nonebot2")
+
+    assert (tmp_path / "pyproject.toml").read_text() == (
+        "[tool.poetry]\n"
+        'version = "0.1.0"\n'
+        "\n"
+        "[tool.poetry.dependencies]\n"
+        'python = "^3.11"\n'
+        'nonebot2 = {extras = ["fastapi"], version = "*"}\n'
+        'nonebot-plugin-datastore = "*"\n'
+    )
+
+
+def test_copy_environment_pip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """复制的环境中 bin 下脚本的 shebang 仍指向原环境，需要通过 python -m pip 运行"""
+    import subprocess
+    import sys
+
+    from src.utils.plugin_test import WHEELS_DIR_ENV, PluginTest, copy_environment
+
+    source = tmp_path / "source"
+    source.mkdir()
+    subprocess.run([sys.executable, "-m", "venv", ".venv"], cwd=source, check=True)
+
+    target = tmp_path / "target"
+    copy_environment(source, target)
+
+    monkeypatch.setenv(WHEELS_DIR_ENV, str(tmp_path))
+    assert PluginTest("project_link", "module_name").get_install_command() == (
+        f".venv/bin/python -m pip install --no-index --find-links {tmp_path} project_link"
+    )
+    r = subprocess.run(
+        [".venv/bin/python", "-m", "pip", "--version"],
+        cwd=target,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert str(target / ".venv") in r.stdout
+
+
+async def test_dependency_layers(tmp_path: Path, mocker: MockerFixture) -> None:
+    """被多个插件依赖但本次不测试的库插件，在后台创建环境"""
+    from src.utils.store_test.layers import DependencyLayers
+
+    async def prepare_environment(path: Path, *packages: str) -> bool:
+        (path / ".venv").mkdir(parents=True)
+        return True
+
+    mocked_prepare = mocker.patch(
+        "src.utils.store_test.layers.PluginTest.prepare_environment",
+        side_effect=prepare_environment,
+    )
+
+    layers = DependencyLayers(
+        tmp_path / "layers",
+        {"a": ["lib"], "b": ["lib", "c"], "d": ["other"]},
+        {"lib": "nonebot-plugin-lib", "other": "nonebot-plugin-other"},
+    )
+    layers.plan(["a", "b", "c", "d"])
+
+    # c 被 b 依赖且参与测试，测试通过后保存环境
+    assert layers.snapshot("c") == tmp_path / "layers" / "c"
+    assert layers.snapshot("a") is None
+
+    assert await layers.checkout("a") == tmp_path / "layers" / "a-test"
+    assert (tmp_path / "layers" / "a-test" / ".venv").exists()
+    # other 只被一个插件依赖，不单独创建环境
+    assert await layers.checkout("d") is None
+    mocked_prepare.assert_called_once_with(
+        tmp_path / "layers" / "lib", "nonebot-plugin-lib"
+    )
+
+    await layers.close()
+    assert not (tmp_path / "layers").exists()
+
+
+async def test_offline_network_blocked(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> None:
+    """离线测试时代理指向无法连接的地址，并在没有网络的命名空间中运行"""
+    from src.utils.plugin_test import OFFLINE_PROXY, WHEELS_DIR_ENV, PluginTest
+
+    monkeypatch.setenv("NO_PROXY", "*")
+    assert "HTTP_PROXY" not in PluginTest("project_link", "module_name").get_env()
+
+    monkeypatch.setenv(WHEELS_DIR_ENV, str(tmp_path))
+    env = PluginTest("project_link", "module_name").get_env()
+    assert env["PIP_NO_INDEX"] == "1"
+    assert env["HTTPS_PROXY"] == env["https_proxy"] == OFFLINE_PROXY
+    assert "NO_PROXY" not in env
+
+    mocker.patch(
+        "src.utils.plugin_test.get_network_sandbox",
+        return_value="unshare --net --map-root-user ",
+    )
+    mocked_shell = mocker.patch(
+        "src.utils.plugin_test.create_subprocess_shell", side_effect=OSError
+    )
+    test = PluginTest("project_link", "module_name")
+    with pytest.raises(OSError):
+        await test._run_runner(env)
+    assert mocked_shell.call_args.args[0] == (
+        "unshare --net --map-root-user .venv/bin/python -X importtime runner.py"
+    )
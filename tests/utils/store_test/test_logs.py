@@ -0,0 +1,49 @@
+from pathlib import Path
+
+
+def test_tail_excerpt():
+    """只保留末尾的完整行"""
+    from src.utils.store_test.utils import tail_excerpt
+
+    assert tail_excerpt("short", 10) == "short"
+
+    text = "\n".join(f"line {i}" for i in range(100))
+    assert tail_excerpt(text, 20) == "...\nline 98\nline 99"
+
+
+def test_save_log(tmp_path: Path):
+    """压缩保存的日志可以完整读取，相同内容只保存一次"""
+    from src.utils.plugin_test import load_log, save_log
+
+    logs_dir = tmp_path / "logs"
+    text = "\x1b[32m加载成功\x1b[0m\n" * 10000
+
+    ref = save_log(logs_dir, text)
+
+    assert save_log(logs_dir, text) == ref
+    assert [path.name for path in logs_dir.iterdir()] == [f"{ref}.log.gz"]
+    assert (logs_dir / f"{ref}.log.gz").stat().st_size < len(text.encode()) // 10
+    assert load_log(logs_dir, ref) == text
+
+
+def test_prune_logs(tmp_path: Path):
+    """删除没有测试结果引用的日志"""
+    from typing import Any
+
+    from src.utils.plugin_test import save_log
+    from src.utils.store_test.utils import prune_logs
+
+    logs_dir = tmp_path / "logs"
+    assert prune_logs(logs_dir, {}) == 0
+
+    used = save_log(logs_dir, "used")
+    unused = save_log(logs_dir, "unused")
+    results: Any = {
+        "plugin:plugin": {"logs": {"load": used}},
+        # 旧的测试结果中没有日志
+        "old:old": {},
+    }
+
+    assert prune_logs(logs_dir, results) == 1
+    assert (logs_dir / f"{used}.log.gz").exists()
+    assert not (logs_dir / f"{unused}.log.gz").exists()
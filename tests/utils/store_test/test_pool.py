@@ -0,0 +1,123 @@
+import asyncio
+import os
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+
+async def test_environment_pool(tmp_path: Path, mocker: MockerFixture) -> None:
+    """取出环境后在后台补充，总数不超过上限"""
+    from src.utils.store_test.pool import EnvironmentPool
+
+    async def prepare_environment(path: Path) -> bool:
+        path.mkdir(parents=True)
+        return True
+
+    mocked_prepare = mocker.patch(
+        "src.utils.store_test.pool.PluginTest.prepare_environment",
+        side_effect=prepare_environment,
+    )
+
+    pool = EnvironmentPool(tmp_path / "pool", size=2, total=3)
+    pool.start()
+
+    first = await pool.acquire()
+    second = await pool.acquire()
+    third = await pool.acquire()
+
+    assert {first, second, third} == {
+        tmp_path / "pool" / "env-1",
+        tmp_path / "pool" / "env-2",
+        tmp_path / "pool" / "env-3",
+    }
+    assert mocked_prepare.call_count == 3
+
+    await pool.close()
+    assert not (tmp_path / "pool").exists()
+
+
+async def test_environment_pool_failed(tmp_path: Path, mocker: MockerFixture) -> None:
+    """创建失败时返回 None"""
+    from src.utils.store_test.pool import EnvironmentPool
+
+    mocker.patch(
+        "src.utils.store_test.pool.PluginTest.prepare_environment",
+        side_effect=[False, Exception("error")],
+    )
+
+    pool = EnvironmentPool(tmp_path / "pool", size=1, total=2)
+
+    assert await pool.acquire() is None
+    assert await pool.acquire() is None
+
+    await pool.close()
+
+
+async def test_environment_pool_exhausted(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """所有环境都已取出后返回 None，而不是一直等待"""
+    from src.utils.store_test.pool import EnvironmentPool
+
+    async def prepare_environment(path: Path) -> bool:
+        path.mkdir(parents=True)
+        return True
+
+    mocker.patch(
+        "src.utils.store_test.pool.PluginTest.prepare_environment",
+        side_effect=prepare_environment,
+    )
+
+    pool = EnvironmentPool(tmp_path / "pool", size=1, total=2)
+
+    assert await pool.acquire() == tmp_path / "pool" / "env-1"
+    assert await pool.acquire() == tmp_path / "pool" / "env-2"
+    assert await asyncio.wait_for(pool.acquire(), 1) is None
+
+    await pool.close()
+
+
+async def test_plugin_test_environment(tmp_path: Path, mocker: MockerFixture) -> None:
+    """在预先创建的环境中只安装插件"""
+    from src.utils.plugin_test import PluginTest
+
+    mocker.patch.dict("os.environ", {"PLUGIN_TEST_WHEELS_DIR": str(tmp_path)})
+    mocked_create = mocker.patch.object(PluginTest, "_create_project")
+
+    environment = tmp_path / "env-1"
+    await PluginTest.prepare_environment(environment)
+    mocked_create.assert_awaited_once_with(
+        f"{PluginTest('nonebot2', 'nonebot').get_create_command()} && "
+        f".venv/bin/python -m pip install --no-index --find-links {tmp_path} nonebot2"
+    )
+
+    test = PluginTest("project_link", "module_name", environment=environment)
+    assert test.path == environment
+
+    await test.create_poetry_project()
+    mocked_create.assert_awaited_with(
+        f".venv/bin/python -m pip install --no-index --find-links {tmp_path} project_link"
+    )
+
+
+async def test_prepare_environment_unpinned(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    """预先安装的依赖不限制版本，插件需要旧版本时仍然可以降级"""
+    from src.utils.plugin_test import WHEELS_DIR_ENV, PluginTest
+
+    mocker.patch.dict("os.environ")
+    os.environ.pop(WHEELS_DIR_ENV, None)
+    mocked_create = mocker.patch.object(PluginTest, "_create_project")
+
+    environment = tmp_path / "env-1"
+    await PluginTest.prepare_environment(environment, "nonebot-plugin-alconna")
+    mocked_create.assert_awaited_once_with(
+        f"{PluginTest('nonebot2', 'nonebot').get_create_command()} && "
+        "poetry add 'nonebot2@*' 'nonebot-plugin-alconna@*'"
+    )
+
+    # 插件本身仍然按默认方式安装
+    test = PluginTest("project_link", "module_name", environment=environment)
+    await test.create_poetry_project()
+    mocked_create.assert_awaited_with("poetry add project_link")
@@ -0,0 +1,77 @@
+from typing import Any
+
+
+def make_result(version: str, profile: dict[str, Any] | None) -> Any:
+    return {"version": version, "outputs": {"profile": profile}}
+
+
+def test_detect_regressions() -> None:
+    """加载耗时与峰值 RSS 显著增加"""
+    from src.utils.store_test.utils import detect_regressions
+
+    previous = make_result(
+        "0.1.0",
+        {
+            "load": 100,
+            "rss": 50 * 1024**2,
+            "samples": {"load": [90, 100, 110], "rss": [50 * 1024**2] * 3},
+        },
+    )
+    current = make_result(
+        "0.2.0",
+        {
+            "load": 200,
+            "rss": 100 * 1024**2,
+            "samples": {"load": [190, 200, 210], "rss": [100 * 1024**2] * 3},
+        },
+    )
+
+    assert detect_regressions(previous, current) == [
+        {
+            "metric": "load",
+            "previous": 100,
+            "current": 200,
+            "previous_version": "0.1.0",
+        },
+        {
+            "metric": "rss",
+            "previous": 50 * 1024**2,
+            "current": 100 * 1024**2,
+            "previous_version": "0.1.0",
+        },
+    ]
+
+
+def test_detect_regressions_noise() -> None:
+    """中位数增加超过阈值，但每次运行的结果有重叠时不视为退化"""
+    from src.utils.store_test.utils import detect_regressions
+
+    previous = make_result("0.1.0", {"load": 100, "samples": {"load": [90, 100, 400]}})
+    current = make_result("0.2.0", {"load": 200, "samples": {"load": [160, 200, 210]}})
+
+    assert detect_regressions(previous, current) == []
+
+
+def test_detect_regressions_without_profile() -> None:
+    """没有上次的结果或加载耗时时不比较"""
+    from src.utils.store_test.utils import detect_regressions
+
+    current = make_result(
+        "0.2.0", {"load": 200, "rss": 100, "samples": {"load": [190, 200, 210]}}
+    )
+
+    assert detect_regressions(None, current) == []
+    assert detect_regressions(make_result("0.1.0", None), current) == []
+
+
+def test_detect_regressions_single_sample() -> None:
+    """只运行一次时无法排除误差，不视为退化"""
+    from src.utils.store_test.utils import detect_regressions
+
+    previous = make_result("0.1.0", {"load": 100, "samples": {"load": [90, 100, 110]}})
+    current = make_result("0.2.0", {"load": 200, "samples": {"load": [200]}})
+    assert detect_regressions(previous, current) == []
+
+    # 旧的测试结果中只有一次运行的数据
+    current = make_result("0.2.0", {"load": 200, "samples": {"load": [190, 200, 210]}})
+    assert detect_regressions(make_result("0.1.0", {"load": 100}), current) == []
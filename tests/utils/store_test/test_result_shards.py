@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Any
+
+from pytest_mock import MockerFixture
+
+
+def make_result(version: str) -> Any:
+    return {
+        "time": "2023-06-26T22:08:18.945584+08:00",
+        "version": version,
+        "results": {"validation": True, "load": True, "metadata": True},
+    }
+
+
+def test_dump_result_shards_retention(tmp_path: Path, mocker: MockerFixture) -> None:
+    """不再使用的分片保留一段时间，持有旧索引的客户端仍然可以获取"""
+    from src.utils.json_io import load_json
+    from src.utils.store_test.utils import dump_result_shards
+
+    directory = tmp_path / "results"
+    index_path = directory / "index.json"
+    now = 1700000000.0
+    mocked_time = mocker.patch("src.utils.store_test.utils.time.time")
+
+    mocked_time.return_value = now
+    old_index = dump_result_shards(
+        directory, index_path, {"plugin:plugin": make_result("0.1.0")}, retention=100
+    )
+    old_shard = directory / old_index["plugin:plugin"]["file"]
+
+    # 新的测试结果生成新的分片，旧分片开始计时
+    mocked_time.return_value = now + 10
+    new_index = dump_result_shards(
+        directory, index_path, {"plugin:plugin": make_result("0.2.0")}, retention=100
+    )
+    new_shard = directory / new_index["plugin:plugin"]["file"]
+    assert old_shard.exists()
+    assert new_shard.exists()
+    assert load_json(directory / "retired.json") == {old_shard.name: now + 10}
+
+    # 未超过保留时间时不会删除
+    mocked_time.return_value = now + 110
+    dump_result_shards(
+        directory, index_path, {"plugin:plugin": make_result("0.2.0")}, retention=100
+    )
+    assert old_shard.exists()
+
+    mocked_time.return_value = now + 111
+    dump_result_shards(
+        directory, index_path, {"plugin:plugin": make_result("0.2.0")}, retention=100
+    )
+    assert not old_shard.exists()
+    assert new_shard.exists()
+    assert load_json(directory / "retired.json") == {}
+    assert load_json(index_path) == new_index
@@ -1,3 +1,6 @@
+import hashlib
+import json
+import os
 import shutil
 from pathlib import Path
 
@@ -13,6 +16,19 @@ def mocked_store_data(tmp_path: Path, mocker: MockerFixture) -> dict[str, Path]:
 
     paths = {
         "results": plugin_test_path / "results.json",
+        "adapter_results": plugin_test_path / "adapter_results.json",
+        "bot_results": plugin_test_path / "bot_results.json",
+        "results_dir": plugin_test_path / "results",
+        "results_index": plugin_test_path / "results" / "index.json",
+        "url_cache": plugin_test_path / "url_cache.json",
+        "wheel_cache": plugin_test_path / "cache",
+        "package_store": plugin_test_path / "packages",
+        "layers": plugin_test_path / "layers",
+        "pool": plugin_test_path / "pool",
+        "logs": plugin_test_path / "logs",
+        "prefetch_index": plugin_test_path / "prefetch" / "index",
+        "prefetch_wheels": plugin_test_path / "prefetch" / "wheels",
+        "prefetch_url_cache": plugin_test_path / "prefetch" / "url_cache.json",
         "adapters": plugin_test_path / "adapters.json",
         "bots": plugin_test_path / "bots.json",
         "drivers": plugin_test_path / "drivers.json",
@@ -29,6 +45,58 @@ def mocked_store_data(tmp_path: Path, mocker: MockerFixture) -> dict[str, Path]:
         "src.utils.store_test.store.RESULTS_PATH",
         paths["results"],
     )
+    mocker.patch(
+        "src.utils.store_test.store.ADAPTER_RESULTS_PATH",
+        paths["adapter_results"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.BOT_RESULTS_PATH",
+        paths["bot_results"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.RESULTS_DIR",
+        paths["results_dir"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.RESULTS_INDEX_PATH",
+        paths["results_index"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.URL_CACHE_PATH",
+        paths["url_cache"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.WHEEL_CACHE_DIR",
+        paths["wheel_cache"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.PACKAGE_STORE_DIR",
+        paths["package_store"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.LAYERS_DIR",
+        paths["layers"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.POOL_DIR",
+        paths["pool"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.LOGS_DIR",
+        paths["logs"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.PREFETCH_INDEX_DIR",
+        paths["prefetch_index"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.PREFETCH_WHEELS_DIR",
+        paths["prefetch_wheels"],
+    )
+    mocker.patch(
+        "src.utils.store_test.store.PREFETCH_URL_CACHE_PATH",
+        paths["prefetch_url_cache"],
+    )
     mocker.patch(
         "src.utils.store_test.store.ADAPTERS_PATH",
         paths["adapters"],
@@ -65,6 +133,9 @@ def mocked_store_data(tmp_path: Path, mocker: MockerFixture) -> dict[str, Path]:
         paths["previous_plugins"],
     )
 
+    # 商店测试通过环境变量配置插件测试，不能影响其他测试
+    mocker.patch.dict(os.environ)
+
     shutil.copytree(Path(__file__).parent / "store", store_path)
     return paths
 
@@ -150,13 +221,15 @@ async def test_store_test(
             "valid": True,
             "time": "2023-06-22 12:10:18",
         },
+        environment=None,
+        snapshot=None,
     )
     assert mocked_api["project_link_treehelp"].called
     assert mocked_api["project_link_datastore"].called
 
     assert (
         mocked_store_data["results"].read_text(encoding="utf8")
-        == '{"nonebot-plugin-datastore:nonebot_plugin_datastore":{"time":"2023-06-26T22:08:18.945584+08:00","version":"1.0.0","results":{"validation":true,"load":true,"metadata":true},"inputs":{"config":""},"outputs":{"validation":"通过","load":"datastore","metadata":{"name":"数据存储","description":"NoneBot 数据存储插件","usage":"请参考文档","type":"library","homepage":"https://github.com/he0119/nonebot-plugin-datastore","supported_adapters":null}}},"nonebot-plugin-treehelp:nonebot_plugin_treehelp":{"time":"2023-08-28T00:00:00.000000+08:00","version":"1.0.0","inputs":{"config":""},"results":{"load":true,"metadata":true,"validation":true},"outputs":{"load":"output","metadata":{"name":"帮助","description":"获取插件帮助信息","usage":"获取插件列表\\n/help\\n获取插件树\\n/help -t\\n/help --tree\\n获取某个插件的帮助\\n/help 插件名\\n获取某个插件的树\\n/help --tree 插件名\\n","type":"application","homepage":"https://nonebot.dev/","supported_adapters":null},"validation":null}}}'
+        == '{"nonebot-plugin-datastore:nonebot_plugin_datastore":{"time":"2023-06-26T22:08:18.945584+08:00","version":"1.0.0","results":{"validation":true,"load":true,"metadata":true},"inputs":{"config":""},"outputs":{"validation":"通过","load":"datastore","metadata":{"name":"数据存储","description":"NoneBot 数据存储插件","usage":"请参考文档","type":"library","homepage":"https://github.com/he0119/nonebot-plugin-datastore","supported_adapters":null}}},"nonebot-plugin-treehelp:nonebot_plugin_treehelp":{"time":"2023-08-28T00:00:00.000000+08:00","version":"1.0.0","inputs":{"config":""},"results":{"load":true,"metadata":true,"validation":true},"outputs":{"load":"output","metadata":{"name":"帮助","description":"获取插件帮助信息","usage":"获取插件列表\\n/help\\n获取插件树\\n/help -t\\n/help --tree\\n获取某个插件的帮助\\n/help 插件名\\n获取某个插件的树\\n/help --tree 插件名\\n","type":"application","homepage":"https://nonebot.dev/","supported_adapters":null},"validation":null},"regressions":[]}}'
     )
     assert (
         mocked_store_data["adapters"].read_text(encoding="utf8")
@@ -213,6 +286,8 @@ async def test_store_test_with_key(
             "valid": True,
             "time": "2023-06-22 12:10:18",
         },
+        environment=None,
+        snapshot=None,
     )
     assert mocked_api["project_link_treehelp"].called
     assert not mocked_api["project_link_datastore"].called
@@ -258,6 +333,8 @@ async def test_store_test_with_key_not_in_previous(
         skip_test=False,
         data=None,
         previous_plugin=None,
+        environment=None,
+        snapshot=None,
     )
 
     # 不需要判断版本号
@@ -312,6 +389,8 @@ async def test_store_test_raise(
                     "valid": True,
                     "time": "2023-06-22 12:10:18",
                 },
+                environment=None,
+                snapshot=None,
             ),
             mocker.call(
                 plugin={
@@ -325,6 +404,8 @@ async def test_store_test_raise(
                 skip_test=False,
                 data=None,
                 previous_plugin=None,
+                environment=None,
+                snapshot=None,
             ),  # type: ignore
         ],
     )
@@ -352,6 +433,40 @@ async def test_store_test_raise(
     )
 
 
+async def test_store_test_pool_raise(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+):
+    """使用测试环境池时测试报错
+
+    报错后补充的插件没有预先创建的环境可用，此时自行创建环境，而不是一直等待
+    """
+    import asyncio
+
+    from src.utils.store_test.store import StoreTest
+
+    async def prepare_environment(path: Path) -> bool:
+        path.mkdir(parents=True)
+        return True
+
+    mocker.patch(
+        "src.utils.store_test.pool.PluginTest.prepare_environment",
+        side_effect=prepare_environment,
+    )
+    mocked_validate_plugin = mocker.patch("src.utils.store_test.store.validate_plugin")
+    mocked_validate_plugin.side_effect = Exception
+
+    test = StoreTest(0, 1, False, pool_size=1)
+    await asyncio.wait_for(test.run(), 5)
+
+    calls = mocked_validate_plugin.call_args_list
+    assert [call.kwargs["plugin"]["module_name"] for call in calls] == [
+        "nonebot_plugin_treehelp",
+        "nonebot_plugin_wordcloud",
+    ]
+    assert calls[0].kwargs["environment"] == mocked_store_data["pool"] / "env-1"
+    assert calls[1].kwargs["environment"] is None
+
+
 async def test_store_test_with_key_raise(
     mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
 ):
@@ -376,6 +491,8 @@ async def test_store_test_with_key_raise(
         skip_test=False,
         data=None,
         previous_plugin=None,
+        environment=None,
+        snapshot=None,
     )
 
     # 数据没有更新，只是被压缩
@@ -399,3 +516,303 @@ async def test_store_test_with_key_raise(
         mocked_store_data["plugins"].read_text(encoding="utf8")
         == '[{"module_name":"nonebot_plugin_datastore","project_link":"nonebot-plugin-datastore","name":"数据存储","desc":"NoneBot 数据存储插件","author":"he0119","homepage":"https://github.com/he0119/nonebot-plugin-datastore","tags":[],"is_official":false,"type":"library","supported_adapters":null,"valid":true,"time":"2023-06-22 11:58:18"},{"module_name":"nonebot_plugin_treehelp","project_link":"nonebot-plugin-treehelp","name":"帮助","desc":"获取插件帮助信息","author":"he0119","homepage":"https://github.com/he0119/nonebot-plugin-treehelp","tags":[],"is_official":false,"type":"application","supported_adapters":null,"valid":true,"time":"2023-06-22 12:10:18"}]'
     )
+
+
+async def test_store_test_shard(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+):
+    """额外输出分片的测试结果
+
+    分片文件名中包含内容哈希，索引中只有测试状态等信息
+    """
+    from src.utils.json_io import dumps, load_json
+    from src.utils.store_test.store import StoreTest
+
+    mocked_validate_plugin = mocker.patch("src.utils.store_test.store.validate_plugin")
+
+    # 上次运行遗留的分片超过保留时间后会被删除
+    mocked_store_data["results_dir"].mkdir()
+    stale_shard = mocked_store_data["results_dir"] / "stale-0000000000000000.json"
+    stale_shard.write_text("{}")
+    (mocked_store_data["results_dir"] / "retired.json").write_text(
+        json.dumps({stale_shard.name: 0})
+    )
+
+    test = StoreTest(0, 0, False, True)
+    await test.run()
+
+    mocked_validate_plugin.assert_not_called()
+
+    results = load_json(mocked_store_data["results"])
+    hashes = {
+        key: hashlib.sha256(dumps(result)).hexdigest()[:16]
+        for key, result in results.items()
+    }
+    index = load_json(mocked_store_data["results_index"])
+    assert index == {
+        "nonebot-plugin-datastore:nonebot_plugin_datastore": {
+            "time": "2023-06-26T22:08:18.945584+08:00",
+            "version": "1.0.0",
+            "results": {"validation": True, "load": True, "metadata": True},
+            "hash": hashes["nonebot-plugin-datastore:nonebot_plugin_datastore"],
+            "file": f"nonebot-plugin-datastore-nonebot_plugin_datastore-{hashes['nonebot-plugin-datastore:nonebot_plugin_datastore']}.json",
+        },
+        "nonebot-plugin-treehelp:nonebot_plugin_treehelp": {
+            "time": "2023-06-26T22:20:41.833311+08:00",
+            "version": "0.3.0",
+            "results": {"validation": True, "load": True, "metadata": True},
+            "hash": hashes["nonebot-plugin-treehelp:nonebot_plugin_treehelp"],
+            "file": f"nonebot-plugin-treehelp-nonebot_plugin_treehelp-{hashes['nonebot-plugin-treehelp:nonebot_plugin_treehelp']}.json",
+        },
+    }
+    for key, item in index.items():
+        assert (
+            load_json(mocked_store_data["results_dir"] / item["file"]) == results[key]
+        )
+    assert not stale_shard.exists()
+    assert load_json(mocked_store_data["results_dir"] / "retired.json") == {}
+
+
+async def test_store_test_validate(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    respx_mock: MockRouter,
+    mocker: MockerFixture,
+) -> None:
+    """重新验证所有适配器与机器人
+
+    适配器验证通过，机器人因为主页无法访问验证失败
+    """
+    from src.utils.store_test.store import StoreTest
+    from src.utils.store_test.utils import load_json
+
+    mocked_validate_plugin = mocker.patch("src.utils.store_test.store.validate_plugin")
+    mocked_validate_plugin.side_effect = Exception
+    mocker.patch(
+        "src.utils.store_test.validation.datetime"
+    ).now.return_value.isoformat.return_value = "2023-08-28T00:00:00.000000+08:00"
+
+    adapter_homepage = respx_mock.route(
+        url="https://onebot.adapters.nonebot.dev/"
+    ).respond()
+    adapter_pypi = respx_mock.route(
+        url="https://pypi.org/simple/nonebot-adapter-onebot/"
+    ).respond()
+    bot_homepage = respx_mock.route(url="https://github.com/he0119/CoolQBot").respond(
+        404
+    )
+
+    test = StoreTest(0, 1, False, validate=True)
+    await test.run()
+
+    assert adapter_homepage.called
+    assert adapter_pypi.called
+    assert bot_homepage.called
+
+    assert load_json(mocked_store_data["adapters"]) == [
+        {
+            "module_name": "nonebot.adapters.onebot.v11",
+            "project_link": "nonebot-adapter-onebot",
+            "name": "OneBot V11",
+            "desc": "OneBot V11 协议",
+            "author": "yanyongyu",
+            "homepage": "https://onebot.adapters.nonebot.dev/",
+            "tags": [],
+            "is_official": True,
+            "valid": True,
+        }
+    ]
+    assert load_json(mocked_store_data["adapter_results"]) == {
+        "nonebot-adapter-onebot:nonebot.adapters.onebot.v11": {
+            "time": "2023-08-28T00:00:00.000000+08:00",
+            "results": {"validation": True},
+            "outputs": {"validation": None},
+        }
+    }
+
+    assert load_json(mocked_store_data["bots"])[0]["valid"] is False
+    bot_result = load_json(mocked_store_data["bot_results"])[
+        "CoolQBot:https://github.com/he0119/CoolQBot"
+    ]
+    assert bot_result["results"] == {"validation": False}
+    assert bot_result["outputs"]["validation"]["errors"][0]["type"] == (
+        "value_error.homepage"
+    )
+
+
+async def test_store_test_prefetch_offline(
+    mocked_store_data: dict[str, Path],
+    mocked_api: MockRouter,
+    respx_mock: MockRouter,
+    mocker: MockerFixture,
+) -> None:
+    """先下载测试所需的数据，再离线测试
+
+    离线测试时选择的插件与下载时相同，并且不会访问网络
+    """
+    from src.utils.plugin_test import STORE_PLUGINS_PATH_ENV, WHEELS_DIR_ENV
+    from src.utils.store_test.store import StoreTest
+
+    mocked_download_wheels = mocker.patch.object(StoreTest, "download_wheels")
+    homepage = respx_mock.route(
+        url="https://github.com/he0119/nonebot-plugin-treehelp"
+    ).respond()
+
+    test = StoreTest(0, 1, False)
+    await test.prefetch()
+
+    mocked_download_wheels.assert_called_once_with("nonebot-plugin-treehelp")
+    assert homepage.call_count == 1
+    assert mocked_api["project_data_datastore"].call_count == 1
+    assert mocked_api["project_data_treehelp"].call_count == 1
+    assert sorted(p.name for p in mocked_store_data["prefetch_index"].iterdir()) == [
+        "nonebot-plugin-datastore.json",
+        "nonebot-plugin-treehelp.json",
+    ]
+    assert mocked_store_data["prefetch_url_cache"].exists()
+
+    respx_mock.reset()
+    mocked_validate_plugin = mocker.patch("src.utils.store_test.store.validate_plugin")
+    mocked_validate_plugin.return_value = ({}, {})
+
+    test = StoreTest(0, 1, False, offline=True)
+    await test.run()
+
+    assert mocked_validate_plugin.call_args.kwargs["plugin"]["project_link"] == (
+        "nonebot-plugin-treehelp"
+    )
+    assert not any(route.called for route in respx_mock.routes)
+    assert os.environ[WHEELS_DIR_ENV] == str(
+        mocked_store_data["prefetch_wheels"].resolve()
+    )
+    assert os.environ[STORE_PLUGINS_PATH_ENV] == str(
+        mocked_store_data["store_plugins"].resolve()
+    )
+
+    from src.utils.validation.utils import check_url
+
+    assert check_url("https://github.com/he0119/nonebot-plugin-treehelp") == (200, "")
+    assert check_url("https://example.com") == (
+        -1,
+        "离线模式下没有该网址的检查结果",
+    )
+
+
+async def test_store_test_dependency_layers(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+):
+    """按照依赖关系测试插件
+
+    上次测试中 treehelp 依赖于 wordcloud，所以先测试 wordcloud
+    wordcloud 测试通过后保存测试环境，treehelp 复制该环境后测试
+    """
+    from src.utils.store_test.store import StoreTest
+
+    previous_results = json.loads(
+        mocked_store_data["previous_results"].read_text(encoding="utf8")
+    )
+    previous_results["nonebot-plugin-treehelp:nonebot_plugin_treehelp"][
+        "dependencies"
+    ] = ["nonebot_plugin_wordcloud"]
+    mocked_store_data["previous_results"].write_text(
+        json.dumps(previous_results), encoding="utf8"
+    )
+
+    async def validate_plugin(**kwargs):
+        # 模拟测试通过后保存测试环境
+        if snapshot := kwargs["snapshot"]:
+            (snapshot / ".venv").mkdir(parents=True)
+        return {}, {}
+
+    mocked_validate_plugin = mocker.patch(
+        "src.utils.store_test.store.validate_plugin", side_effect=validate_plugin
+    )
+
+    test = StoreTest(0, 3, True, layers=True)
+    await test.run()
+
+    calls = mocked_validate_plugin.call_args_list
+    assert [call.kwargs["plugin"]["module_name"] for call in calls] == [
+        "nonebot_plugin_datastore",
+        "nonebot_plugin_wordcloud",
+        "nonebot_plugin_treehelp",
+    ]
+    layers = mocked_store_data["layers"]
+    assert calls[0].kwargs["environment"] is None
+    assert calls[0].kwargs["snapshot"] is None
+    assert calls[1].kwargs["environment"] is None
+    assert (
+        calls[1].kwargs["snapshot"]
+        == layers / "nonebot-plugin-wordcloud-nonebot_plugin_wordcloud"
+    )
+    assert (
+        calls[2].kwargs["environment"]
+        == layers / "nonebot-plugin-treehelp-nonebot_plugin_treehelp-test"
+    )
+    assert calls[2].kwargs["snapshot"] is None
+
+    assert not layers.exists()
+
+
+async def test_store_test_shared_storage(
+    mocked_store_data: dict[str, Path], mocked_api: MockRouter, mocker: MockerFixture
+):
+    """下载缓存与包文件仓库默认不开启，开启后通过环境变量传递给插件测试"""
+    from src.utils.plugin_test import (
+        CACHE_DIR_ENV,
+        PACKAGE_STORE_DIR_ENV,
+        REPEAT_ENV,
+        PluginTest,
+    )
+    from src.utils.store_test.store import StoreTest
+
+    mocked_validate_plugin = mocker.patch("src.utils.store_test.store.validate_plugin")
+    mocked_validate_plugin.return_value = ({}, {})
+    for name in (CACHE_DIR_ENV, PACKAGE_STORE_DIR_ENV, REPEAT_ENV):
+        os.environ.pop(name, None)
+
+    test = StoreTest(0, 1, False)
+    await test.run()
+
+    assert CACHE_DIR_ENV not in os.environ
+    assert PACKAGE_STORE_DIR_ENV not in os.environ
+    assert REPEAT_ENV not in os.environ
+    assert not mocked_store_data["wheel_cache"].exists()
+    assert not mocked_store_data["package_store"].exists()
+    plugin_test = PluginTest("project_link", "module_name")
+    assert plugin_test.cache is None
+    assert plugin_test.package_store is None
+    assert plugin_test.repeat == 1
+
+    test = StoreTest(0, 1, False, repeat=3, wheel_cache=True, package_store=True)
+    await test.run()
+
+    assert os.environ[CACHE_DIR_ENV] == str(mocked_store_data["wheel_cache"].resolve())
+    assert os.environ[PACKAGE_STORE_DIR_ENV] == str(
+        mocked_store_data["package_store"].resolve()
+    )
+    plugin_test = PluginTest("project_link", "module_name")
+    assert plugin_test.cache
+    assert plugin_test.package_store
+    assert plugin_test.repeat == 3
+
+
+def test_plugin_test_invalid_env(mocker: MockerFixture):
+    """环境变量无法解析时使用默认值"""
+    from src.utils.plugin_test import (
+        CACHE_DIR_ENV,
+        CACHE_SIZE_ENV,
+        DEFAULT_CACHE_SIZE,
+        REPEAT_ENV,
+        PluginTest,
+    )
+
+    mocker.patch.dict(
+        os.environ,
+        {REPEAT_ENV: "abc", CACHE_DIR_ENV: "cache", CACHE_SIZE_ENV: "5G"},
+    )
+
+    test = PluginTest("project_link", "module_name")
+    assert test.repeat == 1
+    assert test.cache
+    assert test.cache.max_size == DEFAULT_CACHE_SIZE
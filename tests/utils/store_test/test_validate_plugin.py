@@ -1,12 +1,25 @@
+import hashlib
 import json
 import shutil
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 from zoneinfo import ZoneInfo
 
+import pytest
 from pytest_mock import MockerFixture
 from respx import MockRouter
 
+# 测试输出为 output 时的日志引用
+OUTPUT_LOG_REF = hashlib.sha256(b"output").hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def mocked_logs_dir(tmp_path: Path, mocker: MockerFixture) -> Path:
+    logs_dir = tmp_path / "logs"
+    mocker.patch("src.utils.store_test.validation.LOGS_DIR", logs_dir)
+    return logs_dir
+
 
 async def test_validate_plugin(
     tmp_path: Path, mocked_api: MockRouter, mocker: MockerFixture
@@ -57,6 +70,7 @@ async def test_validate_plugin(
             "validation": True,
         },
         "outputs": {
+            "profile": None,
             "load": "output",
             "metadata": {
                 "name": "帮助",
@@ -68,6 +82,9 @@ async def test_validate_plugin(
             },
             "validation": None,
         },
+        "logs": {"load": OUTPUT_LOG_REF},
+        "dependencies": [],
+        "regressions": [],
     }
     assert new_plugin == {
         "author": "author",
@@ -141,6 +158,7 @@ async def test_validate_plugin_with_data(
             "validation": True,
         },
         "outputs": {
+            "profile": None,
             "load": "已跳过测试",
             "metadata": {
                 "name": "帮助",
@@ -151,6 +169,9 @@ async def test_validate_plugin_with_data(
             },
             "validation": None,
         },
+        "logs": {},
+        "dependencies": [],
+        "regressions": [],
     }
     assert new_plugin == {
         "project_link": "project_link",
@@ -174,6 +195,56 @@ async def test_validate_plugin_with_data(
     mocked_plugin_test.assert_not_called()
 
 
+async def test_validate_plugin_without_upload_time(
+    respx_mock: MockRouter, mocker: MockerFixture
+) -> None:
+    """简单索引镜像不支持 PEP 700 时没有上传时间
+
+    版本没有变化时沿用上次的时间，否则使用当前时间
+    """
+    from src.utils.package_index import SimpleIndex, project_cache
+    from src.utils.store_test.validation import StorePlugin, validate_plugin
+
+    mock_datetime = mocker.patch("src.utils.store_test.validation.datetime")
+    mock_datetime.now.return_value = datetime(
+        2023, 8, 23, 9, 22, 14, 836035, tzinfo=ZoneInfo("Asia/Shanghai")
+    )
+    mocker.patch("src.utils.store_test.validation.PluginTest")
+
+    respx_mock.get("https://mirror.example.com/simple/project-link/").respond(
+        json={
+            "meta": {"api-version": "1.0"},
+            "name": "project-link",
+            "files": [{"filename": "project_link-0.2.0-py3-none-any.whl"}],
+        }
+    )
+    project_cache.use_index(SimpleIndex("https://mirror.example.com/simple"))
+
+    plugin = StorePlugin(
+        module_name="module_name",
+        project_link="project_link",
+        author="author",
+        tags=[],
+        is_official=False,
+    )
+    data = json.dumps({"name": "帮助", "desc": "获取插件帮助信息"})
+    previous_plugin: Any = {"version": "0.2.0", "time": "2023-06-22 12:10:18"}
+
+    _, new_plugin = await validate_plugin(
+        plugin, "", False, data, previous_plugin=previous_plugin
+    )
+    assert new_plugin
+    assert new_plugin["version"] == "0.2.0"
+    assert new_plugin["time"] == "2023-06-22 12:10:18"
+
+    previous_plugin["version"] = "0.1.0"
+    _, new_plugin = await validate_plugin(
+        plugin, "", False, data, previous_plugin=previous_plugin
+    )
+    assert new_plugin
+    assert new_plugin["time"] == "2023-08-23T09:22:14.836035+08:00"
+
+
 async def test_validate_plugin_skip_test(
     tmp_path: Path, mocked_api: MockRouter, mocker: MockerFixture
 ) -> None:
@@ -226,6 +297,7 @@ async def test_validate_plugin_skip_test(
             "validation": True,
         },
         "outputs": {
+            "profile": None,
             "load": "output",
             "metadata": {
                 "name": "帮助",
@@ -237,6 +309,9 @@ async def test_validate_plugin_skip_test(
             },
             "validation": None,
         },
+        "logs": {"load": OUTPUT_LOG_REF},
+        "dependencies": [],
+        "regressions": [],
     }
     assert new_plugin == {
         "author": "author",
@@ -333,10 +408,14 @@ async def test_validate_plugin_skip_test_plugin_test_failed(
             "validation": True,
         },
         "outputs": {
+            "profile": None,
             "load": "output",
             "metadata": None,
             "validation": None,
         },
+        "logs": {"load": OUTPUT_LOG_REF},
+        "dependencies": [],
+        "regressions": [],
     }
     assert new_plugin == {
         "author": "author",
@@ -410,6 +489,7 @@ async def test_validate_plugin_failed(
             "validation": False,
         },
         "outputs": {
+            "profile": None,
             "load": "output",
             "metadata": {
                 "name": "帮助",
@@ -442,6 +522,9 @@ async def test_validate_plugin_failed(
                 ],
             },
         },
+        "logs": {"load": OUTPUT_LOG_REF},
+        "dependencies": [],
+        "regressions": [],
     }
     assert new_plugin is None
 
@@ -520,6 +603,7 @@ async def test_validate_plugin_failed_with_previous(
             "validation": False,
         },
         "outputs": {
+            "profile": None,
             "load": "output",
             "metadata": {
                 "name": "帮助",
@@ -552,6 +636,9 @@ async def test_validate_plugin_failed_with_previous(
                 ],
             },
         },
+        "logs": {"load": OUTPUT_LOG_REF},
+        "dependencies": [],
+        "regressions": [],
     }
     assert new_plugin == {
         "module_name": "module_name",
@@ -0,0 +1,131 @@
+import os
+
+
+def test_parse_import_profile() -> None:
+    """只统计加载插件时导入的模块"""
+    from src.utils.plugin_test import parse_import_profile
+
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       500 |        500 | nonebot",
+        "PLUGIN_TEST_PROFILE_START",
+        "import time:       300 |        300 |     httpx._api",
+        "import time:      1000 |       1300 |   httpx",
+        "import time:       200 |       1500 | nonebot_plugin_x",
+        "import time:       100 |        100 | nonebot_plugin_x.config",
+        "01-01 00:00:00 [SUCCESS] nonebot | Succeeded to load plugin",
+        'PLUGIN_TEST_PROFILE_END {"init": 1.5, "load": 2.5}',
+        "error",
+    ]
+
+    profile, others = parse_import_profile(lines, top=2)
+
+    assert profile == {
+        "init": 1.5,
+        "load": 2.5,
+        "import": 1.6,
+        "modules": [
+            {"name": "httpx", "self": 1.0, "cumulative": 1.3},
+            {"name": "httpx._api", "self": 0.3, "cumulative": 0.3},
+        ],
+    }
+    assert others == [
+        "01-01 00:00:00 [SUCCESS] nonebot | Succeeded to load plugin",
+        "error",
+    ]
+
+
+def test_parse_import_profile_failed() -> None:
+    """加载插件前出错时没有耗时"""
+    from src.utils.plugin_test import parse_import_profile
+
+    lines = [
+        "import time:       500 |        500 | nonebot",
+        "Traceback (most recent call last):",
+    ]
+
+    assert parse_import_profile(lines) == (None, ["Traceback (most recent call last):"])
+
+
+def test_get_installed_size(tmp_path) -> None:
+    """根据 RECORD 统计安装大小，不包括虚拟环境自带的包"""
+    from src.utils.plugin_test import get_installed_size
+
+    site_packages = tmp_path / "lib" / "python3.11" / "site-packages"
+    records = {
+        "nonebot_plugin_x-0.1.0.dist-info": (
+            "nonebot_plugin_x/__init__.py,sha256=abc,100\n"
+            "nonebot_plugin_x/__pycache__/__init__.cpython-311.pyc,,\n"
+            "nonebot_plugin_x-0.1.0.dist-info/RECORD,,\n"
+        ),
+        "httpx-0.24.1.dist-info": '"httpx/_api,1.py",sha256=abc,50\n',
+        "pip-23.2.1.dist-info": "pip/__init__.py,sha256=abc,1000\n",
+    }
+    for name, record in records.items():
+        (site_packages / name).mkdir(parents=True)
+        (site_packages / name / "RECORD").write_text(record)
+
+    assert get_installed_size(tmp_path) == 150
+
+
+def test_merge_profiles() -> None:
+    """多次运行的结果取中位数，并保留每次运行的加载耗时与峰值 RSS"""
+    from src.utils.plugin_test import merge_profiles
+
+    modules = [{"name": "httpx", "self": 1.0, "cumulative": 1.3}]
+    profiles = [
+        {"init": 1, "load": 30, "import": 20, "rss": 100},
+        {"init": 2, "load": 10, "import": 5, "rss": 120},
+        {"init": 3, "load": 20, "import": 10, "rss": 110},
+    ]
+    profiles[0]["modules"] = modules
+
+    assert merge_profiles(profiles) == {
+        "init": 2,
+        "load": 20,
+        "import": 10,
+        "rss": 110,
+        "modules": modules,
+        "samples": {"load": [30, 10, 20], "rss": [100, 120, 110]},
+    }
+
+
+async def test_run_poetry_project_tracemalloc(tmp_path, mocker) -> None:
+    """计时的运行不开启 tracemalloc，内存分配在单独的一次运行中统计"""
+    from src.utils.plugin_test import REPEAT_ENV, TRACEMALLOC_ENV, PluginTest
+
+    mocker.patch.dict(os.environ, {REPEAT_ENV: "2"})
+    os.environ.pop(TRACEMALLOC_ENV, None)
+
+    def output(profile: str) -> tuple[int, bytes, bytes]:
+        return (
+            0,
+            b"",
+            f"PLUGIN_TEST_PROFILE_START\nPLUGIN_TEST_PROFILE_END {profile}".encode(),
+        )
+
+    mocked_run_runner = mocker.patch.object(
+        PluginTest,
+        "_run_runner",
+        side_effect=[
+            output('{"init": 1, "load": 10, "rss": 100}'),
+            output('{"init": 3, "load": 30, "rss": 300}'),
+            output('{"init": 5, "load": 500, "rss": 500, "allocated": 1000}'),
+        ],
+    )
+
+    test = PluginTest("project_link", "module_name", environment=tmp_path)
+    await test.run_poetry_project()
+
+    envs = [call.args[0] for call in mocked_run_runner.call_args_list]
+    assert [TRACEMALLOC_ENV in env for env in envs] == [False, False, True]
+    assert test._profile == {
+        "init": 2,
+        "load": 20,
+        "import": 0,
+        "rss": 200,
+        "allocated": 1000,
+        "modules": [],
+        "samples": {"load": [10, 30], "rss": [100, 300]},
+        "size": 0,
+    }
@@ -0,0 +1,94 @@
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+DATA = [
+    {
+        "module_name": "nonebot_plugin_treehelp",
+        "project_link": "nonebot-plugin-treehelp",
+        "name": "帮助",
+        "desc": "获取插件帮助信息\n/help",
+        "tags": [{"label": "😀", "color": "#ffffff"}],
+        "is_official": False,
+        "supported_adapters": None,
+        "version": 1,
+        "float": 0.5,
+    },
+    {},
+    [],
+]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps(mocker: MockerFixture, use_orjson: bool) -> None:
+    """输出与标准库完全一致"""
+    from src.utils import json_io
+
+    if not use_orjson:
+        mocker.patch.object(json_io, "orjson", None)
+
+    assert (
+        json_io.dumps(DATA)
+        == json.dumps(DATA, ensure_ascii=False, separators=(",", ":")).encode()
+    )
+    assert (
+        json_io.dumps(DATA, indent=2)
+        == (json.dumps(DATA, ensure_ascii=False, indent=2) + "\n").encode()
+    )
+
+
+@pytest.mark.parametrize(
+    "data", [1e16, {"time": 2.5e-7}, {1: "a"}, 2**70, "1e5"], ids=repr
+)
+def test_dumps_fallback(data) -> None:
+    """orjson 与标准库输出不同或无法处理时回退到标准库"""
+    from src.utils.json_io import dumps
+
+    assert dumps(data) == json.dumps(data, separators=(",", ":")).encode()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [{"a": math.inf}, [-math.inf, None], {"a": {"b": [math.nan]}}],
+    ids=repr,
+)
+def test_dumps_non_finite(data) -> None:
+    """orjson 将 NaN 与 Infinity 输出为 null，此时回退到标准库"""
+    from src.utils.json_io import dumps
+
+    assert dumps(data) == json.dumps(data, separators=(",", ":")).encode()
+    assert dumps(data, indent=2) == (json.dumps(data, indent=2) + "\n").encode()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_datetime(mocker: MockerFixture, use_orjson: bool) -> None:
+    """与标准库一样无法编码 datetime"""
+    from src.utils import json_io
+
+    if not use_orjson:
+        mocker.patch.object(json_io, "orjson", None)
+
+    with pytest.raises(TypeError):
+        json_io.dumps({"time": datetime.now()})
+
+
+def test_loads() -> None:
+    from src.utils.json_io import loads
+
+    assert loads(json.dumps(DATA).encode()) == DATA
+    # orjson 无法解析 NaN，回退到标准库
+    assert math.isnan(loads("[NaN]")[0])
+
+
+def test_load_dump_json(tmp_path: Path) -> None:
+    from src.utils.json_io import dump_json, load_json
+
+    path = tmp_path / "data.json"
+    dump_json(path, DATA, indent=2)
+
+    assert path.read_text(encoding="utf8").endswith("},\n  {},\n  []\n]\n")
+    assert load_json(path) == DATA
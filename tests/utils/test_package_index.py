@@ -0,0 +1,199 @@
+import json
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from respx import MockRouter
+
+
+def test_normalize_name() -> None:
+    from src.utils.package_index import normalize_name
+
+    assert normalize_name("Nonebot_Plugin.X") == "nonebot-plugin-x"
+    assert normalize_name("nonebot--plugin__x") == "nonebot-plugin-x"
+
+
+async def test_pypi_json_index(respx_mock: MockRouter) -> None:
+    """PyPI JSON API"""
+    from src.utils.package_index import PyPIJSONIndex
+
+    respx_mock.get("https://mirror.example.com/pypi/project_link/json").respond(
+        json={
+            "info": {"version": "0.0.1"},
+            "urls": [{"upload_time_iso_8601": "2023-09-01T00:00:00+00:00"}],
+        }
+    )
+    respx_mock.get("https://mirror.example.com/pypi/missing/json").respond(404)
+
+    index = PyPIJSONIndex("https://mirror.example.com/pypi/")
+
+    assert index.project_url("project_link") == (
+        "https://mirror.example.com/pypi/project_link/json"
+    )
+    assert index.exists("project_link")
+    assert not index.exists("missing")
+    assert index.get_project("project_link") == {
+        "name": "project_link",
+        "version": "0.0.1",
+        "upload_time": "2023-09-01T00:00:00+00:00",
+    }
+    with pytest.raises(ValueError, match="获取 PyPI 数据失败"):
+        index.get_project("missing")
+
+
+async def test_simple_index(respx_mock: MockRouter) -> None:
+    """PEP 691 简单索引，跳过预发布版本与已撤回的文件"""
+    from src.utils.package_index import SIMPLE_JSON_CONTENT_TYPE, SimpleIndex
+
+    route = respx_mock.get("https://mirror.example.com/simple/nonebot-plugin-x/")
+    route.respond(
+        json={
+            "meta": {"api-version": "1.1"},
+            "name": "nonebot-plugin-x",
+            "files": [
+                {
+                    "filename": "nonebot_plugin_x-0.1.0-py3-none-any.whl",
+                    "upload-time": "2023-01-01T00:00:00Z",
+                },
+                {
+                    "filename": "nonebot_plugin_x-0.2.0.tar.gz",
+                    "upload-time": "2023-02-01T00:00:00Z",
+                },
+                {
+                    "filename": "nonebot_plugin_x-0.3.0-py3-none-any.whl",
+                    "upload-time": "2023-03-01T00:00:00Z",
+                    "yanked": True,
+                },
+                {
+                    "filename": "nonebot_plugin_x-0.4.0rc1-py3-none-any.whl",
+                    "upload-time": "2023-04-01T00:00:00Z",
+                },
+            ],
+        }
+    )
+
+    index = SimpleIndex("https://mirror.example.com/simple")
+
+    assert index.get_project("Nonebot_Plugin_X") == {
+        "name": "Nonebot_Plugin_X",
+        "version": "0.2.0",
+        "upload_time": "2023-02-01T00:00:00Z",
+    }
+    assert route.calls.last.request.headers["Accept"] == SIMPLE_JSON_CONTENT_TYPE
+
+
+async def test_local_index(tmp_path: Path) -> None:
+    """本地文件夹快照"""
+    from src.utils.package_index import create_package_index
+
+    (tmp_path / "nonebot-plugin-x.json").write_text(
+        json.dumps({"info": {"version": "1.0.0"}, "urls": []})
+    )
+
+    index = create_package_index("local", str(tmp_path))
+
+    assert index.project_url("nonebot_plugin_x") is None
+    assert index.exists("nonebot_plugin_x")
+    assert not index.exists("missing")
+    assert index.get_project("nonebot_plugin_x") == {
+        "name": "nonebot_plugin_x",
+        "version": "1.0.0",
+        "upload_time": None,
+    }
+    with pytest.raises(ValueError, match="快照中不存在项目"):
+        index.get_project("missing")
+
+
+async def test_check_pypi_local_index(tmp_path: Path, mocker: MockerFixture) -> None:
+    """使用本地快照时，验证不会发起网络请求"""
+    from src.utils.package_index import LocalIndex
+    from src.utils.validation.utils import check_pypi
+
+    (tmp_path / "project-link.json").write_text(
+        json.dumps({"info": {"version": "1.0.0"}, "urls": []})
+    )
+    from src.utils.package_index import project_cache
+
+    mocker.patch.object(project_cache, "index", LocalIndex(tmp_path))
+
+    assert check_pypi("project_link")
+    assert not check_pypi("missing")
+
+
+def test_create_package_index_invalid() -> None:
+    from src.utils.package_index import create_package_index
+
+    with pytest.raises(ValueError, match="本地快照需要设置文件夹路径"):
+        create_package_index("local")
+    with pytest.raises(ValueError, match="不支持的包索引类型"):
+        create_package_index("unknown")
+
+
+def test_latest_version() -> None:
+    """按照 PEP 440 的顺序取最大的正式版本，没有正式版本时取最大的预发布版本"""
+    from src.utils.package_index import latest_version
+
+    assert latest_version(["2.0.0rc1", "1.2.5", "1.10.0"]) == "1.10.0"
+    assert latest_version(["1.0.0", "1.0.0.post1", "1.0.0+local"]) == "1.0.0.post1"
+    assert latest_version(["2023.1", "1!0.1.0"]) == "1!0.1.0"
+    assert latest_version(["2.0.0b1", "2.0.0rc1", "invalid"]) == "2.0.0rc1"
+    assert latest_version(["invalid"]) is None
+    assert latest_version([]) is None
+
+
+async def test_pypi_latest_version(respx_mock: MockRouter) -> None:
+    """使用 pypi.org 时从简单索引获取最新版本号，跳过已撤回的版本"""
+    from src.utils.package_index import SIMPLE_JSON_CONTENT_TYPE, PyPIJSONIndex
+    from tests.conftest import simple_json
+
+    data = simple_json("nonebot-plugin-x", "0.1.0", "0.2.0", "0.10.0")
+    data["files"][-1]["yanked"] = "broken release"
+    route = respx_mock.get("https://pypi.org/simple/nonebot-plugin-x/").respond(
+        json=data
+    )
+    json_route = respx_mock.get("https://pypi.org/pypi/Nonebot_Plugin_X/json")
+
+    index = PyPIJSONIndex()
+
+    assert index.get_latest_version("Nonebot_Plugin_X") == "0.2.0"
+    assert route.calls.last.request.headers["Accept"] == SIMPLE_JSON_CONTENT_TYPE
+    assert not json_route.called
+
+    # 所有版本都已撤回时使用 JSON API 中的版本号
+    data["files"] = data["files"][-1:]
+    route.respond(json=data)
+    json_route.respond(json={"info": {"version": "0.10.0"}, "urls": []})
+
+    assert index.get_latest_version("Nonebot_Plugin_X") == "0.10.0"
+    assert json_route.call_count == 1
+
+
+async def test_project_cache_normalized(mocked_api: MockRouter) -> None:
+    """不同写法的项目名称共用同一条缓存，已有项目信息时不再获取版本号"""
+    from src.utils.package_index import project_cache
+    from src.utils.store_test.utils import get_latest_version, get_pypi_data
+    from src.utils.validation.utils import check_pypi
+
+    assert get_latest_version("nonebot-plugin-treehelp") == "0.3.1"
+    assert get_latest_version("nonebot_plugin_treehelp") == "0.3.1"
+    assert mocked_api["project_link_treehelp"].call_count == 1
+    assert not mocked_api["project_data_treehelp"].called
+
+    # 已经获取过版本号，说明项目存在
+    assert check_pypi("Nonebot_Plugin_Treehelp")
+
+    project_cache.clear()
+    assert get_pypi_data("nonebot-plugin-treehelp")["version"] == "0.3.1"
+    assert get_latest_version("Nonebot.Plugin.Treehelp") == "0.3.1"
+    assert mocked_api["project_data_treehelp"].call_count == 1
+    assert mocked_api["project_link_treehelp"].call_count == 1
+
+
+async def test_check_pypi_normalized(mocked_api: MockRouter) -> None:
+    """检查项目是否存在时使用简单索引的网址，不同写法只请求一次"""
+    from src.utils.validation.utils import check_pypi
+
+    assert check_pypi("project_link")
+    assert check_pypi("Project-Link")
+    assert mocked_api["project_link"].call_count == 1
+    assert not mocked_api["project_data"].called
@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+
+def create_venv(path: Path, files: dict[str, bytes]) -> Path:
+    site_packages = path / "lib" / "python3.11" / "site-packages"
+    for name, content in files.items():
+        file = site_packages / name
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_bytes(content)
+    return path
+
+
+def test_package_store_link(tmp_path: Path) -> None:
+    """相同的文件在不同的虚拟环境中共用同一份"""
+    from src.utils.plugin_test import PackageStore
+
+    store = PackageStore(tmp_path / "packages")
+    files = {"nonebot/__init__.py": b"a" * 100, "httpx/_api.py": b"b" * 50}
+    venv1 = create_venv(tmp_path / "venv1", files)
+    venv2 = create_venv(
+        tmp_path / "venv2", files | {"nonebot_plugin_x/__init__.py": b"c" * 10}
+    )
+
+    # 第一次链接时仓库为空，文件直接加入仓库
+    assert store.link(venv1) == 0
+    assert store.link(venv2) == 150
+    # 再次链接不会重复计算
+    assert store.link(venv2) == 0
+
+    site_packages = "lib/python3.11/site-packages"
+    for name in files:
+        stat1 = (venv1 / site_packages / name).stat()
+        stat2 = (venv2 / site_packages / name).stat()
+        assert os.path.samestat(stat1, stat2)
+        assert stat1.st_nlink == 3
+        # 仓库中的文件为只读
+        assert not stat1.st_mode & 0o222
+    assert (venv2 / site_packages / "nonebot/__init__.py").read_bytes() == b"a" * 100
+    assert store.size() == 160
+
+
+def test_package_store_executable(tmp_path: Path) -> None:
+    """可执行文件与内容相同的普通文件分开保存"""
+    from src.utils.plugin_test import PackageStore
+
+    store = PackageStore(tmp_path / "packages")
+    venv1 = create_venv(tmp_path / "venv1", {"x/run.sh": b"echo"})
+    venv2 = create_venv(tmp_path / "venv2", {"x/run.sh": b"echo"})
+    (venv2 / "lib/python3.11/site-packages/x/run.sh").chmod(0o755)
+
+    assert store.link(venv1) == 0
+    assert store.link(venv2) == 0
+    assert len(list(store.objects_dir.glob("*/*"))) == 2
+
+
+def test_package_store_prune(tmp_path: Path) -> None:
+    """删除不再被虚拟环境使用的文件"""
+    import shutil
+
+    from src.utils.plugin_test import PackageStore
+
+    store = PackageStore(tmp_path / "packages")
+    venv1 = create_venv(tmp_path / "venv1", {"a.py": b"a" * 100, "b.py": b"b" * 10})
+    venv2 = create_venv(tmp_path / "venv2", {"a.py": b"a" * 100})
+    store.link(venv1)
+    store.link(venv2)
+
+    assert store.prune() == 0
+
+    shutil.rmtree(venv1)
+    assert store.prune() == 10
+    assert store.size() == 100
+
+    shutil.rmtree(venv2)
+    assert store.prune() == 100
+    assert store.size() == 0
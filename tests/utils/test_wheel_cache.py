@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+
+def create_file(path: Path, size: int, mtime: float | None = None) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"0" * size)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_get_distribution_key() -> None:
+    from src.utils.plugin_test import get_distribution_key
+
+    assert get_distribution_key("nonebot_plugin_x-0.1.0-py3-none-any.whl") == (
+        "nonebot-plugin-x",
+        "0.1.0",
+    )
+    assert get_distribution_key("Nonebot_Plugin_X-0.1.0.dist-info") == (
+        "nonebot-plugin-x",
+        "0.1.0",
+    )
+
+
+def test_wheel_cache_record(tmp_path: Path) -> None:
+    """统计命中缓存节省的下载量，并更新用到的 wheel 的修改时间"""
+    from src.utils.plugin_test import WheelCache
+
+    cache = WheelCache(tmp_path / "cache")
+    assert cache.get_env() == {
+        "POETRY_CACHE_DIR": str(tmp_path / "cache" / "poetry"),
+        "PIP_CACHE_DIR": str(tmp_path / "cache" / "pip"),
+    }
+
+    artifacts = tmp_path / "cache" / "poetry" / "artifacts"
+    cached = create_file(artifacts / "aa" / "httpx-0.24.1-py3-none-any.whl", 100, 0)
+    create_file(artifacts / "bb" / "unused-1.0.0-py3-none-any.whl", 10, 0)
+    before = set(cache.wheels())
+
+    # 安装时新下载的 wheel
+    create_file(artifacts / "cc" / "nonebot2-2.0.1-py3-none-any.whl", 50)
+    site_packages = tmp_path / "venv" / "lib" / "python3.11" / "site-packages"
+    (site_packages / "httpx-0.24.1.dist-info").mkdir(parents=True)
+    (site_packages / "nonebot2-2.0.1.dist-info").mkdir(parents=True)
+
+    assert cache.record(before, tmp_path / "venv") == 100
+    assert cache.stats() == {"saved": 100, "downloaded": 50}
+    assert cached.stat().st_mtime > 0
+
+    assert cache.record(set(cache.wheels()), tmp_path / "venv") == 150
+    assert cache.stats() == {"saved": 250, "downloaded": 50}
+
+
+def test_wheel_cache_prune(tmp_path: Path) -> None:
+    """超过大小上限时淘汰最久未使用的文件，包括 pip 的 HTTP 缓存"""
+    from src.utils.plugin_test import WheelCache
+
+    cache_dir = tmp_path / "cache"
+    cache = WheelCache(cache_dir, max_size=250)
+    oldest = create_file(cache_dir / "pip" / "http-v2" / "a" / "0123abcd", 100, 1)
+    older = create_file(cache_dir / "b" / "b-1.0-py3-none-any.whl", 100, 2)
+    newest = create_file(cache_dir / "c" / "c-1.0-py3-none-any.whl", 100, 3)
+    # 统计信息不计入大小，也不会被淘汰
+    create_file(cache.stats_path, 100, 0)
+
+    assert cache.size() == 300
+    cache.prune()
+
+    assert not oldest.exists()
+    assert older.exists()
+    assert newest.exists()
+    assert cache.stats_path.exists()
+    assert cache.size() == 200
+
+
+async def test_wheel_cache_install_lock(tmp_path: Path) -> None:
+    """安装时持有共享锁，统计与淘汰需要等待安装完成"""
+    import asyncio
+
+    from src.utils.plugin_test import WheelCache
+
+    cache = WheelCache(tmp_path / "cache")
+    async with cache.install_lock(), cache.install_lock():
+        task = asyncio.create_task(
+            asyncio.to_thread(cache.record, set(), tmp_path / "venv")
+        )
+        await asyncio.sleep(0.1)
+        assert not task.done()
+
+    assert await asyncio.wait_for(task, 5) == 0
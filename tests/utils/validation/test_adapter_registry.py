@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+from respx import MockRouter
+
+ADAPTERS_URL = (
+    "https://raw.githubusercontent.com/nonebot/nonebot2/master/assets/adapters.json"
+)
+
+
+async def test_adapter_registry_url(respx_mock: MockRouter) -> None:
+    """远程地址的适配器列表会被缓存，超过间隔后通过 ETag 重新验证"""
+    from src.utils.validation.adapters import AdapterRegistry
+
+    route = respx_mock.get(ADAPTERS_URL)
+    route.respond(
+        json=[{"module_name": "nonebot.adapters.onebot.v11"}],
+        headers={"ETag": '"v1"'},
+    )
+
+    registry = AdapterRegistry(revalidate_interval=60)
+    assert registry.get() == {"nonebot.adapters.onebot.v11"}
+    assert registry.get() == {"nonebot.adapters.onebot.v11"}
+    assert route.call_count == 1
+
+    registry.revalidate_interval = 0
+    route.respond(304)
+    assert registry.get() == {"nonebot.adapters.onebot.v11"}
+    assert route.call_count == 2
+    assert route.calls.last.request.headers["If-None-Match"] == '"v1"'
+
+
+async def test_adapter_registry_path(tmp_path: Path) -> None:
+    """本地文件修改后重新读取"""
+    from src.utils.validation.adapters import AdapterRegistry
+
+    path = tmp_path / "store_adapters.json"
+    path.write_text(json.dumps([{"module_name": "nonebot.adapters.onebot.v11"}]))
+
+    registry = AdapterRegistry()
+    registry.use_path(path)
+    assert registry.get() == {"nonebot.adapters.onebot.v11"}
+
+    path.write_text(json.dumps([{"module_name": "nonebot.adapters.qq"}]))
+    assert registry.get() == {"nonebot.adapters.qq"}
+
+
+async def test_adapter_registry_data(mocked_api: MockRouter) -> None:
+    """直接使用内存中的适配器列表，验证时不会下载"""
+    from src.utils.validation import PublishType, validate_info
+    from src.utils.validation.adapters import adapter_registry
+    from tests.utils.validation.utils import generate_plugin_data
+
+    adapter_registry.use_data([{"module_name": "nonebot.adapters.qq"}])
+
+    data = generate_plugin_data(supported_adapters=["~qq"])
+    result = validate_info(PublishType.PLUGIN, data)
+
+    assert result["valid"]
+    assert result["data"]["supported_adapters"] == ["nonebot.adapters.qq"]
+    assert not mocked_api["store_adapters"].called
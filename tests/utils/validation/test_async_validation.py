@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import httpx
+from respx import MockRouter
+
+from tests.utils.validation.utils import generate_adapter_data
+
+
+async def test_async_validate_info(mocked_api: MockRouter) -> None:
+    """验证前并发检查网址，验证时不会再次请求"""
+    from src.utils.validation import PublishType, async_validate_info
+
+    data = generate_adapter_data()
+
+    result = await async_validate_info(PublishType.ADAPTER, data)
+
+    assert result["valid"]
+    assert mocked_api["homepage"].call_count == 1
+    assert mocked_api["project_link"].call_count == 1
+
+
+async def test_async_validate_info_concurrent(respx_mock: MockRouter) -> None:
+    """所需时间取决于最慢的一次请求，而不是所有请求的总和"""
+    from src.utils.validation import PublishType, async_validate_info
+
+    async def slow_response(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.5)
+        return httpx.Response(200)
+
+    homepage = respx_mock.route(url="https://nonebot.dev/").mock(
+        side_effect=slow_response
+    )
+    pypi = respx_mock.route(url="https://pypi.org/simple/project-link/").mock(
+        side_effect=slow_response
+    )
+
+    data = generate_adapter_data()
+
+    start = time.perf_counter()
+    result = await async_validate_info(PublishType.ADAPTER, data)
+    elapsed = time.perf_counter() - start
+
+    assert result["valid"]
+    assert homepage.call_count == 1
+    assert pypi.call_count == 1
+    assert elapsed < 0.9
+
+
+async def test_async_validate_info_invalid_project_link(
+    mocked_api: MockRouter,
+) -> None:
+    """PyPI 项目名不符合规范时不检查 PyPI"""
+    from src.utils.validation import PublishType, async_validate_info
+
+    data = generate_adapter_data(project_link="project_link/")
+
+    result = await async_validate_info(PublishType.ADAPTER, data)
+
+    assert not result["valid"]
+    assert result["errors"][0]["type"] == "value_error.project_link.name"
+    assert mocked_api["homepage"].called
+
+
+async def test_validate_many(mocked_api: MockRouter) -> None:
+    """批量验证的结果与输入顺序一致，相同的网址只检查一次"""
+    from src.utils.validation import PublishType, validate_many
+
+    previous_data = [
+        {
+            "module_name": "module_name1",
+            "project_link": "project_link1",
+            "name": "name",
+            "desc": "desc",
+            "author": "author",
+        }
+    ]
+    records = [
+        generate_adapter_data(name="first", previous_data=previous_data),
+        generate_adapter_data(
+            name="second",
+            module_name="module_name1",
+            project_link="project_link1",
+            previous_data=previous_data,
+        ),
+        generate_adapter_data(name="third", previous_data=previous_data),
+    ]
+
+    results = await validate_many(PublishType.ADAPTER, records)
+
+    assert [result["name"] for result in results] == ["first", "second", "third"]
+    assert [result["valid"] for result in results] == [True, False, True]
+    assert results[1]["errors"][0]["type"] == "value_error.duplication"
+    assert mocked_api["homepage"].call_count == 1
+    assert mocked_api["project_link"].call_count == 1
+    assert mocked_api["project_link1"].call_count == 1
+
+
+async def test_validate_many_concurrency(respx_mock: MockRouter) -> None:
+    """同时进行的请求数不超过限制"""
+    from src.utils.validation import PublishType, validate_many
+    from src.utils.validation.utils import prefetch_urls
+
+    running = 0
+    max_running = 0
+
+    async def slow_response(request: httpx.Request) -> httpx.Response:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return httpx.Response(200)
+
+    respx_mock.route(host="example.com").mock(side_effect=slow_response)
+
+    await prefetch_urls([f"https://example.com/{i}" for i in range(10)], 3)
+    assert max_running == 3
+
+    respx_mock.route(url="https://pypi.org/simple/project-link/").mock(
+        side_effect=slow_response
+    )
+    records = [
+        generate_adapter_data(homepage=f"https://example.com/{i}") for i in range(10)
+    ]
+    results = await validate_many(PublishType.ADAPTER, records)
+    assert all(result["valid"] for result in results)
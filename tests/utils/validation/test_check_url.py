@@ -0,0 +1,53 @@
+import httpx
+from respx import MockRouter
+
+
+async def test_check_url_head(respx_mock: MockRouter) -> None:
+    """HEAD 请求成功时不再发送 GET 请求"""
+    from src.utils.validation.utils import check_url
+
+    head = respx_mock.head("https://nonebot.dev/").respond()
+    get = respx_mock.get("https://nonebot.dev/").respond()
+
+    assert check_url("https://nonebot.dev/") == (200, "")
+    assert head.called
+    assert not get.called
+
+
+async def test_check_url_head_not_allowed(respx_mock: MockRouter) -> None:
+    """不支持 HEAD 请求时使用 GET 请求确认"""
+    from src.utils.validation.utils import check_url
+
+    head = respx_mock.head("https://nonebot.dev/").respond(405)
+    get = respx_mock.get("https://nonebot.dev/").respond(content=b"x" * 1024 * 1024)
+
+    assert check_url("https://nonebot.dev/") == (200, "")
+    assert head.called
+    assert get.called
+
+
+async def test_check_url_head_error(respx_mock: MockRouter) -> None:
+    """HEAD 请求出错时使用 GET 请求确认，连接失败时直接返回"""
+    from src.utils.validation.utils import check_url
+
+    respx_mock.head("https://nonebot.dev/").mock(side_effect=httpx.RemoteProtocolError)
+    respx_mock.get("https://nonebot.dev/").respond(404)
+    connect_get = respx_mock.get("https://v2.nonebot.dev/").respond()
+    respx_mock.head("https://v2.nonebot.dev/").mock(side_effect=httpx.ConnectError)
+
+    assert check_url("https://nonebot.dev/") == (404, "")
+    assert check_url("https://v2.nonebot.dev/")[0] == -1
+    assert not connect_get.called
+
+
+async def test_async_check_url_head_not_allowed(respx_mock: MockRouter) -> None:
+    """异步检查同样先发送 HEAD 请求"""
+    from src.utils.validation.utils import async_check_url
+
+    head = respx_mock.head("https://nonebot.dev/").respond(405)
+    get = respx_mock.get("https://nonebot.dev/").respond()
+
+    async with httpx.AsyncClient() as client:
+        assert await async_check_url(client, "https://nonebot.dev/") == (200, "")
+    assert head.called
+    assert get.called
@@ -67,6 +67,46 @@ async def test_name_duplication(mocked_api: MockRouter) -> None:
     assert mocked_api["homepage"].called
 
 
+async def test_name_duplication_normalized(mocked_api: MockRouter) -> None:
+    """测试 PyPI 项目名称规范化后重复的情况"""
+    from src.utils.validation import PublishType, validate_info
+
+    data = generate_adapter_data(
+        module_name="module_name1",
+        project_link="project_link1",
+        previous_data=[
+            {
+                "module_name": "module_name1",
+                "project_link": "Project.Link1",
+                "name": "name",
+                "desc": "desc",
+                "author": "author",
+            }
+        ],
+    )
+
+    result = validate_info(PublishType.ADAPTER, data)
+
+    assert not result["valid"]
+    assert result["errors"][0]["type"] == "value_error.duplication"
+
+
+async def test_duplication_index() -> None:
+    """索引中的 PyPI 项目名称已经规范化，并跳过缺少字段的数据"""
+    from src.utils.validation.utils import get_duplication_index
+
+    data = [
+        {"module_name": "module_name1", "project_link": "project-link1"},
+        {"module_name": "module_name2", "project_link": "Project_Link2"},
+        {"module_name": "module_name3"},
+    ]
+
+    assert get_duplication_index(data) == {
+        ("project-link1", "module_name1"),
+        ("project-link2", "module_name2"),
+    }
+
+
 async def test_name_too_long(mocked_api: MockRouter) -> None:
     """测试名称过长的情况"""
     from src.utils.validation import PublishType, validate_info
@@ -0,0 +1,94 @@
+import time
+from pathlib import Path
+
+from respx import MockRouter
+
+
+def test_url_cache_ttl() -> None:
+    """成功与失败的结果有效期不同"""
+    from src.utils.validation.cache import URLCache
+
+    cache = URLCache(success_ttl=100, failure_ttl=10)
+    now = time.time()
+
+    cache.set("https://nonebot.dev/", (200, ""), checked_at=now - 50)
+    cache.set("https://www.baidu.com/", (404, ""), checked_at=now - 50)
+    cache.set("https://v2.nonebot.dev/", (-1, "error"), checked_at=now - 5)
+
+    assert cache.get("https://nonebot.dev/") == (200, "")
+    assert cache.get("https://www.baidu.com/") is None
+    assert cache.get("https://v2.nonebot.dev/") == (-1, "error")
+    assert len(cache) == 2
+
+    assert cache.stats == {
+        "nonebot.dev": {"hits": 1, "misses": 0, "failures": 0},
+        "www.baidu.com": {"hits": 0, "misses": 1, "failures": 1},
+        "v2.nonebot.dev": {"hits": 1, "misses": 0, "failures": 1},
+    }
+
+
+async def test_url_cache_stats_prefetch(mocked_api: MockRouter) -> None:
+    """预先并发检查后再同步检查，每个网址只统计一次"""
+    from src.utils.validation.utils import check_url, prefetch_urls, url_cache
+
+    url_cache.set("https://v2.nonebot.dev/", (200, ""))
+
+    await prefetch_urls(["https://nonebot.dev/", "https://v2.nonebot.dev/"])
+    assert check_url("https://nonebot.dev/") == (200, "")
+    assert check_url("https://v2.nonebot.dev/") == (200, "")
+    assert check_url("https://nonebot.dev/") == (200, "")
+
+    assert url_cache.stats == {
+        "nonebot.dev": {"hits": 0, "misses": 1, "failures": 0},
+        "v2.nonebot.dev": {"hits": 1, "misses": 0, "failures": 0},
+    }
+
+
+def test_url_cache_lru() -> None:
+    """超过最大数量时淘汰最久未使用的结果"""
+    from src.utils.validation.cache import URLCache
+
+    cache = URLCache(max_size=2)
+
+    cache.set("https://a.com/", (200, ""))
+    cache.set("https://b.com/", (200, ""))
+    assert cache.get("https://a.com/") == (200, "")
+    cache.set("https://c.com/", (200, ""))
+
+    assert cache.has("https://a.com/")
+    assert not cache.has("https://b.com/")
+    assert cache.has("https://c.com/")
+
+
+def test_url_cache_persistent(tmp_path: Path) -> None:
+    """保存至文件后可以重新加载，已过期的结果会被丢弃"""
+    from src.utils.validation.cache import URLCache
+
+    path = tmp_path / "url_cache.json"
+    now = time.time()
+
+    cache = URLCache(success_ttl=100, failure_ttl=10)
+    cache.set("https://nonebot.dev/", (200, ""), checked_at=now - 50)
+    cache.set("https://www.baidu.com/", (404, ""), checked_at=now - 50)
+    cache.save(path)
+
+    new_cache = URLCache(success_ttl=100, failure_ttl=10)
+    new_cache.load(path)
+
+    assert len(new_cache) == 1
+    assert new_cache.get("https://nonebot.dev/") == (200, "")
+
+
+async def test_check_url_reuse_success(mocked_api: MockRouter) -> None:
+    """访问成功的结果在有效期内直接使用"""
+    from src.utils.validation.utils import check_url, url_cache
+
+    url_cache.set("https://nonebot.dev/", (200, ""), checked_at=time.time() - 60)
+
+    assert check_url("https://nonebot.dev/") == (200, "")
+    assert not mocked_api["homepage"].called
+
+    # 访问失败时 HEAD 与 GET 请求各发送一次，之后使用缓存
+    assert check_url("https://www.baidu.com") == (404, "")
+    assert check_url("https://www.baidu.com") == (404, "")
+    assert mocked_api["homepage_failed"].call_count == 2